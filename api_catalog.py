@@ -0,0 +1,64 @@
+"""
+White Dove Wellness API endpoint catalog
+Endpoints and request payloads shared by the smoke test (backend_test.py)
+and the load test (load_test.py). Endpoints are relative to /api/.
+"""
+
+PUBLIC_LIST_ENDPOINTS = [
+    ('therapies?active_only=true', 'therapies'),
+    ('prices?active_only=true', 'prices'),
+    ('affiliations?active_only=true', 'affiliations'),
+    ('policies?active_only=true', 'policies'),
+    ('settings', 'settings')
+]
+
+ADMIN_LIST_ENDPOINTS = [
+    ('admin/contacts', 'contacts'),
+    ('admin/users', 'users')
+]
+
+ADMIN_LOGIN = {
+    "username": "admin",
+    "password": "admin123"
+}
+
+CONTACT_DATA = {
+    "name": "Test User",
+    "email": "test@example.com",
+    "phone": "1234567890",
+    "message": "Test contact message",
+    "preferred_contact": "email"
+}
+
+THERAPY_DATA = {
+    "name": "Test Therapy",
+    "short_description": "A test therapy for API testing",
+    "full_description": "This is a comprehensive test therapy description",
+    "icon": "Sparkles",
+    "display_order": 999,
+    "is_active": True
+}
+
+PRICE_DATA = {
+    "name": "Test Price",
+    "duration": "60 minutes",
+    "price": 75.00,
+    "description": "Test price entry",
+    "is_active": True
+}
+
+CLIENT_DATA = {
+    "first_name": "Test",
+    "last_name": "Client",
+    "email": "testclient@example.com",
+    "phone": "1234567890",
+    "address": "123 Test Street",
+    "medical_notes": "Test medical notes"
+}
+
+NOTE_DATA = {
+    "note": "Test session note",
+    "session_date": "2024-01-30"
+}
+
+SETTINGS_DATA = {"facebook_url": "https://facebook.com/test"}
@@ -0,0 +1,72 @@
+"""
+Client detail latency benchmark
+Compares the Mongo work behind opening a client record: the previous
+get_client + list_client_notes pair (two admin lookups, the client twice and
+the notes) against the single /clients/{id}/full aggregation.
+
+Requires a MongoDB server; the scratch database is dropped afterwards.
+Run from backend/: python -m benchmarks.bench_client_detail --mongo-url mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import random
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.bench_note_search import make_notes, report, timed
+from services.client_detail import client_detail_pipeline, shape_client_detail
+from services.client_note_stats import client_note_stats
+
+
+async def two_call_flow(db, client_id: str):
+    # get_client
+    await db.admin_users.find_one({"id": "admin"}, {"_id": 0})
+    await db.clients.find_one({"id": client_id}, {"_id": 0})
+    # list_client_notes
+    await db.admin_users.find_one({"id": "admin"}, {"_id": 0})
+    await db.clients.find_one({"id": client_id})
+    await db.client_notes.find({"client_id": client_id}, {"_id": 0}).sort("created_at", -1).to_list(500)
+
+
+async def full_flow(db, client_id: str, limit: int):
+    await db.admin_users.find_one({"id": "admin"}, {"_id": 0})
+    rows = await db.clients.aggregate(client_detail_pipeline(client_id, limit)).to_list(1)
+    return shape_client_detail(rows[0], limit)
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.database]
+    try:
+        await db.admin_users.insert_one({"id": "admin", "username": "admin", "is_active": True})
+        await db.clients.insert_many([
+            {"id": f"client-{i}", "first_name": f"First{i}", "last_name": f"Last{i}"} for i in range(args.clients)
+        ])
+        await db.client_notes.insert_many(list(make_notes(args.notes, args.clients, random.Random(7))))
+        await client_note_stats.ensure_indexes(db)
+        await client_note_stats.backfill(db)
+
+        ids = [f"client-{i}" for i in range(args.clients)]
+        detail = await full_flow(db, ids[0], args.limit)
+        print(f"{args.clients} clients, {args.notes:,} notes (~{args.notes // args.clients} per client), "
+              f"page of {args.limit}; sample stats {detail['stats']}")
+
+        report("get_client + list_client_notes (5 queries)",
+               await timed(lambda: two_call_flow(db, random.choice(ids)), args.rounds))
+        report("/clients/{id}/full (2 queries)",
+               await timed(lambda: full_flow(db, random.choice(ids), args.limit), args.rounds))
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="whitedove_bench_client_detail")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--notes", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
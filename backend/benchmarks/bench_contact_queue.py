@@ -0,0 +1,107 @@
+"""
+Contact submission ingest benchmark
+Measures sustained submissions per second for the old insert_one +
+find_one request path against the write-behind contact queue, using a
+collection stand-in that charges a fixed latency per round trip.
+
+Run from backend/: python -m benchmarks.bench_contact_queue
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+from services.contact_queue import ContactIngestQueue
+
+
+class TimedCollection:
+    """Minimal collection that sleeps for each Mongo round trip"""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.docs = {}
+        self.round_trips = 0
+
+    async def insert_one(self, doc):
+        await asyncio.sleep(self.latency)
+        self.round_trips += 1
+        self.docs[doc["id"]] = doc
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(self.latency)
+        self.round_trips += 1
+        for doc in docs:
+            self.docs[doc["id"]] = doc
+
+    async def find_one(self, query, projection=None):
+        await asyncio.sleep(self.latency)
+        self.round_trips += 1
+        return self.docs.get(query["id"])
+
+
+def make_submission(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Visitor {i}",
+        "email": f"visitor{i}@example.com",
+        "phone": None,
+        "message": "Could I book a session for next Tuesday afternoon?",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "is_read": False,
+        "notes": None
+    }
+
+
+async def drive(submit, total: int, concurrency: int) -> float:
+    """Run total submissions across concurrency workers, returning elapsed seconds"""
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            await submit(make_submission(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def main(args):
+    print(f"{args.submissions} submissions, {args.concurrency} concurrent, "
+          f"{args.latency_ms}ms per Mongo round trip")
+
+    direct = TimedCollection(args.latency_ms)
+
+    async def direct_submit(doc):
+        await direct.insert_one(doc)
+        await direct.find_one({"id": doc["id"]})
+
+    elapsed = await drive(direct_submit, args.submissions, args.concurrency)
+    print(f"  insert_one + find_one  {args.submissions / elapsed:9.0f}/s  "
+          f"{direct.round_trips} round trips")
+
+    with tempfile.TemporaryDirectory() as spool_dir:
+        queued = TimedCollection(args.latency_ms)
+        queue = ContactIngestQueue(args.batch_size, args.flush_ms, spool_dir)
+        queue.bind(queued)
+        await queue.start()
+
+        start = time.perf_counter()
+        elapsed = await drive(queue.submit, args.submissions, args.concurrency)
+        await queue.stop()
+        drained = time.perf_counter() - start
+        print(f"  write-behind queue     {args.submissions / elapsed:9.0f}/s acknowledged, "
+              f"{args.submissions / drained:.0f}/s including drain  "
+              f"{queued.round_trips} round trips, {len(queued.docs)} written")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--submissions", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--flush-ms", type=int, default=250)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,137 @@
+"""
+Controller benchmark against the in-memory database
+Mounts the real client, contact and therapy routers on a FastAPI app backed
+by a seeded MemoryDatabase, then drives typical admin and public requests
+through httpx's ASGI transport, with and without simulated network
+latency. Needs no MongoDB server, so it runs in CI; the absolute numbers
+exclude MongoDB's own query time, but per-request overhead and the cost of
+each extra round trip show up clearly.
+
+Given a MongoDB server, the same requests are then run against a seeded
+scratch database with the command listener and DbTimingMiddleware in
+place, and the Mongo commands and database time per route are reported.
+
+Run from backend/: python -m benchmarks.bench_controllers [--latency-ms 0 1 5] [--rounds 50] [--mongo-url mongodb://localhost:27017]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.bench_note_search import QUERIES
+from benchmarks.memory_db import MemoryDatabase
+from benchmarks.seed import ADMIN_ID, seed
+from controllers.client_controller import create_client_routes
+from controllers.contact_controller import create_contact_routes
+from controllers.therapy_controller import create_therapy_routes
+from services.auth_service import auth_service
+from services.db_metrics import DbTimingMiddleware, db_metrics
+
+
+def build_app(db) -> FastAPI:
+    app = FastAPI()
+    for create_routes in (create_client_routes, create_contact_routes, create_therapy_routes):
+        app.include_router(create_routes(db), prefix="/api")
+    return app
+
+
+def note_request(client_id: str) -> tuple:
+    body = {"client_id": client_id, "note": "Responded well, follow up in a fortnight", "session_date": "2024-05-01"}
+    return "POST", f"/api/clients/{client_id}/notes", body
+
+
+def scenarios(client_ids: list, rng: random.Random) -> dict:
+    """Map of scenario name to a function returning (method, path, json body)"""
+    return {
+        "GET /clients": lambda: ("GET", "/api/clients/", None),
+        "GET /clients?search=": lambda: ("GET", f"/api/clients/?search={rng.choice(('smith', 'olivia', '0770'))}", None),
+        "GET /clients?sort=-note_count": lambda: ("GET", "/api/clients/?sort=-note_count&has_notes=true", None),
+        "GET /clients/{id}": lambda: ("GET", f"/api/clients/{rng.choice(client_ids)}", None),
+        "GET /clients/{id}/notes": lambda: ("GET", f"/api/clients/{rng.choice(client_ids)}/notes", None),
+        "GET /clients/{id}/full": lambda: ("GET", f"/api/clients/{rng.choice(client_ids)}/full", None),
+        "GET /clients/notes/search": lambda: ("GET", f"/api/clients/notes/search?q={rng.choice(QUERIES)}", None),
+        "POST /clients/{id}/notes": lambda: note_request(rng.choice(client_ids)),
+        "GET /contact": lambda: ("GET", "/api/contact/?unread_only=true", None),
+        "GET /therapies": lambda: ("GET", "/api/therapies/?active_only=true", None)
+    }
+
+
+async def run_scenario(http: httpx.AsyncClient, db, build, rounds: int) -> tuple:
+    timings = []
+    round_trips = getattr(db, "round_trips", 0)
+    for _ in range(rounds):
+        method, path, body = build()
+        start = time.perf_counter()
+        response = await http.request(method, path, json=body)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code < 400, f"{method} {path} returned {response.status_code}: {response.text[:200]}"
+    return statistics.median(timings) * 1000, (getattr(db, "round_trips", 0) - round_trips) / rounds
+
+
+async def mongo_section(args, token: str):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_url, tz_aware=True, event_listeners=[db_metrics])
+    db = client[args.database]
+    try:
+        await seed(db, args.clients, args.notes, args.contacts)
+        client_ids = [client["id"] for client in await db.clients.find({}, {"id": 1}).to_list(None)]
+        db_metrics.reset()
+
+        transport = httpx.ASGITransport(app=DbTimingMiddleware(build_app(db)))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     headers={"Authorization": f"Bearer {token}"}) as http:
+            print(f"\nMongoDB at {args.mongo_url}")
+            print(f"{'scenario':<32} {'median':>10}")
+            for name, build in scenarios(client_ids, random.Random(11)).items():
+                median_ms, _ = await run_scenario(http, db, build, args.rounds)
+                print(f"{name:<32} {median_ms:>8.2f}ms")
+
+        print(f"\n{'route':<44} {'commands':>9} {'db time':>9}  slowest")
+        for route, stats in db_metrics.stats()["routes"].items():
+            slowest = stats["slowest"]
+            detail = f"{slowest['command']} {slowest['collection']} {slowest['duration_ms']:.1f}ms" if slowest else "-"
+            print(f"{route:<44} {stats['commands_per_request']:>9.1f} {stats['db_ms_per_request']:>7.2f}ms  {detail}")
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+async def main(args):
+    db = MemoryDatabase()
+    counts = await seed(db, args.clients, args.notes, args.contacts)
+    print(f"seeded {counts['clients']} clients, {counts['client_notes']} notes, {counts['contact_submissions']} contacts")
+
+    client_ids = [client["id"] for client in await db.clients.find({}, {"id": 1}).to_list(None)]
+    token = auth_service.create_tokens(ADMIN_ID, "admin")["access_token"]
+    transport = httpx.ASGITransport(app=build_app(db))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as http:
+        for latency_ms in args.latency_ms:
+            db.latency_ms = latency_ms
+            print(f"\nlatency {latency_ms:g}ms per round trip")
+            print(f"{'scenario':<32} {'median':>10} {'round trips':>12}")
+            for name, build in scenarios(client_ids, random.Random(11)).items():
+                median_ms, round_trips = await run_scenario(http, db, build, args.rounds)
+                print(f"{name:<32} {median_ms:>8.2f}ms {round_trips:>12.1f}")
+
+    if args.mongo_url:
+        await mongo_section(args, token)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--contacts", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 1, 5])
+    parser.add_argument("--mongo-url", help="also run against this MongoDB server, reporting commands per route")
+    parser.add_argument("--database", default="whitedove_bench_controllers")
+    asyncio.run(main(parser.parse_args()))
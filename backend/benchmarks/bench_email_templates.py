@@ -0,0 +1,106 @@
+"""
+Contact notification rendering benchmark
+Compares the per-message cost of the precompiled Jinja2 templates with the
+f-string document the notification used to build, and checks that user
+input is escaped in the HTML body.
+
+Run from backend/: python -m benchmarks.bench_email_templates
+"""
+
+import argparse
+import time
+
+from services.email_templates import email_templates
+
+STYLE = """
+        body {{ font-family: 'Manrope', sans-serif; color: #374151; }}
+        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+        .header {{ background: linear-gradient(135deg, #9F87C4 0%, #A7D7C5 100%); padding: 20px; border-radius: 8px 8px 0 0; }}
+        .header h1 {{ color: white; margin: 0; }}
+        .content {{ background: #f9fafb; padding: 20px; border-radius: 0 0 8px 8px; }}
+        .field {{ margin-bottom: 15px; }}
+        .label {{ font-weight: 600; color: #6b7280; }}
+        .value {{ margin-top: 5px; }}
+        .message {{ background: white; padding: 15px; border-radius: 8px; border: 1px solid #e5e7eb; }}
+"""
+
+
+def legacy_render(name: str, email: str, phone: str, message: str):
+    """The f-string bodies send_contact_notification built before templates"""
+    body = f"""
+New contact form submission:
+
+Name: {name}
+Email: {email}
+Phone: {phone or 'Not provided'}
+
+Message:
+{message}
+        """
+    html_body = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>{STYLE.format()}</style>
+</head>
+<body>
+    <div class="container">
+        <div class="header"><h1>New Contact Form Submission</h1></div>
+        <div class="content">
+            <div class="field"><div class="label">Name</div><div class="value">{name}</div></div>
+            <div class="field"><div class="label">Email</div><div class="value"><a href="mailto:{email}">{email}</a></div></div>
+            <div class="field"><div class="label">Phone</div><div class="value">{phone or 'Not provided'}</div></div>
+            <div class="field"><div class="label">Message</div><div class="message">{message}</div></div>
+        </div>
+    </div>
+</body>
+</html>
+        """
+    return body, html_body
+
+
+def check_escaping():
+    hostile = {
+        "name": "<img src=x onerror=alert(1)>",
+        "email": "a@example.com\"><script>alert(2)</script>",
+        "phone": "",
+        "message": "Hello {{ config }} <script>alert(3)</script> & goodbye"
+    }
+    text, html = email_templates.render("contact_notification", **hostile)
+    assert "<script>" not in html and "<img" not in html, "user input reached the HTML body unescaped"
+    assert "&lt;script&gt;" in html and "&amp; goodbye" in html
+    assert "{{ config }}" in html, "user input must never be evaluated as template syntax"
+    assert hostile["message"] in text, "plain-text body should carry the message verbatim"
+    assert "Not provided" in text and "Not provided" in html
+
+
+def per_message_us(fn, rounds: int) -> float:
+    context = {
+        "name": "Jane Smith",
+        "email": "jane@example.com",
+        "phone": "07700 900123",
+        "message": "I'd love to book a reflexology session for my mother next week. " * 5
+    }
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(**context)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main(args):
+    check_escaping()
+    print("escaping checks passed")
+
+    legacy = per_message_us(legacy_render, args.rounds)
+    templated = per_message_us(
+        lambda **context: email_templates.render("contact_notification", **context),
+        args.rounds
+    )
+    print(f"f-string (unescaped)      {legacy:7.2f}us per message")
+    print(f"compiled Jinja2 template  {templated:7.2f}us per message")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20000)
+    main(parser.parse_args())
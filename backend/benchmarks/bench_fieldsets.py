@@ -0,0 +1,54 @@
+"""
+Sparse fieldset payload benchmark
+Reports wire size and serialization time of the default client list view
+(name, email, phone) against the full client documents.
+
+Run from backend/: python -m benchmarks.bench_fieldsets
+"""
+
+import argparse
+import time
+
+from benchmarks.bench_serialization import make_clients
+from models.schemas import Client
+from services.fieldsets import parse_fields, projection, sparse_model
+from services.json_response import serialize_list
+
+LIST_VIEW_FIELDS = "first_name,last_name,email,phone"
+
+
+def project(documents: list, fields: tuple) -> list:
+    """Apply a Mongo-style inclusion projection in memory"""
+    return [{k: v for k, v in doc.items() if k in fields} for doc in documents]
+
+
+def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main(args):
+    documents = make_clients(args.count)
+    fieldset = parse_fields(Client, LIST_VIEW_FIELDS)
+    slim_documents = project(documents, fieldset)
+    slim_model = sparse_model(Client, fieldset)
+
+    full_body = serialize_list(Client, documents)
+    slim_body = serialize_list(slim_model, slim_documents)
+    full_ms = timed(lambda: serialize_list(Client, documents), args.rounds)
+    slim_ms = timed(lambda: serialize_list(slim_model, slim_documents), args.rounds)
+
+    print(f"{args.count} clients, projection {projection(fieldset)}")
+    print(f"  full documents  {len(full_body):>9,} bytes  {full_ms:7.2f}ms to serialize")
+    print(f"  ?fields={LIST_VIEW_FIELDS}")
+    print(f"                  {len(slim_body):>9,} bytes  {slim_ms:7.2f}ms to serialize")
+    print(f"  payload reduction {100 * (1 - len(slim_body) / len(full_body)):.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,119 @@
+"""
+Microsoft Graph bulk send benchmark
+Sends an announcement through EmailService.send_bulk against an in-process
+Graph stub that answers $batch requests and throttles sub-requests above a
+configured rate with 429 + Retry-After, then checks every result maps back
+to its recipient.
+
+Run from backend/: python -m benchmarks.bench_graph_batch
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+
+import httpx
+
+from benchmarks.bench_graph_client import GraphStub
+from services.email_service import EmailService, GRAPH_BATCH_LIMIT
+
+
+class BatchGraphStub(GraphStub):
+    """GraphStub that also serves $batch with a per-second sendMail budget"""
+
+    def __init__(self, latency_ms: float, rate: int, bounced: set):
+        super().__init__(latency_ms)
+        self.rate = rate
+        self.bounced = bounced
+        self.batch_calls = 0
+        self.throttled = 0
+        self.oversized = 0
+        self._window = 0
+        self._window_sends = 0
+
+    def _allow(self) -> bool:
+        window = int(time.monotonic())
+        if window != self._window:
+            self._window, self._window_sends = window, 0
+        if self._window_sends >= self.rate:
+            return False
+        self._window_sends += 1
+        return True
+
+    def _retry_after(self) -> str:
+        return str(max(math.ceil(self._window + 1 - time.monotonic()), 1))
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("/$batch"):
+            return await super().__call__(request)
+
+        await asyncio.sleep(self.latency)
+        self.batch_calls += 1
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in self.valid_tokens:
+            return httpx.Response(401, json={"error": {"code": "InvalidAuthenticationToken"}})
+
+        requests = json.loads(request.content)["requests"]
+        if len(requests) > GRAPH_BATCH_LIMIT:
+            self.oversized += 1
+            return httpx.Response(400, json={"error": {"code": "BadRequest"}})
+
+        responses = []
+        for sub in requests:
+            address = sub["body"]["message"]["toRecipients"][0]["emailAddress"]["address"]
+            if not self._allow():
+                self.throttled += 1
+                responses.append({"id": sub["id"], "status": 429, "headers": {"Retry-After": self._retry_after()}})
+            elif address in self.bounced:
+                self.send_calls += 1
+                responses.append({"id": sub["id"], "status": 400,
+                                  "body": {"error": {"code": "ErrorInvalidRecipients", "message": f"Invalid recipient {address}"}}})
+            else:
+                self.send_calls += 1
+                responses.append({"id": sub["id"], "status": 202})
+        return httpx.Response(200, json={"responses": responses})
+
+
+async def main(args):
+    bounced = {f"client{i}@example.com" for i in range(0, args.messages, 97)}
+    stub = BatchGraphStub(args.latency_ms, args.rate, bounced)
+    service = EmailService()
+    service.provider = "microsoft"
+    service.ms_tenant_id = "tenant"
+    service.ms_user_id = "owner@whitedovewellness.co.uk"
+    service.ms_batch_concurrency = args.concurrency
+    await service.http_client.aclose()
+    service.http_client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+
+    messages = [
+        {"to": f"client{i}@example.com", "subject": "Spring opening hours", "body": "Hello"}
+        for i in range(args.messages)
+    ]
+    start = time.perf_counter()
+    results = await service.send_bulk(messages)
+    elapsed = time.perf_counter() - start
+
+    assert [r["to"] for r in results] == [m["to"] for m in messages], "results out of order"
+    failed = {r["to"] for r in results if not r["success"]}
+    assert failed == bounced, f"unexpected failures: {sorted(failed ^ bounced)[:5]}"
+    assert stub.oversized == 0
+
+    print(f"{args.messages} messages, {args.concurrency} concurrent batches, "
+          f"stub allows {args.rate} sends/s, {args.latency_ms}ms latency")
+    print(f"  {elapsed:.2f}s ({args.messages / elapsed:.0f} msg/s), "
+          f"{len(results) - len(failed)} sent, {len(failed)} rejected recipients")
+    print(f"  {stub.batch_calls} $batch calls, {stub.throttled} throttled sub-requests, "
+          f"{service.ms_throttled} backoffs, {stub.token_calls} token request(s)")
+
+    await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=int, default=400)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    asyncio.run(main(parser.parse_args()))
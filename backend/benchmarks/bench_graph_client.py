@@ -0,0 +1,82 @@
+"""
+Microsoft Graph send benchmark
+Drives EmailService's Graph path against an in-process stub of the token
+and sendMail endpoints, counting upstream calls for a burst of concurrent
+sends and checking that a revoked token is refreshed exactly once.
+
+Run from backend/: python -m benchmarks.bench_graph_client
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from services.email_service import EmailService
+
+
+class GraphStub:
+    """Stub of login.microsoftonline.com and graph.microsoft.com"""
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.token_calls = 0
+        self.send_calls = 0
+        self.valid_tokens = set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        if request.url.path.endswith("/oauth2/v2.0/token"):
+            self.token_calls += 1
+            token = f"token-{self.token_calls}"
+            self.valid_tokens.add(token)
+            return httpx.Response(200, json={"access_token": token, "expires_in": 3599, "token_type": "Bearer"})
+
+        if request.url.path.endswith("/sendMail"):
+            self.send_calls += 1
+            token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if token not in self.valid_tokens:
+                return httpx.Response(401, json={"error": {"code": "InvalidAuthenticationToken"}})
+            return httpx.Response(202)
+
+        return httpx.Response(404)
+
+
+async def main(args):
+    stub = GraphStub(args.latency_ms)
+    service = EmailService()
+    service.provider = "microsoft"
+    service.ms_tenant_id = "tenant"
+    service.ms_user_id = "owner@whitedovewellness.co.uk"
+    await service.http_client.aclose()
+    service.http_client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def send(i):
+        async with semaphore:
+            return await service.send_email(f"client{i}@example.com", "Announcement", "Hello")
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(send(i) for i in range(args.messages)))
+    elapsed = time.perf_counter() - start
+    print(f"{args.messages} sends, {args.concurrency} concurrent, {args.latency_ms}ms stub latency")
+    print(f"  {args.messages / elapsed:.0f} msg/s, {sum(results)} ok, "
+          f"{stub.token_calls} token requests, {stub.send_calls} sendMail calls")
+
+    # Revoke the cached token; every in-flight sender should share a single refresh
+    stub.valid_tokens.clear()
+    before = stub.token_calls
+    await asyncio.gather(*(send(i) for i in range(args.concurrency)))
+    print(f"  after revocation: {stub.token_calls - before} token refresh(es) for {args.concurrency} senders")
+
+    await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    asyncio.run(main(parser.parse_args()))
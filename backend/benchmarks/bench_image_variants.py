@@ -0,0 +1,86 @@
+"""
+Image variant benchmark
+Renders the responsive variants for generated photo-sized PNG uploads twice:
+inline on the event loop, and through ImageVariants' process pool. A
+heartbeat task measures how long the loop is stalled in each case; the
+byte sizes show what an 80-320px slot downloads before and after.
+
+Run from backend/: python -m benchmarks.bench_image_variants [--images 8] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from services.image_variants import ImageVariants, render_variants
+
+
+def write_images(directory: Path, count: int, width: int, height: int) -> list:
+    """Blurred noise over a gradient keeps detail at every size, much like a photograph"""
+    names = []
+    for i in range(count):
+        noise = Image.effect_noise((width // 8, height // 8), 40 + i).convert("RGB").resize((width, height), Image.BICUBIC)
+        gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+        name = f"upload-{i}.png"
+        Image.blend(noise, gradient, 0.5).save(directory / name)
+        names.append(name)
+    return names
+
+
+async def heartbeat(stalls: list, stop: asyncio.Event, interval: float = 0.01):
+    while not stop.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - before - interval)
+
+
+async def measure(label: str, work) -> float:
+    stalls, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stalls, stop))
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    print(f"{label}  {elapsed:6.2f}s  worst event loop stall {max(stalls, default=elapsed) * 1000:7.1f}ms")
+    return elapsed
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        names = write_images(root, args.images, args.width, args.height)
+        variants = ImageVariants(upload_dir=tmp)
+        variants.workers = args.workers or variants.workers
+        print(f"{args.images} {args.width}x{args.height} PNGs, {', '.join(variants.formats)} "
+              f"at {', '.join(map(str, variants.widths))}px")
+
+        async def inline():
+            for name in names:
+                render_variants(str(root / name), str(variants.variant_dir(name)), variants.widths, variants.formats)
+
+        async def pooled():
+            await asyncio.gather(*(variants.generate(name) for name in names))
+
+        await measure("inline on the loop  ", inline)
+        await measure(f"process pool ({variants.workers})   ", pooled)
+        variants.close()
+
+        manifest = await ImageVariants(upload_dir=tmp).generate(names[0])
+        print(f"original PNG {(root / names[0]).stat().st_size / 1024:,.0f}KB")
+        for variant in manifest["variants"]:
+            if variant["width"] <= 320:
+                print(f"  {variant['width']:>4}px {variant['format']:<4} {variant['bytes'] / 1024:8,.1f}KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--width", type=int, default=2400)
+    parser.add_argument("--height", type=int, default=1600)
+    parser.add_argument("--workers", type=int, help="defaults to IMAGE_WORKERS")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,129 @@
+"""
+Client note search benchmark
+Seeds a scratch database with synthetic client notes (1M by default), then
+times ranked text-index searches with and without client and session date
+filters, alongside the regex scan the search replaces.
+
+Requires a MongoDB server; the scratch database is dropped afterwards
+unless --keep is given.
+Run from backend/: python -m benchmarks.bench_note_search --mongo-url mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from services.note_search import NoteSearch
+
+VOCABULARY = (
+    "reflexology session relaxed tension shoulders neck lower back pain sleep improved "
+    "headache migraine anxiety stress hormonal balance digestion fatigue circulation feet "
+    "hands pressure points sensitive tender responded well calm breathing follow up "
+    "fortnight weekly aromatherapy lavender massage reiki energy emotional grounding "
+    "pregnancy fertility menopause hot flushes insomnia sinus congestion immune joints"
+).split()
+
+QUERIES = ("migraines", "lower back pain", "insomnia anxiety", "menopause hot flushes", "sinus")
+
+
+def make_notes(count: int, clients: int, rng: random.Random):
+    start = date(2022, 1, 1)
+    created = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        session = start + timedelta(days=rng.randrange(1000))
+        yield {
+            "id": str(uuid.uuid4()),
+            "client_id": f"client-{rng.randrange(clients)}",
+            "note": " ".join(rng.choices(VOCABULARY, k=rng.randint(12, 60))),
+            "session_date": session.isoformat(),
+            "created_at": created + timedelta(seconds=i * 60),
+            "created_by": "admin"
+        }
+
+
+async def seed(db, args):
+    rng = random.Random(7)
+    await db.clients.insert_many([
+        {"id": f"client-{i}", "first_name": f"First{i}", "last_name": f"Last{i}"} for i in range(args.clients)
+    ])
+    batch = []
+    start = time.perf_counter()
+    for note in make_notes(args.notes, args.clients, rng):
+        batch.append(note)
+        if len(batch) == 10000:
+            await db.client_notes.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.client_notes.insert_many(batch, ordered=False)
+    print(f"seeded {args.notes:,} notes in {time.perf_counter() - start:.1f}s")
+
+
+async def timed(coro_fn, rounds: int) -> list:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await coro_fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+def report(label: str, samples: list):
+    p50 = samples[len(samples) // 2]
+    p95 = samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+    print(f"  {label:<44} p50 {p50:8.1f}ms  p95 {p95:8.1f}ms")
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.database]
+    search = NoteSearch()
+    try:
+        if args.seed:
+            await db.client_notes.drop()
+            await db.clients.drop()
+            await seed(db, args)
+
+        start = time.perf_counter()
+        await search.ensure_indexes(db)
+        print(f"indexes ready in {time.perf_counter() - start:.1f}s")
+
+        for q in QUERIES:
+            page = await search.search(db, q)
+            print(f"'{q}': {page['total']:,} matches, top score {page['results'][0]['score']:.2f}"
+                  if page["results"] else f"'{q}': no matches")
+            report("ranked search, first page",
+                   await timed(lambda: search.search(db, q), args.rounds))
+            report("ranked search, one client",
+                   await timed(lambda: search.search(db, q, client_id="client-42"), args.rounds))
+            report("ranked search, spring 2024 sessions",
+                   await timed(lambda: search.search(db, q, session_from="2024-03-01", session_to="2024-05-31"), args.rounds))
+            report("ranked search, page 10",
+                   await timed(lambda: search.search(db, q, page=10), args.rounds))
+
+        # Counting the matches is what a regex search needs for ranking or paging
+        word = QUERIES[0][:-1]
+        report(f"regex scan for '{word}' (previous approach)", await timed(
+            lambda: db.client_notes.count_documents({"note": {"$regex": word, "$options": "i"}}),
+            max(args.rounds // 10, 1)
+        ))
+    finally:
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="whitedove_bench_note_search")
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--no-seed", dest="seed", action="store_false", help="reuse an existing --keep database")
+    parser.add_argument("--keep", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+"""
+Policy page crawler burst benchmark
+Replays a burst of slug lookups across every policy, comparing the
+render cache against querying and rendering on each request.
+
+Run from backend/: python -m benchmarks.bench_policy_cache
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from services.policy_cache import PolicyRenderCache, render_policy_content
+
+SECTION = """## Section {n}
+
+Your personal information is handled in line with **UK GDPR**. We keep
+session notes for *seven years* and never share them without consent.
+
+- Bookings can be moved up to 24 hours before the appointment
+- Cancellations inside 24 hours are charged at 50%
+- See [our contact page](https://whitedovewellness.co.uk/#contact) for questions
+"""
+
+
+def make_policies(count: int, sections: int) -> list:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Policy {i}",
+            "slug": f"policy-{i}",
+            "content": f"# Policy {i}\n\n" + "\n".join(SECTION.format(n=n) for n in range(sections)),
+            "display_order": i,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now
+        }
+        for i in range(count)
+    ]
+
+
+async def run_burst(handler, slugs: list, requests: int, rate: int) -> dict:
+    """Fire requests at a fixed arrival rate and record per-request latency"""
+    latencies = []
+    interval = 1.0 / rate
+
+    async def one(slug):
+        start = time.perf_counter()
+        await handler(slug)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    tasks = []
+    for i in range(requests):
+        tasks.append(asyncio.create_task(one(slugs[i % len(slugs)])))
+        delay = started + (i + 1) * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3)
+    }
+
+
+async def main(args):
+    policies = make_policies(args.policies, args.sections)
+    by_slug = {p["slug"]: p for p in policies}
+    slugs = list(by_slug)
+
+    async def uncached(slug):
+        await asyncio.sleep(args.db_latency_ms / 1000)
+        policy = by_slug[slug]
+        html, excerpt = render_policy_content(policy["content"])
+        return {**policy, "content_html": html, "excerpt": excerpt}
+
+    cache = PolicyRenderCache()
+
+    async def cached(slug):
+        entry = cache.get(slug)
+        if entry:
+            return entry
+        await asyncio.sleep(args.db_latency_ms / 1000)
+        return cache.put(by_slug[slug])
+
+    print(f"{args.policies} policies, {args.requests} requests at {args.rate} req/s, "
+          f"simulated db latency {args.db_latency_ms}ms")
+    for name, handler in (("query + render", uncached), ("render cache", cached)):
+        result = await run_burst(handler, slugs, args.requests, args.rate)
+        print(f"  {name:<15} {result}")
+    print(f"  cache stats     {cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--policies", type=int, default=12)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rate", type=int, default=1000)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    asyncio.run(main(parser.parse_args()))
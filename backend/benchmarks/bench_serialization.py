@@ -0,0 +1,124 @@
+"""
+List endpoint serialization benchmark
+Compares FastAPI's response_model path (validate, jsonable_encoder,
+stdlib json) against the cached TypeAdapter + pydantic-core path, and
+checks both produce byte-identical bodies before timing them.
+
+Run from backend/: python -m benchmarks.bench_serialization
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models.schemas import Client, ContactSubmission, Therapy
+from services.json_response import serialize_list
+
+
+def make_clients(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"client{i}@example.com",
+            "phone": f"07700 900{i % 1000:03d}",
+            "address": f"{i} Meadow Lane, Bristol",
+            "date_of_birth": "1980-04-12",
+            "medical_notes": "Mild plantar fasciitis, avoid deep pressure on left heel. " * 4,
+            "created_at": (now - timedelta(days=i)).isoformat(),
+            "updated_at": now.isoformat()
+        }
+        for i in range(count)
+    ]
+
+
+def make_therapies(count: int) -> list:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Therapy {i}",
+            "short_description": "A calming treatment focused on the feet.",
+            "full_description": "Reflexology applies gentle pressure to reflex points. " * 10,
+            "image_url": f"/api/uploads/therapy-{i}.png",
+            "icon": "leaf",
+            "display_order": i,
+            "is_active": True,
+            "created_at": now
+        }
+        for i in range(count)
+    ]
+
+
+def make_contacts(count: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Visitor {i}",
+            "email": f"visitor{i}@example.com",
+            "phone": None,
+            "message": "I'd like to book a reflexology session next week. " * 3,
+            "created_at": (now - timedelta(minutes=i)).isoformat(),
+            "is_read": i % 3 == 0,
+            "notes": None
+        }
+        for i in range(count)
+    ]
+
+
+async def fastapi_body(field, documents: list) -> bytes:
+    content = await serialize_response(field=field, response_content=documents, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+async def main(args):
+    cases = (
+        ("Client", Client, make_clients(args.count)),
+        ("Therapy", Therapy, make_therapies(args.count)),
+        ("ContactSubmission", ContactSubmission, make_contacts(args.count))
+    )
+
+    for name, model, documents in cases:
+        field = create_response_field(name=f"Response_{name}", type_=List[model])
+
+        before = await fastapi_body(field, documents)
+        after = serialize_list(model, documents)
+        if before != after:
+            raise SystemExit(f"{name}: fast path output differs from response_model output")
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            await fastapi_body(field, documents)
+        baseline = (time.perf_counter() - start) / args.rounds
+        fast = timed(lambda: serialize_list(model, documents), args.rounds)
+
+        per_doc_before = baseline / len(documents) * 1e6
+        per_doc_after = fast / len(documents) * 1e6
+        print(f"{name:<18} {len(documents)} docs  "
+              f"response_model {per_doc_before:7.2f}us/doc  "
+              f"fast path {per_doc_after:7.2f}us/doc  "
+              f"({per_doc_before / per_doc_after:.1f}x, identical output)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
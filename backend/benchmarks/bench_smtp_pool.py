@@ -0,0 +1,91 @@
+"""
+SMTP connection pool benchmark
+Sends a burst of notification emails to a local aiosmtpd server, once with
+a fresh aiosmtplib.send() per message and once through SMTPConnectionPool,
+reporting messages per second and the number of SMTP handshakes.
+
+Requires aiosmtpd (a development dependency in requirements.txt).
+Run from backend/: python -m benchmarks.bench_smtp_pool
+"""
+
+import argparse
+import asyncio
+import time
+from email.mime.text import MIMEText
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+
+from services.smtp_pool import SMTPConnectionPool
+
+
+class CountingHandler:
+    def __init__(self):
+        self.sessions = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 Message accepted for delivery"
+
+    def reset(self):
+        self.sessions = 0
+        self.messages = 0
+
+
+def make_message(i: int) -> MIMEText:
+    message = MIMEText(f"New contact form submission #{i}", "plain")
+    message["From"] = "website@whitedovewellness.co.uk"
+    message["To"] = "owner@whitedovewellness.co.uk"
+    message["Subject"] = f"New Contact Form Submission {i}"
+    return message
+
+
+async def burst(send, count: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await send(make_message(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return time.perf_counter() - start
+
+
+async def main(args):
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        async def send_fresh(message):
+            await aiosmtplib.send(message, hostname="127.0.0.1", port=args.port)
+
+        elapsed = await burst(send_fresh, args.messages, args.concurrency)
+        print(f"fresh connection per message  {args.messages / elapsed:8.0f} msg/s  "
+              f"{handler.sessions} handshakes, {handler.messages} delivered")
+
+        handler.reset()
+        pool = SMTPConnectionPool("127.0.0.1", args.port, use_tls=False,
+                                  max_size=args.pool_size, max_messages=args.max_messages)
+        elapsed = await burst(pool.send, args.messages, args.concurrency)
+        await pool.close()
+        print(f"pooled sessions ({args.pool_size})           {args.messages / elapsed:8.0f} msg/s  "
+              f"{handler.sessions} handshakes, {handler.messages} delivered  {pool.stats()}")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--max-messages", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8025)
+    asyncio.run(main(parser.parse_args()))
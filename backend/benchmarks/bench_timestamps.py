@@ -0,0 +1,97 @@
+"""
+Timestamp storage benchmark
+Compares client_notes with ISO-string timestamps against native BSON dates:
+validating a page of notes for a response (runs anywhere), and, given a
+MongoDB server, newest-first sorts and created_at range queries before and
+after running the timestamp migration on a seeded scratch database.
+
+Run from backend/: python -m benchmarks.bench_timestamps [--mongo-url mongodb://localhost:27017]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+
+from benchmarks.bench_note_search import make_notes, report, timed
+from models.schemas import ClientNote
+from services.json_response import serialize_list
+from services.timestamps import parse_timestamp
+
+
+def as_strings(notes: list) -> list:
+    return [{**note, "created_at": note["created_at"].isoformat()} for note in notes]
+
+
+def validation_us(documents: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        serialize_list(ClientNote, documents)
+    return (time.perf_counter() - start) / rounds / len(documents) * 1e6
+
+
+async def mongo_section(args, notes: list):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from scripts.migrate_timestamps import TimestampMigration
+
+    client = AsyncIOMotorClient(args.mongo_url, tz_aware=True)
+    db = client[args.database]
+    try:
+        await db.client_notes.insert_many(as_strings(notes))
+        await db.client_notes.create_index([("client_id", 1), ("created_at", -1)])
+        await db.client_notes.create_index([("created_at", -1)])
+
+        since, until = datetime(2023, 3, 1, tzinfo=timezone.utc), datetime(2023, 6, 1, tzinfo=timezone.utc)
+
+        async def run(label: str, bounds):
+            report(f"{label}: newest 50 notes", await timed(
+                lambda: db.client_notes.find({}, {"_id": 0}).sort("created_at", -1).to_list(50), args.rounds))
+            report(f"{label}: one client's newest 20", await timed(
+                lambda: db.client_notes.find({"client_id": "client-7"}, {"_id": 0}).sort("created_at", -1).to_list(20),
+                args.rounds))
+            report(f"{label}: count in a 3 month range", await timed(
+                lambda: db.client_notes.count_documents({"created_at": {"$gte": bounds[0], "$lt": bounds[1]}}),
+                args.rounds))
+
+        await run("strings", (since.isoformat(), until.isoformat()))
+        start = time.perf_counter()
+        await TimestampMigration(db, batch_size=5000, max_duty=1.0).migrate_collection("client_notes", ("created_at",))
+        print(f"migration took {time.perf_counter() - start:.1f}s unthrottled")
+        await run("dates  ", (since, until))
+
+        sample = await db.client_notes.find_one({}, {"_id": 0, "created_at": 1})
+        assert isinstance(sample["created_at"], datetime), "migration left a string behind"
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+async def main(args):
+    notes = list(make_notes(args.notes, args.clients, random.Random(7)))
+    page = notes[:args.page]
+    assert parse_timestamp(as_strings(page)[0]["created_at"]) == page[0]["created_at"]
+
+    string_us = validation_us(as_strings(page), args.validation_rounds)
+    date_us = validation_us(page, args.validation_rounds)
+    print(f"validating + serializing {args.page} ClientNote documents")
+    print(f"  ISO strings   {string_us:6.2f}us per note")
+    print(f"  BSON dates    {date_us:6.2f}us per note")
+
+    if not args.mongo_url:
+        print("pass --mongo-url to time sorts and range queries")
+        return
+    print(f"{args.notes:,} notes in {args.database}")
+    await mongo_section(args, notes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url")
+    parser.add_argument("--database", default="whitedove_bench_timestamps")
+    parser.add_argument("--notes", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--page", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--validation-rounds", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,70 @@
+"""
+Upload storage benchmark
+Streams a batch of generated uploads, a share of them byte-identical
+repeats, through UploadStore and compares disk usage and throughput with
+the old one-file-per-upload layout. Throughput depends mostly on the
+disk; the SHA-256 is computed on the chunks as they are written rather
+than in a second pass over the file.
+
+Run from backend/: python -m benchmarks.bench_upload_store [--uploads 200] [--size-mb 2] [--repeat 0.5]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from starlette.datastructures import UploadFile
+
+from services.upload_store import UploadStore, CHUNK_BYTES
+
+
+def disk_usage(root: Path) -> int:
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+
+
+async def legacy_save(root: Path, upload: UploadFile):
+    """The old layout: a fresh timestamped file per upload"""
+    path = root / f"upload-{time.time_ns()}-{random.randrange(10 ** 9)}.png"
+    with open(path, "wb") as out:
+        while chunk := await upload.read(CHUNK_BYTES):
+            out.write(chunk)
+
+
+async def run(label: str, payloads: list, save) -> float:
+    start = time.perf_counter()
+    for payload in payloads:
+        await save(UploadFile(io.BytesIO(payload)))
+    elapsed = time.perf_counter() - start
+    print(f"{label}  {len(payloads) / elapsed:7.1f} uploads/s", end="")
+    return elapsed
+
+
+async def main(args):
+    rng = random.Random(3)
+    distinct = [os.urandom(int(args.size_mb * 1024 * 1024)) for _ in range(max(1, int(args.uploads * (1 - args.repeat))))]
+    payloads = distinct + [rng.choice(distinct) for _ in range(args.uploads - len(distinct))]
+    rng.shuffle(payloads)
+    print(f"{args.uploads} uploads of {args.size_mb}MB, {len(distinct)} distinct")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        await run("timestamped      ", payloads, lambda upload: legacy_save(Path(tmp), upload))
+        print(f"  disk {disk_usage(Path(tmp)) / 1e6:8.1f}MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UploadStore(Path(tmp))
+        await run("content-addressed", payloads,
+                  lambda upload: store.save(upload, ".png", max_bytes=10 * 1024 * 1024 * 1024))
+        print(f"  disk {disk_usage(Path(tmp)) / 1e6:8.1f}MB  ({store.deduplicated} deduplicated)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--size-mb", type=float, default=2)
+    parser.add_argument("--repeat", type=float, default=0.5, help="share of uploads that repeat an earlier file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,1029 @@
+"""
+In-memory stand-in for AsyncIOMotorDatabase
+Implements the part of the Motor API the controllers and services use, so
+they can be driven offline: find (sort/skip/limit/to_list/async iteration),
+find_one with projections, insert_one/insert_many, update_one/update_many
+($set, $unset, $inc, $max, $min, $push, $pull, $addToSet, upsert),
+delete_one/delete_many, count_documents, find_one_and_update/delete,
+bulk_write, and create_index with unique indexes enforced, sparse and
+partial ones included (TTL options are accepted, but documents never
+expire). Filters support equality (including array membership and dotted
+paths), $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin, $exists, $type,
+$regex/$options, $not, $or, $and, $nor, $expr and $text (with
+{"$meta": "textScore"} projection and sort).
+aggregate() runs $match, $sort, $skip, $limit, $project, $addFields/$set,
+$unwind, $group, $lookup (localField/foreignField or let/pipeline) and
+$count with the common expression operators. Anything else fails with
+OperationFailure, as an unknown operator does on a real server.
+
+$text search approximates a Mongo text index: English stop words are
+dropped, words are reduced by a crude suffix stemmer, quoted phrases and
+-negated terms are honoured, and the score ranks notes matching more of
+the terms (then denser matches) first. Rankings will not match the
+server's exactly.
+
+Every awaited operation counts as one round trip and sleeps for latency_ms
+(plus up to jitter_ms) to simulate the network hop to MongoDB.
+
+    db = MemoryDatabase(latency_ms=1.0)
+    create_client_routes(db)
+"""
+
+import asyncio
+import random
+import re
+from datetime import datetime
+from typing import Any, Optional
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+DUPLICATE_KEY_ERROR = 11000
+# create_index options accepted besides unique, name, sparse and partialFilterExpression
+INDEX_OPTIONS = frozenset(("background", "expireAfterSeconds", "default_language"))
+BAD_VALUE = 2
+INDEX_NOT_FOUND = 27
+_MISSING = object()
+
+STOP_WORDS = frozenset((
+    "a", "about", "after", "all", "an", "and", "are", "as", "at", "be", "been", "but", "by", "for", "from",
+    "had", "has", "have", "he", "her", "his", "i", "if", "in", "into", "is", "it", "its", "my", "no", "not",
+    "of", "on", "or", "she", "so", "such", "that", "the", "their", "them", "then", "there", "these", "they",
+    "this", "to", "too", "very", "was", "we", "were", "will", "with", "you", "your"
+))
+_words = re.compile(r"[a-z0-9]+")
+
+
+def unsupported(message: str) -> OperationFailure:
+    return OperationFailure(message, BAD_VALUE)
+
+
+def clone(value: Any) -> Any:
+    """Copy of a document built from dicts, lists and immutable BSON values (much faster than deepcopy)"""
+    if isinstance(value, dict):
+        return {key: clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    return value
+
+
+def _type_rank(value: Any) -> int:
+    """BSON comparison order, so mixed-type fields sort the way MongoDB sorts them"""
+    if value is None or value is _MISSING:
+        return 0
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 1
+    if isinstance(value, str):
+        return 2
+    if isinstance(value, dict):
+        return 3
+    if isinstance(value, list):
+        return 4
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 5
+
+
+# $type aliases; bool is checked first because it is an int subclass
+BSON_TYPES = {
+    "double": float, "string": str, "object": dict, "array": list, "objectId": ObjectId, "bool": bool,
+    "date": datetime, "null": type(None), "int": int, "long": int, "number": (int, float)
+}
+
+
+def _has_type(value: Any, alias: Any) -> bool:
+    if isinstance(alias, list):
+        return any(_has_type(value, item) for item in alias)
+    if alias not in BSON_TYPES:
+        raise unsupported(f"unknown $type alias: {alias}")
+    if value is _MISSING:
+        return False
+    if isinstance(value, bool):
+        return alias == "bool"
+    return isinstance(value, BSON_TYPES[alias])
+
+
+def sort_key(value: Any):
+    return (_type_rank(value), value if value is not None and value is not _MISSING else 0)
+
+
+def get_path(document: dict, path: str) -> Any:
+    value = document
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def set_path(document: dict, path: str, value: Any):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        document = document.setdefault(part, {})
+    document[parts[-1]] = value
+
+
+def unset_path(document: dict, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        document = document.get(part)
+        if not isinstance(document, dict):
+            return
+    document.pop(parts[-1], None)
+
+
+def _compare(value: Any, other: Any, op) -> bool:
+    if value is _MISSING or _type_rank(value) != _type_rank(other):
+        return False
+    try:
+        return op(value, other)
+    except TypeError:
+        return False
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    if expected is None:
+        return value is None or value is _MISSING
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+def _regex(condition: dict) -> re.Pattern:
+    pattern = condition["$regex"]
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    flags = 0
+    for option in condition.get("$options", ""):
+        flags |= {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}.get(option, 0)
+    return re.compile(pattern, flags)
+
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if isinstance(condition, re.Pattern):
+        condition = {"$regex": condition}
+    if not (isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition)):
+        return _equals(value, condition)
+
+    candidates = value if isinstance(value, list) else [value]
+    for op, argument in condition.items():
+        if op == "$eq":
+            ok = _equals(value, argument)
+        elif op == "$ne":
+            ok = not _equals(value, argument)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            compare = {
+                "$gt": lambda a, b: a > b, "$gte": lambda a, b: a >= b,
+                "$lt": lambda a, b: a < b, "$lte": lambda a, b: a <= b
+            }[op]
+            ok = any(_compare(candidate, argument, compare) for candidate in candidates)
+        elif op == "$in":
+            ok = any(_equals(value, option) for option in argument)
+        elif op == "$nin":
+            ok = not any(_equals(value, option) for option in argument)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(argument)
+        elif op == "$type":
+            ok = any(_has_type(candidate, argument) for candidate in candidates) or _has_type(value, argument)
+        elif op == "$regex":
+            pattern = _regex(condition)
+            ok = any(isinstance(candidate, str) and pattern.search(candidate) for candidate in candidates)
+        elif op == "$options":
+            continue
+        elif op == "$not":
+            ok = not _match_condition(value, argument)
+        elif op == "$size":
+            ok = isinstance(value, list) and len(value) == argument
+        elif op == "$elemMatch":
+            ok = isinstance(value, list) and any(
+                matches(item, argument) if isinstance(item, dict) else _match_condition(item, argument) for item in value
+            )
+        elif op == "$all":
+            ok = isinstance(value, list) and all(_equals(value, item) for item in argument)
+        else:
+            raise unsupported(f"unknown operator: {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(document: dict, query: Optional[dict], text: Optional["TextQuery"] = None,
+            variables: Optional[dict] = None) -> bool:
+    """Whether a document satisfies a MongoDB filter
+
+    A $text clause needs the TextQuery built from the collection's text index.
+    """
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(document, clause, text, variables) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, clause, text, variables) for clause in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, clause, text, variables) for clause in condition):
+                return False
+        elif key == "$expr":
+            if not truthy(evaluate(condition, document, variables)):
+                return False
+        elif key == "$text":
+            if text is None:
+                raise OperationFailure("text index required for $text query", INDEX_NOT_FOUND)
+            if not text.score(document):
+                return False
+        elif key.startswith("$"):
+            raise unsupported(f"unknown top level operator: {key}")
+        elif not _match_condition(get_path(document, key), condition):
+            return False
+    return True
+
+
+def stem(word: str) -> str:
+    """Crude English stemmer, so "migraines" finds "migraine" and "relaxed" finds "relaxing"""
+    for suffix in ("ing", "ed", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith("ss"):
+            word = word[:-len(suffix)]
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 3 else word
+
+
+def text_terms(text: str) -> list:
+    return [stem(word) for word in _words.findall(text.lower()) if word not in STOP_WORDS]
+
+
+class TextQuery:
+    """A $search string evaluated against a collection's text-indexed fields"""
+
+    def __init__(self, search: str, fields: list, cache: Optional[dict] = None):
+        self.fields = fields
+        self._cache = {} if cache is None else cache
+        self.phrases = [phrase.lower() for phrase in re.findall(r'"([^"]*)"', search)]
+        words = re.sub(r'"[^"]*"', " ", search).split()
+        self.negated = {term for word in words if word.startswith("-") for term in text_terms(word[1:])}
+        self.terms = {term for word in words if not word.startswith("-") for term in text_terms(word)}
+        self._scores = {}
+
+    def _text(self, document: dict) -> str:
+        if self.fields == ["$**"]:
+            return " ".join(value for value in document.values() if isinstance(value, str))
+        values = (get_path(document, field) for field in self.fields)
+        return " ".join(value for value in values if isinstance(value, str))
+
+    def score(self, document: dict) -> float:
+        """Relevance of a document, 0 when it does not match"""
+        key = id(document)
+        if key not in self._scores:
+            if key not in self._cache:
+                text = self._text(document)
+                self._cache[key] = (text.lower(), text_terms(text))
+            text, words = self._cache[key]
+            counts = {term: words.count(term) for term in self.terms}
+            matched = sum(1 for count in counts.values() if count)
+            ok = (matched or (self.phrases and not self.terms)) \
+                and all(phrase in text for phrase in self.phrases) \
+                and not self.negated.intersection(words)
+            self._scores[key] = matched + sum(counts.values()) / len(words) if ok and words else 0.0
+        return self._scores[key]
+
+
+def truthy(value: Any) -> bool:
+    """Aggregation truthiness: null, missing, false and 0 are false"""
+    return value is not _MISSING and value is not None and value is not False and value != 0
+
+
+def _field(document: Any, path: str) -> Any:
+    """Field path lookup that maps over arrays, as "$a.b" does in aggregation"""
+    value = document
+    for part in path.split("."):
+        if isinstance(value, list):
+            value = [item.get(part) for item in value if isinstance(item, dict) and part in item]
+        elif isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+def _bson_compare(left: Any, right: Any) -> int:
+    left, right = sort_key(left), sort_key(right)
+    return (left > right) - (left < right)
+
+
+def _extreme(values: list, largest: bool) -> Any:
+    values = [value for value in values if value is not None and value is not _MISSING]
+    if not values:
+        return None
+    return (max if largest else min)(values, key=sort_key)
+
+
+def evaluate(expression: Any, document: dict, variables: Optional[dict] = None) -> Any:
+    """Evaluate an aggregation expression against a document"""
+    if isinstance(expression, str):
+        if expression.startswith("$$"):
+            name, _, path = expression[2:].partition(".")
+            if name == "REMOVE":
+                return _MISSING
+            if name in ("ROOT", "CURRENT"):
+                value = document
+            elif variables and name in variables:
+                value = variables[name]
+            else:
+                raise unsupported(f"Use of undefined variable: {name}")
+            return _field(value, path) if path else value
+        if expression.startswith("$"):
+            return _field(document, expression[1:])
+        return expression
+    if isinstance(expression, list):
+        return [evaluate(item, document, variables) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if len(expression) != 1 or not next(iter(expression)).startswith("$"):
+        result = {}
+        for key, item in expression.items():
+            value = evaluate(item, document, variables)
+            if value is not _MISSING:
+                result[key] = value
+        return result
+
+    op, argument = next(iter(expression.items()))
+    if op == "$literal":
+        return argument
+    if op == "$cond":
+        if isinstance(argument, dict):
+            argument = [argument["if"], argument["then"], argument["else"]]
+        condition, then, otherwise = argument
+        return evaluate(then if truthy(evaluate(condition, document, variables)) else otherwise, document, variables)
+
+    args = evaluate(argument, document, variables)
+    values = args if isinstance(argument, list) else [args]
+    values = [None if value is _MISSING else value for value in values]
+    if op in ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte"):
+        order = _bson_compare(values[0], values[1])
+        return {"$eq": order == 0, "$ne": order != 0, "$gt": order > 0, "$gte": order >= 0,
+                "$lt": order < 0, "$lte": order <= 0}[op]
+    if op == "$and":
+        return all(truthy(value) for value in values)
+    if op == "$or":
+        return any(truthy(value) for value in values)
+    if op == "$not":
+        return not truthy(values[0])
+    if op == "$ifNull":
+        return next((value for value in values if value is not None), None)
+    if op in ("$min", "$max"):
+        if not isinstance(argument, list) and isinstance(values[0], list):
+            values = values[0]
+        return _extreme(values, op == "$max")
+    if op == "$sum":
+        if not isinstance(argument, list) and isinstance(values[0], list):
+            values = values[0]
+        return sum(value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool))
+    if op == "$size":
+        if not isinstance(values[0], list):
+            raise unsupported("The argument to $size must be an array")
+        return len(values[0])
+    if op == "$in":
+        return values[0] in (values[1] or [])
+    if op == "$add":
+        return sum(values)
+    if op == "$subtract":
+        return values[0] - values[1]
+    if op == "$concat":
+        return None if None in values else "".join(values)
+    if op == "$toLower":
+        return (values[0] or "").lower()
+    if op == "$arrayElemAt":
+        array, index = values
+        return array[index] if array and -len(array) <= index < len(array) else _MISSING
+    raise unsupported(f"Unrecognized expression '{op}'")
+
+
+def project(document: dict, projection: Optional[Any], text: Optional[TextQuery] = None) -> dict:
+    """Apply an inclusion or exclusion projection to a copy of the document"""
+    original = document
+    document = clone(document)
+    if not projection:
+        return document
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+
+    scores = [field for field, flag in projection.items() if isinstance(flag, dict) and "$meta" in flag]
+    if scores:
+        projection = {field: flag for field, flag in projection.items() if field not in scores}
+        document = project(original, projection) if projection else document
+        for field in scores:
+            document[field] = text.score(original) if text else 0.0
+        return document
+
+    include = [field for field, flag in projection.items() if flag and field != "_id"]
+    if include:
+        result = {}
+        if projection.get("_id", 1) and "_id" in document:
+            result["_id"] = document["_id"]
+        for field in include:
+            value = get_path(document, field)
+            if value is not _MISSING:
+                set_path(result, field, value)
+        return result
+
+    for field, flag in projection.items():
+        if not flag:
+            unset_path(document, field)
+    return document
+
+
+def apply_update(document: dict, update: dict, inserting: bool = False):
+    """Apply update operators to a document in place"""
+    if not any(key.startswith("$") for key in update):
+        # A replacement document keeps only the _id
+        _id = document.get("_id")
+        document.clear()
+        document.update(clone(update))
+        if _id is not None:
+            document["_id"] = _id
+        return
+
+    for op, fields in update.items():
+        for path, argument in fields.items():
+            current = get_path(document, path)
+            if op == "$set":
+                set_path(document, path, clone(argument))
+            elif op == "$setOnInsert":
+                if inserting:
+                    set_path(document, path, clone(argument))
+            elif op == "$unset":
+                unset_path(document, path)
+            elif op == "$inc":
+                set_path(document, path, (0 if current is _MISSING or current is None else current) + argument)
+            elif op in ("$max", "$min"):
+                if current is _MISSING or current is None:
+                    set_path(document, path, argument)
+                    continue
+                bigger = sort_key(argument) > sort_key(current)
+                if bigger == (op == "$max") and argument != current:
+                    set_path(document, path, argument)
+            elif op in ("$push", "$addToSet"):
+                items = current if isinstance(current, list) else []
+                values = argument["$each"] if isinstance(argument, dict) and "$each" in argument else [argument]
+                for value in values:
+                    if op == "$push" or value not in items:
+                        items.append(clone(value))
+                set_path(document, path, items)
+            elif op == "$pull":
+                if isinstance(current, list):
+                    keep = [
+                        item for item in current
+                        if not (matches(item, argument) if isinstance(item, dict) and isinstance(argument, dict)
+                                else _match_condition(item, argument))
+                    ]
+                    set_path(document, path, keep)
+            else:
+                raise unsupported(f"Unknown modifier: {op}")
+
+
+def _upsert_seed(query: dict) -> dict:
+    """Equality fields of a filter, which an upsert copies into the new document"""
+    seed = {}
+    for key, condition in query.items():
+        if key.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            if "$eq" in condition:
+                set_path(seed, key, condition["$eq"])
+            continue
+        set_path(seed, key, clone(condition))
+    return seed
+
+
+def sort_documents(documents: list, spec, text: Optional[TextQuery] = None) -> list:
+    """Stable sorts applied from the last key to the first give a multi-key ordering"""
+    for field, direction in reversed(list(spec.items() if isinstance(spec, dict) else spec)):
+        if isinstance(direction, dict):
+            # {"$meta": "textScore"} sorts best match first
+            documents.sort(key=lambda doc: text.score(doc) if text else 0.0, reverse=True)
+        else:
+            documents.sort(key=lambda doc: sort_key(get_path(doc, field)), reverse=direction < 0)
+    return documents
+
+
+def _group_key(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple((key, _group_key(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_group_key(item) for item in value)
+    return value
+
+
+def _accumulate(op: str, values: list) -> Any:
+    present = [value for value in values if value is not _MISSING]
+    if op == "$sum":
+        return sum(value for value in present if isinstance(value, (int, float)) and not isinstance(value, bool))
+    if op == "$avg":
+        numbers = [value for value in present if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        return sum(numbers) / len(numbers) if numbers else None
+    if op in ("$max", "$min"):
+        return _extreme(present, op == "$max")
+    if op == "$first":
+        return values[0] if values and values[0] is not _MISSING else None
+    if op == "$last":
+        return values[-1] if values and values[-1] is not _MISSING else None
+    if op == "$push":
+        return present
+    if op == "$addToSet":
+        unique = []
+        for value in present:
+            if value not in unique:
+                unique.append(value)
+        return unique
+    raise unsupported(f"unknown group operator '{op}'")
+
+
+def _project_stage(document: dict, spec: dict, variables: Optional[dict]) -> dict:
+    exclude = [field for field, value in spec.items() if value in (0, False)]
+    if len(exclude) == len(spec):
+        return project(document, spec)
+    result = {}
+    if spec.get("_id", 1) not in (0, False) and "_id" in document:
+        result["_id"] = document["_id"]
+    for field, value in spec.items():
+        if field == "_id" and value in (0, 1, True, False):
+            continue
+        value = get_path(document, field) if value in (1, True) else evaluate(value, document, variables)
+        if value is not _MISSING:
+            set_path(result, field, value)
+    return result
+
+
+def run_pipeline(database: "MemoryDatabase", collection: "MemoryCollection", documents: list, pipeline: list,
+                 variables: Optional[dict] = None) -> list:
+    """Run aggregation stages over documents, which are never modified"""
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            text = collection._text_query(spec)
+            documents = [doc for doc in documents if matches(doc, spec, text, variables)]
+        elif name == "$sort":
+            documents = sort_documents(list(documents), spec)
+        elif name == "$skip":
+            documents = documents[spec:]
+        elif name == "$limit":
+            documents = documents[:spec]
+        elif name == "$project":
+            documents = [_project_stage(doc, spec, variables) for doc in documents]
+        elif name in ("$addFields", "$set"):
+            added = []
+            for doc in documents:
+                doc = dict(doc)
+                for field, expression in spec.items():
+                    value = evaluate(expression, doc, variables)
+                    if value is _MISSING:
+                        unset_path(doc, field)
+                    else:
+                        set_path(doc, field, value)
+                added.append(doc)
+            documents = added
+        elif name == "$unwind":
+            options = spec if isinstance(spec, dict) else {"path": spec}
+            path = options["path"][1:]
+            unwound = []
+            for doc in documents:
+                value = get_path(doc, path)
+                if isinstance(value, list) and value:
+                    for item in value:
+                        doc_copy = clone(doc)
+                        set_path(doc_copy, path, item)
+                        unwound.append(doc_copy)
+                elif value is not _MISSING and value is not None and not isinstance(value, list):
+                    unwound.append(doc)
+                elif options.get("preserveNullAndEmptyArrays"):
+                    unwound.append(doc)
+            documents = unwound
+        elif name == "$group":
+            groups = {}
+            for doc in documents:
+                key = evaluate(spec["_id"], doc, variables)
+                key = None if key is _MISSING else key
+                group = groups.setdefault(_group_key(key), {"_id": key, "values": {}})
+                for field, accumulator in spec.items():
+                    if field == "_id":
+                        continue
+                    (op, expression), = accumulator.items()
+                    value = 1 if op == "$count" else evaluate(expression, doc, variables)
+                    group["values"].setdefault(field, []).append(value)
+            results = []
+            for group in groups.values():
+                result = {"_id": group["_id"]}
+                for field, accumulator in spec.items():
+                    if field != "_id":
+                        (op, _), = accumulator.items()
+                        values = group["values"].get(field, [])
+                        result[field] = len(values) if op == "$count" else _accumulate(op, values)
+                results.append(result)
+            documents = results
+        elif name == "$lookup":
+            foreign = database.get_collection(spec["from"])
+            joined = []
+            for doc in documents:
+                candidates = foreign._documents
+                if "localField" in spec:
+                    local = get_path(doc, spec["localField"])
+                    local = local if isinstance(local, list) else [None if local is _MISSING else local]
+                    candidates = [other for other in candidates
+                                  if any(_equals(get_path(other, spec["foreignField"]), value) for value in local)]
+                if "pipeline" in spec:
+                    bound = {name: evaluate(expression, doc, variables) for name, expression in spec.get("let", {}).items()}
+                    candidates = run_pipeline(database, foreign, candidates, spec["pipeline"], {**(variables or {}), **bound})
+                joined.append({**doc, spec["as"]: [clone(other) for other in candidates]})
+            documents = joined
+        elif name == "$count":
+            documents = [{spec: len(documents)}] if documents else []
+        else:
+            raise unsupported(f"Unrecognized pipeline stage name: '{name}'")
+    return documents
+
+
+class _Cursor:
+    """to_list and async iteration over the results of the subclass's _evaluate()"""
+
+    def __init__(self, collection: "MemoryCollection"):
+        self._collection = collection
+        self._results = None
+
+    def batch_size(self, size: int):
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> list:
+        await self._collection.database.round_trip()
+        documents = self._evaluate()
+        return documents[:length] if length else documents
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._results is None:
+            await self._collection.database.round_trip()
+            self._results = iter(self._evaluate())
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCursor(_Cursor):
+    """Lazy find() result supporting sort, skip, limit, to_list and async iteration"""
+
+    def __init__(self, collection: "MemoryCollection", query: Optional[dict], projection: Optional[Any]):
+        super().__init__(collection)
+        self._query = query
+        self._projection = projection
+        self._sort = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction: Optional[int] = None) -> "MemoryCursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction or 1)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def skip(self, count: int) -> "MemoryCursor":
+        self._skip = count
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def _evaluate(self) -> list:
+        text = self._collection._text_query(self._query)
+        documents = [doc for doc in self._collection._documents if matches(doc, self._query, text)]
+        sort_documents(documents, self._sort, text)
+        documents = documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return [project(doc, self._projection, text) for doc in documents]
+
+
+class AggregationCursor(_Cursor):
+    def __init__(self, collection: "MemoryCollection", pipeline: list):
+        super().__init__(collection)
+        self._pipeline = pipeline
+
+    def _evaluate(self) -> list:
+        collection = self._collection
+        documents = run_pipeline(collection.database, collection, collection._documents, self._pipeline)
+        return [clone(doc) for doc in documents]
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._documents = []
+        self._unique = {}
+        self._text_fields = None
+        # Tokenized text of indexed documents by id(), dropped on every write
+        self._text_cache = {}
+
+    def _text_query(self, query: Optional[dict]) -> Optional[TextQuery]:
+        if not query or "$text" not in query:
+            return None
+        if self._text_fields is None:
+            raise OperationFailure("text index required for $text query", INDEX_NOT_FOUND)
+        return TextQuery(query["$text"]["$search"], self._text_fields, self._text_cache)
+
+    def _matcher(self, query: Optional[dict]):
+        text = self._text_query(query)
+        return lambda doc: matches(doc, query, text)
+
+    # Reads
+
+    def find(self, filter: Optional[dict] = None, projection: Optional[Any] = None, **kwargs) -> MemoryCursor:
+        cursor = MemoryCursor(self, filter, projection)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        if kwargs.get("skip"):
+            cursor.skip(kwargs["skip"])
+        if kwargs.get("limit"):
+            cursor.limit(kwargs["limit"])
+        return cursor
+
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[Any] = None, **kwargs) -> Optional[dict]:
+        documents = await self.find(filter, projection, **kwargs).limit(1).to_list(1)
+        return documents[0] if documents else None
+
+    async def count_documents(self, filter: dict, **kwargs) -> int:
+        await self.database.round_trip()
+        matcher = self._matcher(filter)
+        return sum(1 for doc in self._documents if matcher(doc))
+
+    async def estimated_document_count(self) -> int:
+        await self.database.round_trip()
+        return len(self._documents)
+
+    async def distinct(self, key: str, filter: Optional[dict] = None) -> list:
+        await self.database.round_trip()
+        values = []
+        matcher = self._matcher(filter)
+        for doc in self._documents:
+            value = get_path(doc, key)
+            if matcher(doc) and value is not _MISSING and value not in values:
+                values.append(value)
+        return values
+
+    def aggregate(self, pipeline: list, **kwargs) -> AggregationCursor:
+        return AggregationCursor(self, pipeline)
+
+    # Writes
+
+    @staticmethod
+    def _index_key(document: dict, fields: list, sparse: bool, partial: Optional[dict]) -> Optional[tuple]:
+        """The document's key in a unique index, or None when the index leaves it out
+
+        Like MongoDB, a missing field is indexed as null unless the index is
+        sparse (which skips documents missing every field) or partial.
+        """
+        if partial is not None and not matches(document, partial):
+            return None
+        values = [get_path(document, field) for field in fields]
+        if sparse and all(value is _MISSING for value in values):
+            return None
+        return tuple(None if value is _MISSING else value for value in values)
+
+    def _check_unique(self, document: dict, ignore: Optional[dict] = None):
+        for name, index in self._unique.items():
+            key = self._index_key(document, *index)
+            if key is None:
+                continue
+            for other in self._documents:
+                if other is not ignore and self._index_key(other, *index) == key:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}",
+                                            DUPLICATE_KEY_ERROR)
+
+    def _insert(self, document: dict) -> Any:
+        # Like Motor, the caller's document gets the generated _id
+        document.setdefault("_id", ObjectId())
+        self._check_unique(document)
+        self._text_cache.clear()
+        self._documents.append(clone(document))
+        return document["_id"]
+
+    async def insert_one(self, document: dict, **kwargs) -> InsertOneResult:
+        await self.database.round_trip()
+        return InsertOneResult(self._insert(document), True)
+
+    async def insert_many(self, documents: list, ordered: bool = True, **kwargs) -> InsertManyResult:
+        await self.database.round_trip()
+        inserted, errors = [], []
+        for index, document in enumerate(documents):
+            try:
+                inserted.append(self._insert(document))
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": DUPLICATE_KEY_ERROR, "errmsg": str(e), "op": document})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return InsertManyResult(inserted, True)
+
+    def _update(self, filter: dict, update: dict, upsert: bool, many: bool) -> UpdateResult:
+        matched = modified = 0
+        matcher = self._matcher(filter)
+        for doc in self._documents:
+            if not matcher(doc):
+                continue
+            before = clone(doc)
+            self._text_cache.clear()
+            apply_update(doc, update)
+            try:
+                self._check_unique(doc, ignore=doc)
+            except DuplicateKeyError:
+                doc.clear()
+                doc.update(before)
+                raise
+            matched += 1
+            modified += doc != before
+            if not many:
+                break
+        upserted_id = None
+        if not matched and upsert:
+            document = _upsert_seed(filter)
+            apply_update(document, update, inserting=True)
+            upserted_id = self._insert(document)
+        return UpdateResult({"n": matched or int(upserted_id is not None), "nModified": modified,
+                             "upserted": upserted_id}, True)
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        await self.database.round_trip()
+        return self._update(filter, update, upsert, many=False)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        await self.database.round_trip()
+        return self._update(filter, update, upsert, many=True)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        await self.database.round_trip()
+        return self._update(filter, replacement, upsert, many=False)
+
+    def _delete(self, filter: dict, many: bool) -> int:
+        keep, deleted = [], 0
+        matcher = self._matcher(filter)
+        for doc in self._documents:
+            if (many or not deleted) and matcher(doc):
+                deleted += 1
+            else:
+                keep.append(doc)
+        self._documents = keep
+        self._text_cache.clear()
+        return deleted
+
+    async def delete_one(self, filter: dict, **kwargs) -> DeleteResult:
+        await self.database.round_trip()
+        return DeleteResult({"n": self._delete(filter, many=False)}, True)
+
+    async def delete_many(self, filter: dict, **kwargs) -> DeleteResult:
+        await self.database.round_trip()
+        return DeleteResult({"n": self._delete(filter, many=True)}, True)
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection: Optional[Any] = None,
+                                  sort=None, upsert: bool = False,
+                                  return_document: bool = ReturnDocument.BEFORE, **kwargs) -> Optional[dict]:
+        await self.database.round_trip()
+        cursor = MemoryCursor(self, filter, None)
+        if sort:
+            cursor.sort(sort)
+        found = cursor._evaluate()[:1]
+        if not found:
+            if not upsert:
+                return None
+            result = self._update(filter, update, upsert=True, many=False)
+            document = next(doc for doc in self._documents if doc["_id"] == result.upserted_id)
+            return project(document, projection) if return_document == ReturnDocument.AFTER else None
+
+        document = next(doc for doc in self._documents if doc["_id"] == found[0]["_id"])
+        before = project(document, projection)
+        self._update({"_id": document["_id"]}, update, upsert=False, many=False)
+        return project(document, projection) if return_document == ReturnDocument.AFTER else before
+
+    async def find_one_and_delete(self, filter: dict, projection: Optional[Any] = None, sort=None,
+                                  **kwargs) -> Optional[dict]:
+        await self.database.round_trip()
+        cursor = MemoryCursor(self, filter, None)
+        if sort:
+            cursor.sort(sort)
+        found = cursor._evaluate()[:1]
+        if not found:
+            return None
+        self._delete({"_id": found[0]["_id"]}, many=False)
+        return project(found[0], projection)
+
+    async def bulk_write(self, requests: list, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        await self.database.round_trip()
+        counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0, "upserted": []}
+        errors = []
+        for index, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    self._insert(request._doc)
+                    counts["nInserted"] += 1
+                elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+                    result = self._update(request._filter, request._doc, bool(request._upsert),
+                                          many=isinstance(request, UpdateMany))
+                    if result.upserted_id is not None:
+                        counts["nUpserted"] += 1
+                        counts["upserted"].append({"index": index, "_id": result.upserted_id})
+                    else:
+                        counts["nMatched"] += result.matched_count
+                        counts["nModified"] += result.modified_count
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    counts["nRemoved"] += self._delete(request._filter, many=isinstance(request, DeleteMany))
+                else:
+                    raise TypeError(f"{request!r} is not a valid request")
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": DUPLICATE_KEY_ERROR, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({**counts, "writeErrors": errors})
+        return BulkWriteResult(counts, True)
+
+    # Indexes
+
+    async def create_index(self, keys, unique: bool = False, name: Optional[str] = None, sparse: bool = False,
+                           partialFilterExpression: Optional[dict] = None, **kwargs) -> str:
+        await self.database.round_trip()
+        unknown = set(kwargs) - INDEX_OPTIONS
+        if unknown:
+            raise unsupported(f"unsupported index options: {', '.join(sorted(unknown))}")
+        if kwargs.get("default_language", "english") != "english":
+            raise unsupported("text indexes only support default_language english")
+        if sparse and partialFilterExpression is not None:
+            raise unsupported("cannot mix partialFilterExpression and sparse")
+        keys = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        text_fields = [field for field, direction in keys if direction == "text"]
+        if text_fields:
+            name = name or "_".join(f"{field}_text" for field in text_fields)
+            self._text_fields = text_fields
+            self._text_cache.clear()
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        if unique:
+            self._unique[name] = ([field for field, _ in keys], sparse, partialFilterExpression)
+        return name
+
+    async def drop(self):
+        await self.database.round_trip()
+        self._documents = []
+        self._unique = {}
+        self._text_fields = None
+        self._text_cache.clear()
+
+
+class MemoryDatabase:
+    """Collections are created on first access, like Motor's"""
+
+    def __init__(self, name: str = "memory", latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.round_trips = 0
+        self._collections = {}
+
+    async def round_trip(self):
+        self.round_trips += 1
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        # sleep(0) still yields to the loop, as a real network round trip would
+        await asyncio.sleep(delay / 1000)
+
+    def get_collection(self, name: str, **kwargs) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.get_collection(name)
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    async def list_collection_names(self) -> list:
+        await self.round_trip()
+        return [name for name, collection in self._collections.items() if collection._documents]
+
+    async def drop_collection(self, name: str):
+        await self.get_collection(name).drop()
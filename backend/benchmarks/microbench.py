@@ -0,0 +1,210 @@
+"""
+Microbenchmark suite for the per-request hot paths
+Times token creation and decoding, password verification, the proxy's
+header filtering and response building, List[model] validation and
+serialization of clients, therapies and contact submissions at 1, 100 and
+10,000 documents, and contact notification rendering.
+
+Each case is calibrated to run for about --target-ms per repeat; the
+median and minimum time per call over --repeat repeats are reported.
+Results can be saved as a JSON baseline and a later run compared against
+it: cases whose median got slower by more than --threshold percent are
+flagged and the command exits with status 1.
+
+It lives here rather than in tests/ because its output is timings that
+depend on the machine, not pass/fail checks; tests/test_microbench.py
+covers the comparison logic.
+
+Run from backend/:
+    python -m benchmarks.microbench --save benchmarks/baselines/main.json
+    python -m benchmarks.microbench --compare benchmarks/baselines/main.json [--threshold 10]
+    python -m benchmarks.microbench --filter schema.Client
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from starlette.datastructures import Headers
+
+from benchmarks.bench_serialization import make_clients, make_contacts, make_therapies
+from models.schemas import Client, ContactSubmission, Therapy
+from services.auth_service import auth_service
+from services.email_templates import email_templates
+from services.json_response import list_adapter, serialize_list
+from services.node_proxy import build_proxy_response, forward_headers
+
+SIZES = (1, 100, 10_000)
+
+
+def request_headers() -> Headers:
+    """Headers of a typical admin API call from a browser through the ingress"""
+    return Headers(raw=[(k.encode(), v.encode()) for k, v in (
+        ("host", "whitedovewellness.co.uk"),
+        ("content-length", "142"),
+        ("content-type", "application/json"),
+        ("accept", "application/json, text/plain, */*"),
+        ("accept-encoding", "gzip, deflate, br"),
+        ("accept-language", "en-GB,en;q=0.9"),
+        ("authorization", "Bearer " + "x" * 220),
+        ("origin", "https://whitedovewellness.co.uk"),
+        ("referer", "https://whitedovewellness.co.uk/admin/clients"),
+        ("user-agent", "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 Safari/605.1.15"),
+        ("x-forwarded-for", "203.0.113.7"),
+        ("x-forwarded-proto", "https"),
+        ("sec-fetch-mode", "cors"),
+        ("sec-fetch-site", "same-origin")
+    )])
+
+
+def node_response(body: bytes) -> httpx.Response:
+    """An Express JSON response as httpx hands it to the proxy"""
+    return httpx.Response(200, content=body, headers={
+        "x-powered-by": "Express",
+        "access-control-allow-origin": "*",
+        "access-control-allow-credentials": "true",
+        "content-type": "application/json; charset=utf-8",
+        "content-length": str(len(body)),
+        "etag": 'W/"8f-3hD9vNf0m1x5cQ"',
+        "date": "Mon, 01 Jan 2024 00:00:00 GMT",
+        "connection": "keep-alive",
+        "keep-alive": "timeout=5"
+    })
+
+
+def build_cases() -> dict:
+    """Map of case name to a zero-argument callable"""
+    tokens = auth_service.create_tokens("3f2b6c1e-7a8d-4e59-9b0c-2d4f6a8e1c3b", "admin")
+    password_hash = auth_service.hash_password("admin123")
+    headers = request_headers()
+    therapies_body = serialize_list(Therapy, make_therapies(6))
+
+    cases = {
+        "auth.create_tokens": lambda: auth_service.create_tokens("3f2b6c1e-7a8d-4e59-9b0c-2d4f6a8e1c3b", "admin"),
+        "auth.decode_token": lambda: auth_service.decode_token(tokens["access_token"]),
+        "auth.verify_password": lambda: auth_service.verify_password("admin123", password_hash),
+        "proxy.forward_headers": lambda: forward_headers(headers),
+        "proxy.build_response": lambda: build_proxy_response(node_response(therapies_body)),
+        "email.contact_notification": lambda: email_templates.render(
+            "contact_notification", name="Jane Doe", email="jane@example.com", phone="07700 900123",
+            message="I'd like to book a reflexology session next week. " * 4
+        )
+    }
+
+    for name, model, make in (
+        ("Client", Client, make_clients),
+        ("Therapy", Therapy, make_therapies),
+        ("ContactSubmission", ContactSubmission, make_contacts)
+    ):
+        adapter = list_adapter(model)
+        for size in SIZES:
+            documents = make(size)
+            validated = adapter.validate_python(documents)
+            cases[f"schema.{name}.validate[{size}]"] = lambda a=adapter, d=documents: a.validate_python(d)
+            cases[f"schema.{name}.dump_json[{size}]"] = lambda a=adapter, v=validated: a.dump_json(v)
+    return cases
+
+
+def format_us(us: float) -> str:
+    if us >= 1e6:
+        return f"{us / 1e6:.2f}s"
+    if us >= 1e3:
+        return f"{us / 1e3:.2f}ms"
+    return f"{us:.2f}us"
+
+
+def measure(fn, repeat: int, target_ms: float) -> dict:
+    """Median and minimum microseconds per call, with loops calibrated to fill target_ms"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed * 1000 >= target_ms / 5 or loops >= 1_000_000:
+            break
+        loops *= 10
+    loops = max(1, int(loops * target_ms / 1000 / max(elapsed, 1e-9)))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return {
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "min_us": round(min(samples) * 1e6, 3),
+        "loops": loops,
+        "repeat": repeat
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print the change of every case against a baseline; return the regressed case names"""
+    regressions = []
+    print(f"\n{'case':<40} {'baseline':>12} {'now':>12} {'change':>9}")
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if not before:
+            print(f"{name:<40} {'-':>12} {format_us(result['median_us']):>12} {'new':>9}")
+            continue
+        change = (result["median_us"] - before["median_us"]) / before["median_us"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<40} {format_us(before['median_us']):>12} {format_us(result['median_us']):>12} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main(args) -> int:
+    cases = {name: fn for name, fn in build_cases().items() if not args.filter or args.filter in name}
+    if not cases:
+        sys.exit(f"No cases match {args.filter!r}")
+
+    results = {}
+    print(f"{'case':<40} {'median':>12} {'min':>12} {'loops':>9}")
+    for name, fn in cases.items():
+        results[name] = measure(fn, args.repeat, args.target_ms)
+        row = results[name]
+        print(f"{name:<40} {format_us(row['median_us']):>12} {format_us(row['min_us']):>12} {row['loops']:>9}", flush=True)
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "results": results
+        }, indent=2))
+        print(f"baseline written to {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) more than {args.threshold:g}% slower than {args.compare}")
+            return 1
+        print(f"\nno regressions beyond {args.threshold:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=200, help="time per repeat")
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--compare", help="compare against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=10, help="percent slowdown reported as a regression")
+    sys.exit(main(parser.parse_args()))
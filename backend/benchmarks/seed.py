@@ -0,0 +1,211 @@
+"""
+Benchmark data seeder
+Fills a database with realistic synthetic data: an admin user (admin /
+admin123), therapies, prices, clients with their normalized duplicate
+keys and note statistics kept consistent with the notes seeded for them,
+client notes and contact submissions. Works with a Motor database or a
+benchmarks.memory_db.MemoryDatabase, inserting in batches.
+
+Run from backend/:
+    python -m benchmarks.seed [--clients 2000] [--notes 20000] [--contacts 5000]
+    python -m benchmarks.seed --mongo-url mongodb://localhost:27017 --database whitedove_bench
+Without --mongo-url the data is seeded into memory and the document counts
+and seeding time are reported, which is mostly useful as a smoke test.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from benchmarks.bench_note_search import VOCABULARY
+from benchmarks.memory_db import MemoryDatabase
+from services.auth_service import auth_service
+from services.client_import import client_keys
+
+ADMIN_ID = "bench-admin"
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin123"
+BATCH_SIZE = 1000
+
+FIRST_NAMES = (
+    "Olivia", "Amelia", "Isla", "Ava", "Mia", "Grace", "Sophia", "Lily", "Emily", "Freya",
+    "Oliver", "George", "Noah", "Arthur", "Harry", "Leo", "Jack", "Charlie", "Oscar", "Jacob"
+)
+LAST_NAMES = (
+    "Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Patel", "Robinson",
+    "Wright", "Thompson", "Evans", "Walker", "White", "Roberts", "Green", "Hall", "Thomas", "Clarke"
+)
+TOWNS = ("Bristol", "Bath", "Keynsham", "Portishead", "Clevedon", "Weston-super-Mare", "Thornbury")
+THERAPIES = (
+    ("Reflexology", "Footprints"), ("Reiki", "Sparkles"), ("Aromatherapy Massage", "Flower"),
+    ("Hopi Ear Candling", "Flame"), ("Indian Head Massage", "Brain"), ("Maternity Reflexology", "Baby")
+)
+
+
+def make_admin() -> dict:
+    return {
+        "id": ADMIN_ID,
+        "username": ADMIN_USERNAME,
+        "email": "admin@example.com",
+        "password_hash": auth_service.hash_password(ADMIN_PASSWORD),
+        "is_active": True,
+        "created_at": datetime.now(timezone.utc)
+    }
+
+
+def make_therapies() -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "short_description": f"{name} to help you relax and restore balance.",
+            "full_description": f"{name} is a gentle, non-invasive complementary therapy. " * 6,
+            "image_url": None,
+            "icon": icon,
+            "display_order": i,
+            "is_active": True,
+            "created_at": now
+        }
+        for i, (name, icon) in enumerate(THERAPIES)
+    ]
+
+
+def make_prices() -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"{name} - {minutes} minutes",
+            "duration": f"{minutes} minutes",
+            "price": float(30 + minutes // 2),
+            "description": None,
+            "display_order": i,
+            "is_active": True,
+            "created_at": now
+        }
+        for i, (name, minutes) in enumerate((name, minutes) for name, _ in THERAPIES for minutes in (30, 60))
+    ]
+
+
+def make_clients(count: int, rng: random.Random) -> list:
+    created = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    clients = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        client = {
+            "id": str(uuid.uuid4()),
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first}.{last}{i}@example.com".lower() if rng.random() < 0.9 else None,
+            "phone": f"07700 9{rng.randrange(100000):05d}" if rng.random() < 0.8 else None,
+            "address": f"{rng.randint(1, 200)} {rng.choice(LAST_NAMES)} Road, {rng.choice(TOWNS)}",
+            "date_of_birth": date(rng.randint(1950, 2004), rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+            "medical_notes": " ".join(rng.choices(VOCABULARY, k=rng.randint(0, 30))) or None,
+            "created_at": created + timedelta(minutes=i * 37),
+            "updated_at": created + timedelta(minutes=i * 37),
+            "note_count": 0,
+            "last_session_date": None,
+            "last_note_at": None
+        }
+        client.update(client_keys(client))
+        clients.append(client)
+    return clients
+
+
+def make_notes(clients: list, count: int, rng: random.Random) -> list:
+    """Notes skewed towards regular clients; updates each client's note statistics to match"""
+    notes = []
+    weights = [rng.paretovariate(1.2) for _ in clients]
+    for client in rng.choices(clients, weights=weights, k=count) if clients else ():
+        created_at = client["created_at"] + timedelta(days=rng.randrange(1, 1200), minutes=rng.randrange(1440))
+        session_date = (created_at.date() - timedelta(days=rng.randrange(3))).isoformat() if rng.random() < 0.85 else None
+        notes.append({
+            "id": str(uuid.uuid4()),
+            "client_id": client["id"],
+            "note": " ".join(rng.choices(VOCABULARY, k=rng.randint(12, 60))),
+            "session_date": session_date,
+            "created_at": created_at,
+            "created_by": ADMIN_USERNAME
+        })
+        client["note_count"] += 1
+        client["last_note_at"] = max(filter(None, (client["last_note_at"], created_at)))
+        if session_date:
+            client["last_session_date"] = max(filter(None, (client["last_session_date"], session_date)))
+    notes.sort(key=lambda note: note["created_at"])
+    return notes
+
+
+def make_contacts(count: int, rng: random.Random) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "email": f"visitor{i}@example.com",
+            "phone": f"07700 9{rng.randrange(100000):05d}" if rng.random() < 0.5 else None,
+            "message": " ".join(rng.choices(VOCABULARY, k=rng.randint(8, 80))),
+            "preferred_contact": rng.choice(("email", "phone")),
+            "created_at": now - timedelta(minutes=i * 41),
+            "is_read": i > 20 and rng.random() < 0.9,
+            "notes": None
+        }
+        for i in range(count)
+    ]
+
+
+async def insert_batches(collection, documents: list, batch_size: int = BATCH_SIZE):
+    for start in range(0, len(documents), batch_size):
+        await collection.insert_many(documents[start:start + batch_size], ordered=False)
+
+
+async def seed(db, clients: int = 2000, notes: int = 20000, contacts: int = 5000, seed: int = 7) -> dict:
+    """Seed every collection the admin and public endpoints read; returns document counts"""
+    rng = random.Random(seed)
+    client_docs = make_clients(clients, rng)
+    collections = {
+        "admin_users": [make_admin()],
+        "therapies": make_therapies(),
+        "prices": make_prices(),
+        "client_notes": make_notes(client_docs, notes, rng),
+        "clients": client_docs,
+        "contact_submissions": make_contacts(contacts, rng)
+    }
+    for name, documents in collections.items():
+        await insert_batches(db[name], documents)
+    return {name: len(documents) for name, documents in collections.items()}
+
+
+async def main(args):
+    client = None
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url, tz_aware=True)
+        db = client[args.database]
+    else:
+        db = MemoryDatabase()
+
+    try:
+        start = time.perf_counter()
+        counts = await seed(db, args.clients, args.notes, args.contacts, args.seed)
+        elapsed = time.perf_counter() - start
+        for name, count in counts.items():
+            print(f"{name:<20} {count:>8}")
+        print(f"seeded {sum(counts.values())} documents in {elapsed:.2f}s")
+    finally:
+        if client:
+            client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--notes", type=int, default=20000)
+    parser.add_argument("--contacts", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mongo-url", help="seed this MongoDB server instead of memory")
+    parser.add_argument("--database", default="whitedove_bench")
+    asyncio.run(main(parser.parse_args()))
@@ -79,7 +79,7 @@ class DatabaseConfig {
           email: 'admin@whitedovewellness.com',
           password_hash: hashedPassword,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         };
         
         await this.collections.adminUsers.insertOne(adminUser);
@@ -107,7 +107,7 @@ class DatabaseConfig {
           icon: 'Footprints',
           display_order: 1,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         },
         {
           id: uuidv4(),
@@ -117,7 +117,7 @@ class DatabaseConfig {
           icon: 'Hand',
           display_order: 2,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         },
         {
           id: uuidv4(),
@@ -127,7 +127,7 @@ class DatabaseConfig {
           icon: 'Flower2',
           display_order: 3,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         },
         {
           id: uuidv4(),
@@ -137,7 +137,7 @@ class DatabaseConfig {
           icon: 'Gem',
           display_order: 4,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         },
         {
           id: uuidv4(),
@@ -147,7 +147,7 @@ class DatabaseConfig {
           icon: 'Sparkles',
           display_order: 5,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         },
         {
           id: uuidv4(),
@@ -157,7 +157,7 @@ class DatabaseConfig {
           icon: 'Smile',
           display_order: 6,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         }
       ];
 
@@ -176,7 +176,7 @@ class DatabaseConfig {
           description: `A shorter ${therapy.name.toLowerCase()} session, perfect for a quick relaxation boost.`,
           display_order: 1,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         });
         prices.push({
           id: uuidv4(),
@@ -187,7 +187,7 @@ class DatabaseConfig {
           description: `Our most popular ${therapy.name.toLowerCase()} treatment, allowing full relaxation.`,
           display_order: 2,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         });
       }
 
@@ -203,7 +203,7 @@ class DatabaseConfig {
           website_url: 'https://www.aor.org.uk',
           display_order: 1,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         },
         {
           id: uuidv4(),
@@ -212,7 +212,7 @@ class DatabaseConfig {
           website_url: 'https://www.fht.org.uk',
           display_order: 2,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         },
         {
           id: uuidv4(),
@@ -221,7 +221,7 @@ class DatabaseConfig {
           website_url: 'https://www.cnhc.org.uk',
           display_order: 3,
           is_active: true,
-          created_at: new Date().toISOString()
+          created_at: new Date()
         }
       ];
 
@@ -237,8 +237,8 @@ class DatabaseConfig {
           content: '# Privacy Policy\n\nYour privacy is important to us. This policy explains how we collect, use, and protect your personal information.\n\n## Information We Collect\n\nWe collect information you provide directly to us, such as when you book an appointment, fill out a form, or contact us.\n\n## How We Use Your Information\n\nWe use the information we collect to provide, maintain, and improve our services.',
           display_order: 1,
           is_active: true,
-          created_at: new Date().toISOString(),
-          updated_at: new Date().toISOString()
+          created_at: new Date(),
+          updated_at: new Date()
         },
         {
           id: uuidv4(),
@@ -247,8 +247,8 @@ class DatabaseConfig {
           content: '# Terms of Service\n\nBy using our services, you agree to these terms.\n\n## Appointments\n\nAll appointments must be booked in advance. We require 24 hours notice for cancellations.\n\n## Payment\n\nPayment is due at the time of service unless otherwise arranged.',
           display_order: 2,
           is_active: true,
-          created_at: new Date().toISOString(),
-          updated_at: new Date().toISOString()
+          created_at: new Date(),
+          updated_at: new Date()
         },
         {
           id: uuidv4(),
@@ -257,8 +257,8 @@ class DatabaseConfig {
           content: '# Cancellation Policy\n\nWe understand that sometimes plans change.\n\n## Notice Required\n\nWe require at least 24 hours notice for cancellations or rescheduling.\n\n## Late Cancellations\n\nCancellations made with less than 24 hours notice may be subject to a cancellation fee.',
           display_order: 3,
           is_active: true,
-          created_at: new Date().toISOString(),
-          updated_at: new Date().toISOString()
+          created_at: new Date(),
+          updated_at: new Date()
         },
         {
           id: uuidv4(),
@@ -267,8 +267,8 @@ class DatabaseConfig {
           content: '# Cookie Policy\n\nThis website uses cookies to enhance your browsing experience.\n\n## What Are Cookies\n\nCookies are small text files stored on your device when you visit our website.\n\n## How We Use Cookies\n\nWe use cookies to remember your preferences and improve our services.',
           display_order: 4,
           is_active: true,
-          created_at: new Date().toISOString(),
-          updated_at: new Date().toISOString()
+          created_at: new Date(),
+          updated_at: new Date()
         }
       ];
 
@@ -298,7 +298,7 @@ class DatabaseConfig {
           ],
           contact_image_url: '/images/contact-dove.jpg'
         },
-        updated_at: new Date().toISOString()
+        updated_at: new Date()
       };
 
       await this.collections.siteSettings.updateOne(
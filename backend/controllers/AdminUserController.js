@@ -93,7 +93,7 @@ class AdminUserController {
         email,
         password_hash: hashedPassword,
         is_active: true,
-        created_at: new Date().toISOString()
+        created_at: new Date()
       };
 
       await this.collections.adminUsers.insertOne(user);
@@ -83,7 +83,7 @@ class AffiliationController {
         website_url: website_url || '',
         display_order: display_order || 0,
         is_active: is_active !== false,
-        created_at: new Date().toISOString()
+        created_at: new Date()
       };
 
       await this.collections.affiliations.insertOne(affiliation);
@@ -87,7 +87,7 @@ class ClientController {
         });
       }
 
-      const now = new Date().toISOString();
+      const now = new Date();
       const client = {
         id: uuidv4(),
         first_name,
@@ -133,7 +133,7 @@ class ClientController {
         });
       }
 
-      const updateData = { updated_at: new Date().toISOString() };
+      const updateData = { updated_at: new Date() };
       for (const field of updateFields) {
         if (req.body[field] !== undefined) {
           updateData[field] = req.body[field];
@@ -253,7 +253,7 @@ class ClientController {
         client_id: id,
         note,
         session_date: session_date || '',
-        created_at: new Date().toISOString(),
+        created_at: new Date(),
         created_by: req.user.id
       };
 
@@ -435,7 +435,7 @@ class ClientController {
       const consultation = {
         id: uuidv4(),
         client_id: id,
-        consultation_date: consultationData.consultation_date || new Date().toISOString(),
+        consultation_date: consultationData.consultation_date || new Date().toISOString().split('T')[0],
         // Client info (pre-filled from client record but can be overridden)
         client_code: consultationData.client_code || '',
         gender: consultationData.gender || '',
@@ -483,8 +483,8 @@ class ClientController {
         therapist_signature_image: consultationData.therapist_signature_image || '',
         therapist_signature_date: consultationData.therapist_signature_date || '',
         // Metadata
-        created_at: new Date().toISOString(),
-        updated_at: new Date().toISOString()
+        created_at: new Date(),
+        updated_at: new Date()
       };
 
       await this.collections.consultations.insertOne(consultation);
@@ -522,7 +522,7 @@ class ClientController {
         });
       }
 
-      updateData.updated_at = new Date().toISOString();
+      updateData.updated_at = new Date();
 
       await this.collections.consultations.updateOne(
         { id: consultationId },
@@ -31,7 +31,7 @@ class ContactController {
         message,
         is_read: false,
         notes: '',
-        created_at: new Date().toISOString()
+        created_at: new Date()
       };
 
       await this.collections.contactSubmissions.insertOne(contact);
@@ -115,7 +115,7 @@ class PolicyController {
         });
       }
 
-      const now = new Date().toISOString();
+      const now = new Date();
       const policy = {
         id: uuidv4(),
         title,
@@ -173,7 +173,7 @@ class PolicyController {
         }
       }
 
-      const updateData = { updated_at: new Date().toISOString() };
+      const updateData = { updated_at: new Date() };
       for (const field of updateFields) {
         if (req.body[field] !== undefined) {
           updateData[field] = req.body[field];
@@ -109,7 +109,7 @@ class PriceController {
         description: description || '',
         display_order: display_order || 0,
         is_active: is_active !== false,
-        created_at: new Date().toISOString()
+        created_at: new Date()
       };
 
       await this.collections.prices.insertOne(priceDoc);
@@ -159,7 +159,7 @@ class SettingsController {
 
       const updateData = {
         id: 'site_settings',
-        updated_at: new Date().toISOString()
+        updated_at: new Date()
       };
 
       for (const field of updateFields) {
@@ -95,7 +95,7 @@ class TherapyController {
         display_order: display_order || 0,
         is_active: is_active !== false,
         coming_soon: coming_soon === true,
-        created_at: new Date().toISOString()
+        created_at: new Date()
       };
 
       await this.collections.therapies.insertOne(therapy);
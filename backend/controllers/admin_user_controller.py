@@ -2,9 +2,10 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.schemas import AdminUser, AdminUserCreate, AdminUserUpdate
 from services.auth_service import auth_service
+from services.json_response import fast_list_response
+from services.timestamps import utcnow
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
-from datetime import datetime, timezone
 import uuid
 import logging
 
@@ -34,7 +35,7 @@ def create_admin_user_routes(db: AsyncIOMotorDatabase):
         """List all admin users"""
         await verify_admin(credentials, db)
         users = await db.admin_users.find({}, {"_id": 0, "password_hash": 0}).to_list(100)
-        return users
+        return fast_list_response(AdminUser, users)
     
     @router.post("/", response_model=AdminUser, status_code=status.HTTP_201_CREATED)
     async def create_admin_user(
@@ -65,7 +66,7 @@ def create_admin_user_routes(db: AsyncIOMotorDatabase):
             "email": user_data.email,
             "password_hash": auth_service.hash_password(user_data.password),
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         }
         
         await db.admin_users.insert_one(user_doc)
@@ -2,9 +2,11 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.schemas import Affiliation, AffiliationCreate, AffiliationUpdate
 from services.auth_service import auth_service
+from services.json_response import fast_list_response
+from services.timestamps import utcnow
+from services.image_variants import image_variants
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
-from datetime import datetime, timezone
 import uuid
 import logging
 
@@ -37,7 +39,7 @@ def create_affiliation_routes(db: AsyncIOMotorDatabase):
         """List all affiliations (public endpoint)"""
         query = {"is_active": True} if active_only else {}
         affiliations = await db.affiliations.find(query, {"_id": 0}).sort("display_order", 1).to_list(100)
-        return affiliations
+        return fast_list_response(Affiliation, affiliations)
     
     @router.get("/{affiliation_id}", response_model=Affiliation)
     async def get_affiliation(affiliation_id: str):
@@ -59,8 +61,9 @@ def create_affiliation_routes(db: AsyncIOMotorDatabase):
         affiliation_doc = {
             "id": affiliation_id,
             **affiliation_data.model_dump(),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         }
+        affiliation_doc["logo_variants"] = await image_variants.manifest(db, affiliation_doc["logo_url"])
         
         await db.affiliations.insert_one(affiliation_doc)
         logger.info(f"Created affiliation: {affiliation_data.name}")
@@ -81,6 +84,8 @@ def create_affiliation_routes(db: AsyncIOMotorDatabase):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Affiliation not found")
         
         update_data = {k: v for k, v in affiliation_data.model_dump().items() if v is not None}
+        if "logo_url" in update_data:
+            update_data["logo_variants"] = await image_variants.manifest(db, update_data["logo_url"])
         
         if update_data:
             await db.affiliations.update_one({"id": affiliation_id}, {"$set": update_data})
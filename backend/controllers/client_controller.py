@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from models.schemas import Client, ClientCreate, ClientUpdate, ClientNote, ClientNoteCreate, ClientNoteUpdate
+from models.schemas import Client, ClientCreate, ClientUpdate, ClientNote, ClientNoteCreate, ClientNoteUpdate, ClientNoteSearchPage, ClientDetail, ClientListItem, CLIENT_LIST_FIELDS
 from services.auth_service import auth_service
+from services.json_response import fast_list_response, fast_model_response
+from services.fieldsets import parse_fields, projection, sparse_model
+from services.client_note_stats import client_note_stats
+from services.note_search import note_search, MAX_PAGE_SIZE
+from services.client_detail import client_detail_pipeline, shape_client_detail, MAX_NOTES
+from services.client_import import ClientImporter, client_keys, detect_format, FORMATS
+from services.timestamps import utcnow
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
+import io
 import uuid
 import logging
 
@@ -29,16 +36,49 @@ async def verify_admin(credentials: HTTPAuthorizationCredentials, db: AsyncIOMot
 def create_client_routes(db: AsyncIOMotorDatabase):
     """Create client management routes"""
     
+    # Note search (declared before /{client_id} routes)
+    @router.get("/notes/search", response_model=ClientNoteSearchPage)
+    async def search_client_notes(
+        q: str = Query(..., min_length=2),
+        client_id: Optional[str] = None,
+        session_from: Optional[str] = None,
+        session_to: Optional[str] = None,
+        page: int = Query(1, ge=1),
+        page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Full-text search across all client notes, best match first (admin only)"""
+        await verify_admin(credentials, db)
+        return await note_search.search(db, q, client_id, session_from, session_to, page, page_size)
+    
     # Client CRUD
-    @router.get("/", response_model=List[Client])
+    @router.get("/", response_model=List[ClientListItem])
     async def list_clients(
         search: str = None,
+        fields: Optional[str] = None,
+        sort: Optional[str] = None,
+        has_notes: Optional[bool] = None,
+        min_notes: Optional[int] = None,
+        session_from: Optional[str] = None,
+        session_to: Optional[str] = None,
         credentials: HTTPAuthorizationCredentials = Depends(security)
     ):
-        """List all clients (admin only)"""
+        """List all clients (admin only)
+        
+        Supports ?fields=, ?sort= (last_name, note_count, last_session_date or
+        last_note_at, prefixed with - for descending) and filters on the note
+        statistics kept on each client. Without ?fields= the address, date of
+        birth and medical notes are left out; name them to include them.
+        """
         await verify_admin(credentials, db)
+        fieldset = parse_fields(Client, fields, default=CLIENT_LIST_FIELDS)
+        try:
+            sort_spec = client_note_stats.sort(sort)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        await client_note_stats.ensure_indexes(db)
         
-        query = {}
+        query = client_note_stats.query(has_notes, min_notes, session_from, session_to)
         if search:
             query["$or"] = [
                 {"first_name": {"$regex": search, "$options": "i"}},
@@ -47,22 +87,49 @@ def create_client_routes(db: AsyncIOMotorDatabase):
                 {"phone": {"$regex": search, "$options": "i"}}
             ]
         
-        clients = await db.clients.find(query, {"_id": 0}).sort("last_name", 1).to_list(500)
-        return clients
+        clients = await db.clients.find(query, projection(fieldset)).sort(sort_spec).to_list(500)
+        return fast_list_response(sparse_model(Client, fieldset), clients)
     
     @router.get("/{client_id}", response_model=Client)
     async def get_client(
         client_id: str,
+        fields: Optional[str] = None,
         credentials: HTTPAuthorizationCredentials = Depends(security)
     ):
-        """Get a specific client (admin only)"""
+        """Get a specific client, optionally limited to ?fields= (admin only)"""
         await verify_admin(credentials, db)
+        fieldset = parse_fields(Client, fields)
         
-        client = await db.clients.find_one({"id": client_id}, {"_id": 0})
+        client = await db.clients.find_one({"id": client_id}, projection(fieldset))
         if not client:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
+        if fieldset:
+            return fast_model_response(sparse_model(Client, fieldset), client)
         return client
     
+    @router.get("/{client_id}/full", response_model=ClientDetail)
+    async def get_client_detail(
+        client_id: str,
+        notes_limit: int = Query(20, ge=1, le=MAX_NOTES),
+        notes_cursor: Optional[str] = None,
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Get a client with their most recent notes and note statistics (admin only)
+        
+        Pass next_cursor back as ?notes_cursor= to page through older notes.
+        """
+        await verify_admin(credentials, db)
+        
+        try:
+            pipeline = client_detail_pipeline(client_id, notes_limit, notes_cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        rows = await db.clients.aggregate(pipeline).to_list(1)
+        if not rows:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
+        return shape_client_detail(rows[0], notes_limit)
+    
     @router.post("/", response_model=Client, status_code=status.HTTP_201_CREATED)
     async def create_client(
         client_data: ClientCreate,
@@ -72,19 +139,52 @@ def create_client_routes(db: AsyncIOMotorDatabase):
         await verify_admin(credentials, db)
         
         client_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc).isoformat()
+        now = utcnow()
         client_doc = {
             "id": client_id,
             **client_data.model_dump(),
             "created_at": now,
-            "updated_at": now
+            "updated_at": now,
+            "note_count": 0,
+            "last_session_date": None,
+            "last_note_at": None
         }
+        client_doc.update(client_keys(client_doc))
         
         await db.clients.insert_one(client_doc)
         logger.info(f"Created client: {client_data.first_name} {client_data.last_name}")
         
         return await db.clients.find_one({"id": client_id}, {"_id": 0})
     
+    @router.post("/import")
+    async def import_clients(
+        file: UploadFile = File(...),
+        format: Optional[str] = Query(None, pattern="^(csv|jsonl)$"),
+        dry_run: bool = False,
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Bulk import clients from a CSV or JSONL upload (admin only)
+        
+        Rows matching an existing client's email or phone are skipped (only
+        one import should run at a time, see ClientImporter). Returns
+        counts, rows per second and a per-row error report. With ?dry_run=true
+        nothing is written, and `skipped` lists the index maintenance left out.
+        """
+        await verify_admin(credentials, db)
+        
+        file_format = format or detect_format(file.filename)
+        if file_format not in FORMATS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload a .csv or .jsonl file, or pass ?format=")
+        
+        # The upload is spooled to disk by Starlette; read it as a text stream
+        stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        try:
+            return await ClientImporter(db, dry_run=dry_run).run(stream, file_format)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be UTF-8 encoded")
+        finally:
+            stream.detach()
+    
     @router.put("/{client_id}", response_model=Client)
     async def update_client(
         client_id: str,
@@ -99,7 +199,9 @@ def create_client_routes(db: AsyncIOMotorDatabase):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
         
         update_data = {k: v for k, v in client_data.model_dump().items() if v is not None}
-        update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        update_data["updated_at"] = utcnow()
+        if "email" in update_data or "phone" in update_data:
+            update_data.update(client_keys({**client, **update_data}))
         
         await db.clients.update_one({"id": client_id}, {"$set": update_data})
         
@@ -136,7 +238,7 @@ def create_client_routes(db: AsyncIOMotorDatabase):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
         
         notes = await db.client_notes.find({"client_id": client_id}, {"_id": 0}).sort("created_at", -1).to_list(500)
-        return notes
+        return fast_list_response(ClientNote, notes)
     
     @router.post("/{client_id}/notes", response_model=ClientNote, status_code=status.HTTP_201_CREATED)
     async def create_client_note(
@@ -157,11 +259,12 @@ def create_client_routes(db: AsyncIOMotorDatabase):
             "client_id": client_id,
             "note": note_data.note,
             "session_date": note_data.session_date,
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": utcnow(),
             "created_by": user["id"]
         }
         
         await db.client_notes.insert_one(note_doc)
+        await client_note_stats.note_created(db, note_doc)
         logger.info(f"Created note for client: {client_id}")
         
         return await db.client_notes.find_one({"id": note_id}, {"_id": 0})
@@ -184,6 +287,7 @@ def create_client_routes(db: AsyncIOMotorDatabase):
         
         if update_data:
             await db.client_notes.update_one({"id": note_id}, {"$set": update_data})
+            await client_note_stats.note_updated(db, client_id, note, update_data)
         
         return await db.client_notes.find_one({"id": note_id}, {"_id": 0})
     
@@ -196,11 +300,11 @@ def create_client_routes(db: AsyncIOMotorDatabase):
         """Delete a client note (admin only)"""
         await verify_admin(credentials, db)
         
-        note = await db.client_notes.find_one({"id": note_id, "client_id": client_id})
-        if not note:
+        result = await db.client_notes.delete_one({"id": note_id, "client_id": client_id})
+        if not result.deleted_count:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Note not found")
         
-        await db.client_notes.delete_one({"id": note_id})
+        await client_note_stats.note_deleted(db, client_id)
         logger.info(f"Deleted note: {note_id}")
     
     return router
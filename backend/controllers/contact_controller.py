@@ -1,11 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, status, Header, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from models.schemas import ContactSubmission, ContactSubmissionCreate
+from models.schemas import ContactSubmission, ContactSubmissionCreate, ContactBulkAction, ContactSummary
 from services.auth_service import auth_service
+from services.json_response import fast_list_response
 from services.email_service import email_service
+from services.contact_queue import contact_queue
+from services.contact_dedupe import contact_dedupe
+from services.contact_counters import contact_counters
+from services.timestamps import utcnow
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
 import uuid
 import logging
 
@@ -30,37 +34,75 @@ async def verify_admin(credentials: HTTPAuthorizationCredentials, db: AsyncIOMot
     return user
 
 
+async def notify_written(documents: List[dict]):
+    """Count and announce submissions once they are stored, so rejected duplicates send nothing"""
+    await contact_counters.record_submitted(documents)
+    for doc in documents:
+        try:
+            await email_service.send_contact_notification(doc["name"], doc["email"], doc.get("phone") or "", doc["message"])
+        except Exception as e:
+            logger.error(f"Contact notification for {doc['id']} failed: {e}")
+
+
 def create_contact_routes(db: AsyncIOMotorDatabase):
     """Create contact form routes"""
+    contact_counters.bind(db)
+    contact_queue.bind(db.contact_submissions, on_written=notify_written, on_rejected=contact_dedupe.forget)
+    # Start with the app so spooled submissions from a crash are replayed before the first new one
+    if contact_queue.start not in router.on_startup:
+        router.add_event_handler("startup", contact_queue.start)
+        router.add_event_handler("shutdown", contact_queue.stop)
+    email_service.use_outbox(db.email_outbox)
+    if email_service.start not in router.on_startup:
+        router.add_event_handler("startup", email_service.start)
     
     @router.post("/", response_model=ContactSubmission, status_code=status.HTTP_201_CREATED)
     async def submit_contact(
         contact_data: ContactSubmissionCreate,
-        background_tasks: BackgroundTasks
+        response: Response,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
     ):
-        """Submit a contact form (public endpoint)"""
+        """Submit a contact form (public endpoint)
+        
+        The submission is acknowledged once it is spooled locally; the contact
+        queue writes it to Mongo in the next batch and the notification email
+        goes out once it is stored. Repeats of a recent submission (same
+        Idempotency-Key, or same email and message) return the original
+        record without a write or an email. Mongo is only read for repeats
+        while the index is cold after a restart; other repeats are turned
+        away by the unique indexes when the queue writes them.
+        """
+        content_hash = contact_dedupe.content_hash(contact_data.email, contact_data.message)
+        original = contact_dedupe.lookup(idempotency_key, content_hash)
+        if original:
+            response.status_code = status.HTTP_200_OK
+            return original
+        
+        await contact_dedupe.ensure_indexes(db.contact_submissions)
+        if contact_dedupe.cold:
+            original = await contact_dedupe.find_stored(db.contact_submissions, idempotency_key, content_hash)
+            if original:
+                response.status_code = status.HTTP_200_OK
+                return original
+        
         contact_id = str(uuid.uuid4())
         contact_doc = {
             "id": contact_id,
             **contact_data.model_dump(),
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": utcnow(),
             "is_read": False,
-            "notes": None
+            "notes": None,
+            "content_hash": content_hash,
+            "content_key": contact_dedupe.content_key(content_hash)
         }
+        if idempotency_key:
+            contact_doc["idempotency_key"] = idempotency_key
         
-        await db.contact_submissions.insert_one(contact_doc)
+        await contact_queue.submit(contact_doc)
+        contact_dedupe.remember(idempotency_key, content_hash, contact_doc)
         logger.info(f"New contact submission from: {contact_data.email}")
         
-        # Send email notification in background
-        background_tasks.add_task(
-            email_service.send_contact_notification,
-            contact_data.name,
-            contact_data.email,
-            contact_data.phone or "",
-            contact_data.message
-        )
-        
-        return await db.contact_submissions.find_one({"id": contact_id}, {"_id": 0})
+        return contact_doc
     
     @router.get("/", response_model=List[ContactSubmission])
     async def list_contacts(
@@ -72,7 +114,54 @@ def create_contact_routes(db: AsyncIOMotorDatabase):
         
         query = {"is_read": False} if unread_only else {}
         contacts = await db.contact_submissions.find(query, {"_id": 0}).sort("created_at", -1).to_list(500)
-        return contacts
+        return fast_list_response(ContactSubmission, contacts)
+    
+    @router.get("/summary", response_model=ContactSummary)
+    async def get_summary(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Unread count, total and latest submission time for the dashboard (admin only)"""
+        await verify_admin(credentials, db)
+        return await contact_counters.summary()
+    
+    @router.post("/bulk/read")
+    async def bulk_mark_as_read(
+        action: ContactBulkAction,
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Mark several contacts as read (admin only)"""
+        await verify_admin(credentials, db)
+        
+        result = await db.contact_submissions.update_many(
+            {"id": {"$in": action.ids}, "is_read": False},
+            {"$set": {"is_read": True}}
+        )
+        await contact_counters.record_read(result.modified_count)
+        return {"message": f"Marked {result.modified_count} as read", "updated": result.modified_count}
+    
+    @router.post("/bulk/delete")
+    async def bulk_delete(
+        action: ContactBulkAction,
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Delete several contact submissions (admin only)"""
+        await verify_admin(credentials, db)
+        
+        # Read the matches once so the unread count comes from the same documents that are deleted
+        found = await db.contact_submissions.find(
+            {"id": {"$in": action.ids}}, {"_id": 0, "id": 1, "is_read": 1}
+        ).to_list(None)
+        result = await db.contact_submissions.delete_many({"id": {"$in": [doc["id"] for doc in found]}})
+        deleted = result.deleted_count
+        unread = sum(1 for doc in found if not doc.get("is_read"))
+        # Anything changed between the find and the delete is left to counter reconciliation
+        await contact_counters.record_deleted(deleted, min(unread, deleted))
+        logger.info(f"Bulk deleted {deleted} contacts")
+        return {"message": f"Deleted {deleted} contacts", "deleted": deleted}
+    
+    @router.get("/dedupe-stats")
+    async def get_dedupe_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Duplicate submission counters (admin only)"""
+        await verify_admin(credentials, db)
+        return contact_dedupe.stats()
     
     @router.get("/{contact_id}", response_model=ContactSubmission)
     async def get_contact(
@@ -99,7 +188,9 @@ def create_contact_routes(db: AsyncIOMotorDatabase):
         if not contact:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
         
-        await db.contact_submissions.update_one({"id": contact_id}, {"$set": {"is_read": True}})
+        # Only the request that flips is_read decrements the unread counter
+        result = await db.contact_submissions.update_one({"id": contact_id, "is_read": False}, {"$set": {"is_read": True}})
+        await contact_counters.record_read(result.modified_count)
         return {"message": "Marked as read"}
     
     @router.put("/{contact_id}/notes")
@@ -126,11 +217,11 @@ def create_contact_routes(db: AsyncIOMotorDatabase):
         """Delete a contact submission (admin only)"""
         await verify_admin(credentials, db)
         
-        contact = await db.contact_submissions.find_one({"id": contact_id})
+        contact = await db.contact_submissions.find_one_and_delete({"id": contact_id}, {"_id": 0, "is_read": 1})
         if not contact:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
         
-        await db.contact_submissions.delete_one({"id": contact_id})
+        await contact_counters.record_deleted(1, 0 if contact.get("is_read") else 1)
         logger.info(f"Deleted contact: {contact_id}")
     
     return router
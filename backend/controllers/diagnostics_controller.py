@@ -0,0 +1,143 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from services.auth_service import auth_service
+from services.email_service import email_service
+from services.contact_counters import contact_counters
+from services.image_variants import image_variants
+from services.upload_store import upload_store
+from services.profiler import profiler, ProfileBusy
+from services.db_metrics import db_metrics
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/diagnostics", tags=["Diagnostics"])
+security = HTTPBearer()
+
+
+async def verify_admin(credentials: HTTPAuthorizationCredentials, db: AsyncIOMotorDatabase) -> dict:
+    """Verify admin user from token"""
+    payload = auth_service.decode_token(credentials.credentials)
+    if not payload or payload.get("type") != "access":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    
+    user = await db.admin_users.find_one({"id": payload["sub"]}, {"_id": 0})
+    if not user or not user.get("is_active", True):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or disabled")
+    
+    return user
+
+
+def create_diagnostics_routes(db: AsyncIOMotorDatabase):
+    """Create admin diagnostics routes"""
+    
+    @router.get("/email-outbox")
+    async def get_email_outbox_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Email outbox depth and latency metrics (admin only)"""
+        await verify_admin(credentials, db)
+        return await email_service.outbox.stats()
+    
+    @router.get("/contact-digest")
+    async def get_contact_digest_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Contact notification digest counters (admin only)"""
+        await verify_admin(credentials, db)
+        return email_service.contact_digest.stats()
+    
+    @router.get("/contact-counters")
+    async def get_contact_counter_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Contact counter reconciliation history (admin only)"""
+        await verify_admin(credentials, db)
+        return contact_counters.stats()
+    
+    @router.post("/contact-counters/reconcile")
+    async def reconcile_contact_counters(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Recount contact submissions now and repair the counters (admin only)"""
+        await verify_admin(credentials, db)
+        if contact_counters.counters is None:
+            # Bound with the contact routes; in the proxy process Node handles contact submissions
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Contact counters are not running in this process")
+        counters = await contact_counters.reconcile()
+        return {**counters, "drift": contact_counters.last_drift}
+    
+    @router.get("/uploads")
+    async def get_upload_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Upload storage and image variant settings and counters (admin only)"""
+        await verify_admin(credentials, db)
+        return {**upload_store.stats(), "variants": image_variants.stats()}
+    
+    @router.get("/db")
+    async def get_db_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Mongo commands and database time per route, with each route's slowest command (admin only)"""
+        await verify_admin(credentials, db)
+        return db_metrics.stats()
+    
+    @router.delete("/db")
+    async def reset_db_stats(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Clear the per-route Mongo command statistics (admin only)"""
+        await verify_admin(credentials, db)
+        db_metrics.reset()
+        return {"message": "Database statistics reset"}
+    
+    # Profiling
+    @router.get("/profile")
+    async def get_profile_status(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Running profile, if any, and a summary of the last result (admin only)"""
+        await verify_admin(credentials, db)
+        return profiler.status()
+    
+    @router.post("/profile/requests", status_code=status.HTTP_202_ACCEPTED)
+    async def profile_requests(
+        request: Request,
+        path_prefix: str = Query(..., min_length=1),
+        count: int = Query(10, ge=1, le=1000),
+        method: Optional[str] = None,
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Profile the next `count` requests whose path starts with path_prefix (admin only)
+        
+        Fetch the result from /diagnostics/profile/result once they have been served.
+        """
+        await verify_admin(credentials, db)
+        try:
+            profiler.profile_requests(request.app, path_prefix, count, method)
+        except ProfileBusy as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        return profiler.status()
+    
+    @router.post("/profile/sample")
+    async def profile_sample(
+        seconds: float = Query(10, gt=0, le=profiler.max_seconds),
+        format: str = Query("json", pattern="^(json|collapsed)$"),
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Sample every thread's stack for `seconds` and return the profile (admin only)"""
+        await verify_admin(credentials, db)
+        try:
+            result = await profiler.sample(seconds)
+        except ProfileBusy as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        return PlainTextResponse(result["collapsed"]) if format == "collapsed" else result
+    
+    @router.get("/profile/result")
+    async def get_profile_result(
+        format: str = Query("json", pattern="^(json|collapsed)$"),
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Last finished profile: top functions and collapsed stacks, or ?format=collapsed for flame graph tools (admin only)"""
+        await verify_admin(credentials, db)
+        result = profiler.last_result
+        if not result:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile has finished yet")
+        return PlainTextResponse(result["collapsed"]) if format == "collapsed" else result
+    
+    @router.delete("/profile")
+    async def cancel_profile(credentials: HTTPAuthorizationCredentials = Depends(security)):
+        """Disarm a pending request profile, keeping the samples taken so far (admin only)"""
+        await verify_admin(credentials, db)
+        if not profiler.cancel():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No request profile is pending")
+        return profiler.status()
+    
+    return router
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from models.schemas import Policy, PolicyCreate, PolicyUpdate
+from models.schemas import Policy, PolicyCreate, PolicyUpdate, RenderedPolicy
 from services.auth_service import auth_service
+from services.json_response import fast_list_response
+from services.policy_cache import policy_cache
+from services.timestamps import utcnow
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
-from datetime import datetime, timezone
 import uuid
 import logging
 
@@ -37,15 +39,19 @@ def create_policy_routes(db: AsyncIOMotorDatabase):
         """List all policies (public endpoint)"""
         query = {"is_active": True} if active_only else {}
         policies = await db.policies.find(query, {"_id": 0}).sort("display_order", 1).to_list(100)
-        return policies
+        return fast_list_response(Policy, policies)
     
-    @router.get("/slug/{slug}", response_model=Policy)
+    @router.get("/slug/{slug}", response_model=RenderedPolicy)
     async def get_policy_by_slug(slug: str):
-        """Get a policy by slug (public endpoint)"""
+        """Get a policy by slug with its rendered HTML (public endpoint)"""
+        cached = policy_cache.get(slug)
+        if cached:
+            return cached
+        
         policy = await db.policies.find_one({"slug": slug, "is_active": True}, {"_id": 0})
         if not policy:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Policy not found")
-        return policy
+        return policy_cache.put(policy)
     
     @router.get("/{policy_id}", response_model=Policy)
     async def get_policy(policy_id: str):
@@ -69,7 +75,7 @@ def create_policy_routes(db: AsyncIOMotorDatabase):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Slug already exists")
         
         policy_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc).isoformat()
+        now = utcnow()
         policy_doc = {
             "id": policy_id,
             **policy_data.model_dump(),
@@ -80,7 +86,9 @@ def create_policy_routes(db: AsyncIOMotorDatabase):
         await db.policies.insert_one(policy_doc)
         logger.info(f"Created policy: {policy_data.title}")
         
-        return await db.policies.find_one({"id": policy_id}, {"_id": 0})
+        policy = await db.policies.find_one({"id": policy_id}, {"_id": 0})
+        policy_cache.put(policy)
+        return policy
     
     @router.put("/{policy_id}", response_model=Policy)
     async def update_policy(
@@ -105,11 +113,13 @@ def create_policy_routes(db: AsyncIOMotorDatabase):
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Slug already exists")
         
         update_data = {k: v for k, v in policy_data.model_dump().items() if v is not None}
-        update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        update_data["updated_at"] = utcnow()
         
         await db.policies.update_one({"id": policy_id}, {"$set": update_data})
         
-        return await db.policies.find_one({"id": policy_id}, {"_id": 0})
+        policy = await db.policies.find_one({"id": policy_id}, {"_id": 0})
+        policy_cache.put(policy)
+        return policy
     
     @router.delete("/{policy_id}", status_code=status.HTTP_204_NO_CONTENT)
     async def delete_policy(
@@ -124,6 +134,7 @@ def create_policy_routes(db: AsyncIOMotorDatabase):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Policy not found")
         
         await db.policies.delete_one({"id": policy_id})
+        policy_cache.evict(policy_id)
         logger.info(f"Deleted policy: {policy_id}")
     
     return router
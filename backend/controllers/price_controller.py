@@ -2,9 +2,10 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.schemas import Price, PriceCreate, PriceUpdate
 from services.auth_service import auth_service
+from services.json_response import fast_list_response
+from services.timestamps import utcnow
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List
-from datetime import datetime, timezone
 import uuid
 import logging
 
@@ -42,7 +43,7 @@ def create_price_routes(db: AsyncIOMotorDatabase):
             query["is_active"] = True
         
         prices = await db.prices.find(query, {"_id": 0}).sort("display_order", 1).to_list(100)
-        return prices
+        return fast_list_response(Price, prices)
     
     @router.get("/{price_id}", response_model=Price)
     async def get_price(price_id: str):
@@ -69,7 +70,7 @@ def create_price_routes(db: AsyncIOMotorDatabase):
         price_doc = {
             "id": price_id,
             **price_data.model_dump(),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         }
         
         await db.prices.insert_one(price_doc)
@@ -2,8 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.schemas import SiteSettings, SocialLinks
 from services.auth_service import auth_service
+from services.timestamps import utcnow
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from datetime import datetime, timezone
 from pydantic import BaseModel
 from typing import Optional
 import logging
@@ -65,7 +65,7 @@ def create_settings_routes(db: AsyncIOMotorDatabase):
         if "social_links" in update_data and update_data["social_links"]:
             update_data["social_links"] = update_data["social_links"].model_dump() if hasattr(update_data["social_links"], 'model_dump') else update_data["social_links"]
         
-        update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        update_data["updated_at"] = utcnow()
         update_data["id"] = "site_settings"
         
         await db.site_settings.update_one(
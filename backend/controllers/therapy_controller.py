@@ -2,9 +2,12 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.schemas import Therapy, TherapyCreate, TherapyUpdate
 from services.auth_service import auth_service
+from services.json_response import fast_list_response, fast_model_response
+from services.fieldsets import parse_fields, projection, sparse_model
+from services.timestamps import utcnow
+from services.image_variants import image_variants
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
 import uuid
 import logging
 
@@ -33,18 +36,24 @@ def create_therapy_routes(db: AsyncIOMotorDatabase):
     """Create therapy CRUD routes"""
     
     @router.get("/", response_model=List[Therapy])
-    async def list_therapies(active_only: bool = False):
-        """List all therapies (public endpoint)"""
+    async def list_therapies(active_only: bool = False, fields: Optional[str] = None):
+        """List all therapies, optionally limited to ?fields= (public endpoint)"""
+        fieldset = parse_fields(Therapy, fields)
         query = {"is_active": True} if active_only else {}
-        therapies = await db.therapies.find(query, {"_id": 0}).sort("display_order", 1).to_list(100)
-        return therapies
+        therapies = await db.therapies.find(query, projection(fieldset)).sort("display_order", 1).to_list(100)
+        if fieldset:
+            return fast_list_response(sparse_model(Therapy, fieldset), therapies)
+        return fast_list_response(Therapy, therapies)
     
     @router.get("/{therapy_id}", response_model=Therapy)
-    async def get_therapy(therapy_id: str):
-        """Get a specific therapy (public endpoint)"""
-        therapy = await db.therapies.find_one({"id": therapy_id}, {"_id": 0})
+    async def get_therapy(therapy_id: str, fields: Optional[str] = None):
+        """Get a specific therapy, optionally limited to ?fields= (public endpoint)"""
+        fieldset = parse_fields(Therapy, fields)
+        therapy = await db.therapies.find_one({"id": therapy_id}, projection(fieldset))
         if not therapy:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Therapy not found")
+        if fieldset:
+            return fast_model_response(sparse_model(Therapy, fieldset), therapy)
         return therapy
     
     @router.post("/", response_model=Therapy, status_code=status.HTTP_201_CREATED)
@@ -59,8 +68,9 @@ def create_therapy_routes(db: AsyncIOMotorDatabase):
         therapy_doc = {
             "id": therapy_id,
             **therapy_data.model_dump(),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         }
+        therapy_doc["image_variants"] = await image_variants.manifest(db, therapy_doc["image_url"])
         
         await db.therapies.insert_one(therapy_doc)
         logger.info(f"Created therapy: {therapy_data.name}")
@@ -81,6 +91,8 @@ def create_therapy_routes(db: AsyncIOMotorDatabase):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Therapy not found")
         
         update_data = {k: v for k, v in therapy_data.model_dump().items() if v is not None}
+        if "image_url" in update_data:
+            update_data["image_variants"] = await image_variants.manifest(db, update_data["image_url"])
         
         if update_data:
             await db.therapies.update_one({"id": therapy_id}, {"$set": update_data})
@@ -0,0 +1,149 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, UploadFile, File, status
+from fastapi.responses import RedirectResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from services.auth_service import auth_service
+from services.image_variants import image_variants, pick_variant
+from services.upload_store import upload_store, upload_url, UploadTooLarge
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/images", tags=["Images"])
+security = HTTPBearer()
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+ALLOWED_EXTENSIONS = (".jpeg", ".jpg", ".png", ".gif", ".webp", ".svg")
+
+
+async def verify_admin(credentials: HTTPAuthorizationCredentials, db: AsyncIOMotorDatabase) -> dict:
+    """Verify admin user from token"""
+    payload = auth_service.decode_token(credentials.credentials)
+    if not payload or payload.get("type") != "access":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    
+    user = await db.admin_users.find_one({"id": payload["sub"]}, {"_id": 0})
+    if not user or not user.get("is_active", True):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or disabled")
+    
+    return user
+
+
+def safe_filename(filename: str) -> str:
+    """Accept only content-addressed paths and legacy flat names inside the upload directory"""
+    if upload_store.resolve(filename) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid filename")
+    return filename
+
+
+def create_upload_routes(db: AsyncIOMotorDatabase):
+    """Create image upload routes"""
+    
+    @router.post("/", status_code=status.HTTP_201_CREATED)
+    async def upload_image(
+        file: UploadFile = File(...),
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Upload an image and render its responsive variants (admin only)"""
+        await verify_admin(credentials, db)
+        
+        extension = Path(file.filename or "").suffix.lower()
+        if extension not in ALLOWED_EXTENSIONS or not (file.content_type or "").startswith("image/"):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only image files are allowed")
+        
+        try:
+            stored = await upload_store.save(file, extension, MAX_UPLOAD_BYTES)
+        except UploadTooLarge:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Images must be 10MB or smaller")
+        filename = stored.filename
+        
+        # Identical bytes were uploaded before: reuse the stored file and its variants
+        existing = None if stored.created else await db.uploads.find_one({"filename": filename}, {"_id": 0})
+        if existing:
+            logger.info(f"Image upload deduplicated: {filename}")
+            return {
+                "success": True,
+                "message": "Image uploaded successfully",
+                "url": existing["url"],
+                "filename": filename,
+                "variants": existing.get("variants"),
+                "deduplicated": True
+            }
+        
+        try:
+            manifest = await image_variants.generate(filename)
+        except Exception as e:
+            logger.warning(f"Rejected upload {file.filename}: {e}")
+            await upload_store.delete(db, filename)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is not a readable image")
+        
+        upload = await image_variants.record(db, filename, manifest, sha256=stored.sha256, bytes=stored.bytes, content_type=file.content_type)
+        logger.info(f"Image uploaded: {filename} ({len(manifest['variants']) if manifest else 0} variants)")
+        
+        return {
+            "success": True,
+            "message": "Image uploaded successfully",
+            "url": upload["url"],
+            "filename": filename,
+            "variants": manifest,
+            "deduplicated": False
+        }
+    
+    @router.post("/gc")
+    async def collect_garbage(
+        dry_run: bool = True,
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Delete uploads nothing references any more; a dry run by default (admin only)"""
+        await verify_admin(credentials, db)
+        return await upload_store.collect_garbage(db, dry_run=dry_run)
+    
+    @router.get("/{filename:path}/variants")
+    async def get_image_variants(filename: str):
+        """Variant manifest and reference count of an upload (public endpoint)"""
+        upload = await db.uploads.find_one({"filename": safe_filename(filename)}, {"_id": 0})
+        if not upload:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+        return {**upload, "references": await upload_store.references(db, filename)}
+    
+    @router.get("/{filename:path}")
+    async def get_image(
+        filename: str,
+        request: Request,
+        w: Optional[int] = Query(None, ge=1, le=4096),
+        format: Optional[str] = Query(None, pattern="^(avif|webp)$")
+    ):
+        """Redirect to the best variant of an upload for a display width (public endpoint)
+        
+        Without ?format= the first format the browser's Accept header allows is
+        used; uploads without variants redirect to the original file.
+        """
+        original = upload_url(safe_filename(filename))
+        manifest = await image_variants.manifest(db, original)
+        
+        accept = request.headers.get("accept", "")
+        formats = [format] if format else [f for f in image_variants.formats if f"image/{f}" in accept]
+        for image_format in formats:
+            variant = pick_variant(manifest, w or manifest["width"], image_format) if manifest else None
+            if variant:
+                return RedirectResponse(variant["url"], headers={"Vary": "Accept", "Cache-Control": "public, max-age=86400"})
+        return RedirectResponse(original, headers={"Vary": "Accept"})
+    
+    @router.delete("/{filename:path}", status_code=status.HTTP_204_NO_CONTENT)
+    async def delete_image(
+        filename: str,
+        credentials: HTTPAuthorizationCredentials = Depends(security)
+    ):
+        """Delete an upload and its variants if nothing references it (admin only)"""
+        await verify_admin(credentials, db)
+        
+        safe_filename(filename)
+        references = await upload_store.references(db, filename)
+        if references:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Image is still used by {references} document(s)")
+        
+        await upload_store.delete(db, filename)
+        logger.info(f"Image deleted: {filename}")
+    
+    return router
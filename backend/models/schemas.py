@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 import uuid
 
@@ -51,6 +51,22 @@ class AdminUser(AdminUserBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+# Image Models
+class ImageVariant(BaseSchema):
+    url: str
+    width: int
+    height: int
+    format: str
+    bytes: int
+
+
+class ImageVariantManifest(BaseSchema):
+    width: int
+    height: int
+    variants: List[ImageVariant] = []
+    srcset: Dict[str, str] = {}
+
+
 # Therapy Models
 class TherapyBase(BaseSchema):
     name: str
@@ -78,6 +94,7 @@ class TherapyUpdate(BaseSchema):
 
 class Therapy(TherapyBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    image_variants: Optional[ImageVariantManifest] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -130,6 +147,16 @@ class ContactSubmission(ContactSubmissionBase):
     notes: Optional[str] = None
 
 
+class ContactBulkAction(BaseSchema):
+    ids: List[str] = Field(min_length=1, max_length=1000)
+
+
+class ContactSummary(BaseSchema):
+    unread: int
+    total: int
+    latest_at: Optional[datetime] = None
+
+
 # Affiliation Models
 class AffiliationBase(BaseSchema):
     name: str
@@ -153,6 +180,7 @@ class AffiliationUpdate(BaseSchema):
 
 class Affiliation(AffiliationBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    logo_variants: Optional[ImageVariantManifest] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -183,6 +211,11 @@ class Policy(PolicyBase):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class RenderedPolicy(Policy):
+    content_html: str = ""
+    excerpt: str = ""
+
+
 # Settings Models
 class SocialLinks(BaseSchema):
     facebook_url: Optional[str] = None
@@ -231,6 +264,31 @@ class Client(ClientBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    note_count: int = 0
+    last_session_date: Optional[str] = None
+    last_note_at: Optional[datetime] = None
+
+
+# Client fields the list leaves out unless they are named in ?fields=
+CLIENT_SENSITIVE_FIELDS = ("address", "date_of_birth", "medical_notes")
+CLIENT_LIST_FIELDS = tuple(name for name in Client.model_fields if name not in CLIENT_SENSITIVE_FIELDS)
+
+
+class ClientListItem(BaseSchema):
+    """A client as listed: the default fields, or only those named in ?fields="""
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    address: Optional[str] = Field(None, description="Only sent when named in ?fields=")
+    date_of_birth: Optional[str] = Field(None, description="Only sent when named in ?fields=")
+    medical_notes: Optional[str] = Field(None, description="Only sent when named in ?fields=")
+    id: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    note_count: Optional[int] = None
+    last_session_date: Optional[str] = None
+    last_note_at: Optional[datetime] = None
 
 
 # Client Note Models
@@ -253,3 +311,28 @@ class ClientNote(ClientNoteBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=datetime.utcnow)
     created_by: Optional[str] = None
+
+
+class ClientNoteSearchResult(ClientNote):
+    score: float
+    client_name: Optional[str] = None
+
+
+class ClientNoteSearchPage(BaseSchema):
+    results: List[ClientNoteSearchResult]
+    total: int
+    page: int
+    page_size: int
+
+
+class ClientNoteStatistics(BaseSchema):
+    note_count: int = 0
+    last_session_date: Optional[str] = None
+    last_note_at: Optional[datetime] = None
+
+
+class ClientDetail(BaseSchema):
+    client: Client
+    notes: List[ClientNote]
+    next_cursor: Optional[str] = None
+    stats: ClientNoteStatistics
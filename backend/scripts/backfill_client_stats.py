@@ -0,0 +1,29 @@
+"""
+Client note statistics backfill
+Recomputes note_count, last_session_date and last_note_at on every client
+from client_notes and creates the indexes the client list sorts on. Safe to
+re-run at any time.
+
+Run from backend/: python -m scripts.backfill_client_stats
+"""
+
+import argparse
+import asyncio
+import time
+
+from scripts.database import get_database
+from services.client_note_stats import client_note_stats
+
+
+async def main(args):
+    db = get_database()
+    start = time.perf_counter()
+    await client_note_stats.ensure_indexes(db)
+    updated = await client_note_stats.backfill(db, batch_size=args.batch_size)
+    print(f"Updated {updated} clients in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,59 @@
+"""
+Image variant backfill
+Renders the responsive AVIF/WebP variants for every file in the upload
+directory that has no manifest yet (or all of them with --force), records
+each manifest in the uploads collection and copies it onto the therapies,
+affiliations and site settings that reference the image. Rendering runs on
+the same process pool the upload endpoint uses, --jobs files at a time.
+
+Run from backend/: python -m scripts.backfill_image_variants [--force] [--jobs 4]
+"""
+
+import argparse
+import asyncio
+import time
+
+from scripts.database import get_database
+from services.image_variants import image_variants
+from services.upload_store import upload_store
+
+
+async def main(args):
+    db = get_database()
+    image_variants.workers = args.jobs
+    done = set()
+    if not args.force:
+        done = {upload["filename"] async for upload in db.uploads.find({}, {"_id": 0, "filename": 1})}
+
+    files = sorted((filename, path) for filename, path in upload_store.iter_files() if filename not in done)
+    print(f"{len(files)} uploads to process in {image_variants.upload_dir} "
+          f"({', '.join(image_variants.formats)} at {', '.join(map(str, image_variants.widths))}px)")
+
+    semaphore = asyncio.Semaphore(args.jobs)
+    counts = {"rendered": 0, "skipped": 0, "failed": 0}
+    start = time.perf_counter()
+
+    async def process(filename, path):
+        async with semaphore:
+            try:
+                manifest = await image_variants.generate(filename)
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"  {filename}: {e}")
+                return
+            await image_variants.record(db, filename, manifest, bytes=path.stat().st_size)
+            counts["rendered" if manifest else "skipped"] += 1
+
+    try:
+        await asyncio.gather(*(process(filename, path) for filename, path in files))
+    finally:
+        image_variants.close()
+    print(f"{counts['rendered']} rendered, {counts['skipped']} served as-is (SVG or animated), "
+          f"{counts['failed']} failed in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="re-render uploads that already have variants")
+    parser.add_argument("--jobs", type=int, default=4, help="worker processes")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,293 @@
+"""
+Database backup and restore
+dump streams every collection (or those given with --collection) through a
+cursor into gzip-compressed segments of raw BSON (default) or canonical
+extended JSON lines, several collections at a time, and writes a manifest
+with document counts, SHA-256 checksums and index definitions last.
+restore verifies the checksums, reloads the segments with batched
+insert_many and then rebuilds the indexes. Both run in constant memory.
+
+Run from backend/:
+    python -m scripts.backup dump backups/2024-05-01 [--format jsonl] [--jobs 4]
+    python -m scripts.backup restore backups/2024-05-01 [--drop] [--collection clients]
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import bson
+from bson import json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import BulkWriteError
+
+from scripts.database import get_database
+from services.timestamps import utcnow
+
+MANIFEST = "manifest.json"
+FORMATS = ("bson", "jsonl")
+RAW = CodecOptions(document_class=RawBSONDocument)
+JSON_OPTIONS = json_util.JSONOptions(json_mode=json_util.JSONMode.CANONICAL)
+DUPLICATE_KEY_ERROR = 11000
+
+
+class Progress:
+    """Per-collection document counts printed every few seconds"""
+
+    def __init__(self, verb: str):
+        self.verb = verb
+        self.counts = {}
+        self.started = time.perf_counter()
+        self._last_print = 0.0
+
+    def add(self, collection: str, count: int):
+        self.counts[collection] = self.counts.get(collection, 0) + count
+        now = time.perf_counter()
+        if now - self._last_print >= 2:
+            self._last_print = now
+            self.print()
+
+    def print(self, final: bool = False):
+        total = sum(self.counts.values())
+        elapsed = time.perf_counter() - self.started
+        detail = ", ".join(f"{name} {count:,}" for name, count in sorted(self.counts.items()))
+        print(f"{'done: ' if final else ''}{self.verb} {total:,} documents in {elapsed:.1f}s "
+              f"({total / elapsed if elapsed else 0:,.0f}/s)  {detail}", flush=True)
+
+
+class SegmentWriter:
+    """gzip segment that hashes its compressed bytes as they are written"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.sha256 = hashlib.sha256()
+        self._raw = open(path, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self, mode="wb", compresslevel=6)
+        self.documents = 0
+        self.uncompressed = 0
+
+    # File-like sink for GzipFile
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        return self._raw.write(data)
+
+    def flush(self):
+        self._raw.flush()
+
+    def append(self, payload: bytes, documents: int):
+        self._gzip.write(payload)
+        self.documents += documents
+        self.uncompressed += len(payload)
+
+    def close(self) -> dict:
+        self._gzip.close()
+        self._raw.close()
+        return {
+            "file": self.path.name,
+            "documents": self.documents,
+            "bytes": self.path.stat().st_size,
+            "sha256": self.sha256.hexdigest()
+        }
+
+
+def encode_batch(documents: list, file_format: str) -> bytes:
+    if file_format == "bson":
+        return b"".join(doc.raw for doc in documents)
+    return "".join(json_util.dumps(doc, json_options=JSON_OPTIONS) + "\n" for doc in documents).encode("utf-8")
+
+
+async def dump_collection(db, name: str, out: Path, args, progress: Progress) -> dict:
+    collection = db.get_collection(name, codec_options=RAW)
+    suffix = "bson.gz" if args.format == "bson" else "jsonl.gz"
+    segments = []
+    writer = None
+    batch = []
+
+    async def write_batch():
+        nonlocal writer
+        if writer is None:
+            writer = SegmentWriter(out / f"{name}-{len(segments) + 1:05d}.{suffix}")
+        payload = encode_batch(batch, args.format)
+        # Compression runs in a thread so collections really do dump concurrently
+        await asyncio.to_thread(writer.append, payload, len(batch))
+        progress.add(name, len(batch))
+        if writer.uncompressed >= args.segment_mb * 1024 * 1024:
+            segments.append(await asyncio.to_thread(writer.close))
+            writer = None
+
+    async for document in collection.find({}, batch_size=args.batch_size):
+        batch.append(document)
+        if len(batch) >= args.batch_size:
+            await write_batch()
+            batch = []
+    if batch:
+        await write_batch()
+    if writer is not None:
+        segments.append(await asyncio.to_thread(writer.close))
+
+    indexes = await collection.index_information()
+    progress.add(name, 0)
+    return {
+        "documents": sum(segment["documents"] for segment in segments),
+        "segments": segments,
+        "indexes": {
+            index_name: {k: v for k, v in spec.items() if k not in ("v", "ns")}
+            for index_name, spec in indexes.items() if index_name != "_id_"
+        }
+    }
+
+
+async def dump(args):
+    db = get_database()
+    out = Path(args.path)
+    out.mkdir(parents=True, exist_ok=False)
+
+    names = args.collection or sorted(
+        name for name in await db.list_collection_names() if not name.startswith("system.")
+    )
+    progress = Progress("dumped")
+    semaphore = asyncio.Semaphore(args.jobs)
+
+    async def run(name):
+        async with semaphore:
+            return name, await dump_collection(db, name, out, args, progress)
+
+    started_at = utcnow()
+    collections = dict(await asyncio.gather(*(run(name) for name in names)))
+    manifest = {
+        "database": db.name,
+        "format": args.format,
+        "started_at": started_at.isoformat(),
+        "completed_at": utcnow().isoformat(),
+        "collections": collections
+    }
+    # Written last: a backup without a manifest is incomplete and restore refuses it
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=2, default=json_util.default))
+    progress.print(final=True)
+
+
+def verify_segment(path: Path, expected: str) -> bool:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+    return sha256.hexdigest() == expected
+
+
+def read_batches(path: Path, file_format: str, batch_size: int):
+    """Yield lists of documents from a segment without loading it whole"""
+    with gzip.open(path, "rb") as f:
+        if file_format == "bson":
+            documents = bson.decode_file_iter(f, codec_options=RAW)
+        else:
+            documents = (json_util.loads(line, json_options=JSON_OPTIONS) for line in f if line.strip())
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def index_arguments(spec: dict):
+    """Translate an index_information() entry back into create_index arguments"""
+    options = {k: v for k, v in spec.items() if k != "key"}
+    keys = spec["key"]
+    if any(field == "_fts" for field, _ in keys):
+        # Text indexes report internal _fts/_ftsx keys; the fields live in weights
+        prefix = [(field, direction) for field, direction in keys if field not in ("_fts", "_ftsx")]
+        keys = prefix + [(field, "text") for field in options.get("weights", {})]
+    return [tuple(key) for key in keys], options
+
+
+async def restore_collection(db, name: str, info: dict, root: Path, args, progress: Progress) -> dict:
+    collection = db.get_collection(name, codec_options=RAW)
+    if args.drop:
+        await collection.drop()
+
+    skipped = 0
+    for segment in info["segments"]:
+        batches = read_batches(root / segment["file"], args.format, args.batch_size)
+        while True:
+            # Decompression and decoding happen off the event loop
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+            try:
+                await collection.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+                    raise
+                skipped += len(errors)
+            progress.add(name, len(batch))
+
+    for index_name, spec in info["indexes"].items():
+        keys, options = index_arguments(spec)
+        await collection.create_index(keys, name=index_name, **options)
+    return {"documents": info["documents"], "skipped_existing": skipped, "indexes": len(info["indexes"])}
+
+
+async def restore(args):
+    root = Path(args.path)
+    manifest_path = root / MANIFEST
+    if not manifest_path.exists():
+        sys.exit(f"{manifest_path} not found; the backup is incomplete or the path is wrong")
+    manifest = json_util.loads(manifest_path.read_text())
+    args.format = manifest["format"]
+
+    names = args.collection or sorted(manifest["collections"])
+    missing = [name for name in names if name not in manifest["collections"]]
+    if missing:
+        sys.exit(f"Not in this backup: {', '.join(missing)}")
+
+    print("verifying checksums...", flush=True)
+    for name in names:
+        for segment in manifest["collections"][name]["segments"]:
+            ok = await asyncio.to_thread(verify_segment, root / segment["file"], segment["sha256"])
+            if not ok:
+                sys.exit(f"Checksum mismatch in {segment['file']}; refusing to restore")
+
+    db = get_database()
+    progress = Progress("restored")
+    semaphore = asyncio.Semaphore(args.jobs)
+
+    async def run(name):
+        async with semaphore:
+            return name, await restore_collection(db, name, manifest["collections"][name], root, args, progress)
+
+    results = dict(await asyncio.gather(*(run(name) for name in names)))
+    progress.print(final=True)
+    for name, result in sorted(results.items()):
+        note = f", {result['skipped_existing']:,} already present" if result["skipped_existing"] else ""
+        print(f"  {name}: {result['documents']:,} documents, {result['indexes']} indexes rebuilt{note}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump_parser = commands.add_parser("dump", help="back up collections into a new directory")
+    dump_parser.add_argument("path")
+    dump_parser.add_argument("--format", choices=FORMATS, default="bson")
+    dump_parser.add_argument("--segment-mb", type=int, default=64, help="uncompressed size per segment")
+
+    restore_parser = commands.add_parser("restore", help="restore collections from a backup directory")
+    restore_parser.add_argument("path")
+    restore_parser.add_argument("--drop", action="store_true", help="drop each collection before restoring it")
+
+    for sub in (dump_parser, restore_parser):
+        sub.add_argument("--collection", action="append", help="limit to these collections (repeatable)")
+        sub.add_argument("--jobs", type=int, default=4, help="collections processed concurrently")
+        sub.add_argument("--batch-size", type=int, default=1000)
+
+    args = parser.parse_args()
+    asyncio.run(dump(args) if args.command == "dump" else restore(args))
@@ -0,0 +1,22 @@
+"""
+Database connection for maintenance commands
+Reads MONGO_URL and DB_NAME from the environment or backend/.env, the same
+settings the API server uses. Dates are read back as aware UTC datetimes,
+and commands slower than DB_SLOW_COMMAND_MS are logged.
+"""
+
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from services.db_metrics import db_metrics
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+
+
+def get_database():
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True, event_listeners=[db_metrics])
+    return client[os.environ['DB_NAME']]
@@ -0,0 +1,59 @@
+"""
+Client import
+Streams a CSV or JSONL client list into the clients collection in validated
+insert_many batches, skipping rows whose email or phone matches an existing
+client. CSV headers use the API field names (first_name, last_name, email,
+phone, address, date_of_birth, medical_notes). Do not run two imports at
+once: duplicates are only detected within one import.
+
+Run from backend/: python -m scripts.import_clients clients.csv [--report errors.jsonl] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from scripts.database import get_database
+from services.client_import import ClientImporter, FORMATS, detect_format
+
+
+async def main(args):
+    file_format = args.format or detect_format(args.path)
+    if file_format not in FORMATS:
+        sys.exit("Cannot tell the file format from its name; pass --format csv or --format jsonl")
+
+    report_file = open(args.report, "w", encoding="utf-8") if args.report else None
+
+    def write_error(error: dict):
+        if report_file:
+            report_file.write(json.dumps(error) + "\n")
+
+    importer = ClientImporter(get_database(), chunk_size=args.chunk_size, dry_run=args.dry_run, on_error=write_error)
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            report = await importer.run(stream, file_format)
+    finally:
+        if report_file:
+            report_file.close()
+
+    print(f"{report['rows']:,} rows in {report['seconds']}s ({report['rows_per_second'] or 0:,} rows/s)")
+    print(f"  {report['inserted']:,} inserted, {report['duplicates']:,} duplicates, {report['invalid']:,} invalid"
+          + (" (dry run, nothing written)" if args.dry_run else ""))
+    for skipped in report["skipped"]:
+        print(f"  dry run skipped {skipped}")
+    for error in report["errors"][:args.show]:
+        print(f"  row {error['row']}: {error['type']}: {error['message']}")
+    if args.report:
+        print(f"full error report written to {args.report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--report", help="write every row error to this JSONL file")
+    parser.add_argument("--show", type=int, default=20, help="row errors to print")
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,131 @@
+"""
+Timestamp migration
+Converts legacy ISO-string timestamps (created_at, updated_at, ...) to
+native BSON dates in every collection listed in services.timestamps, in
+batches written with bulk_write.
+
+The migration is resumable: converted documents drop out of the query, and
+progress plus any values that could not be parsed are checkpointed in the
+migrations collection, so it can be stopped and re-run at any time. It is
+throttled to a maximum duty cycle so live traffic keeps most of the
+database's attention.
+
+Run from backend/: python -m scripts.migrate_timestamps [--collection client_notes] [--max-duty 0.25]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from pymongo import UpdateOne
+
+from scripts.database import get_database
+from services.timestamps import TIMESTAMP_FIELDS, parse_timestamp, utcnow
+
+logger = logging.getLogger(__name__)
+
+MAX_UNPARSABLE = 1000
+
+
+class TimestampMigration:
+    """Batched, checkpointed, duty-cycle throttled string-to-date conversion"""
+
+    def __init__(self, db, batch_size: int = 1000, max_duty: float = 0.25, dry_run: bool = False):
+        self.db = db
+        self.batch_size = batch_size
+        self.max_duty = max_duty
+        self.dry_run = dry_run
+
+    async def migrate_collection(self, name: str, fields: tuple) -> dict:
+        collection = self.db[name]
+        checkpoint_id = f"timestamps:{name}"
+        checkpoint = await self.db.migrations.find_one({"id": checkpoint_id}, {"_id": 0}) or {}
+        unparsable = list(checkpoint.get("unparsable_ids", []))
+        converted = checkpoint.get("converted", 0)
+
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        remaining = await collection.count_documents(query)
+        print(f"{name}: {remaining:,} documents with string timestamps ({converted:,} converted previously)")
+
+        started = time.perf_counter()
+        while True:
+            batch_started = time.perf_counter()
+            filter_ = {**query, "_id": {"$nin": unparsable}} if unparsable else query
+            documents = await collection.find(
+                filter_, {"_id": 1, **{field: 1 for field in fields}}
+            ).limit(self.batch_size).to_list(self.batch_size)
+            if not documents:
+                break
+
+            updates = []
+            for document in documents:
+                old, new = {}, {}
+                for field in fields:
+                    value = document.get(field)
+                    if not isinstance(value, str):
+                        continue
+                    parsed = parse_timestamp(value)
+                    if parsed is None:
+                        new = None
+                        break
+                    old[field], new[field] = value, parsed
+                if new is None:
+                    unparsable.append(document["_id"])
+                    continue
+                # Matching the old values leaves documents edited meanwhile for the next pass
+                updates.append(UpdateOne({"_id": document["_id"], **old}, {"$set": new}))
+
+            if len(unparsable) > MAX_UNPARSABLE:
+                raise RuntimeError(f"{name}: more than {MAX_UNPARSABLE} unparsable timestamps, giving up")
+            if self.dry_run:
+                converted += len(updates)
+                break
+            if updates:
+                result = await collection.bulk_write(updates, ordered=False)
+                converted += result.modified_count
+            await self.db.migrations.update_one(
+                {"id": checkpoint_id},
+                {"$set": {"converted": converted, "unparsable_ids": unparsable, "updated_at": utcnow()}},
+                upsert=True
+            )
+
+            # Sleep long enough that this batch used at most max_duty of wall time
+            busy = time.perf_counter() - batch_started
+            await asyncio.sleep(busy * (1 / self.max_duty - 1))
+            elapsed = time.perf_counter() - started
+            print(f"  {name}: {converted:,} converted, {len(unparsable)} unparsable, "
+                  f"{converted / elapsed:,.0f} docs/s", end="\r")
+
+        if not self.dry_run:
+            await self.db.migrations.update_one(
+                {"id": checkpoint_id}, {"$set": {"completed_at": utcnow()}}, upsert=True
+            )
+        print(f"  {name}: {converted:,} converted, {len(unparsable)} unparsable" + " " * 20)
+        if unparsable:
+            logger.warning(f"{name}: left {len(unparsable)} unparsable timestamps as strings, e.g. _id {unparsable[0]}")
+        return {"converted": converted, "unparsable": len(unparsable)}
+
+    async def run(self, collections: list = None) -> dict:
+        results = {}
+        for name, fields in TIMESTAMP_FIELDS.items():
+            if collections and name not in collections:
+                continue
+            results[name] = await self.migrate_collection(name, fields)
+        return results
+
+
+async def main(args):
+    migration = TimestampMigration(get_database(), args.batch_size, args.max_duty, args.dry_run)
+    await migration.run(args.collection)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", action="append", choices=sorted(TIMESTAMP_FIELDS),
+                        help="limit to these collections (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-duty", type=float, default=0.25,
+                        help="fraction of wall time spent working; the rest is spent sleeping")
+    parser.add_argument("--dry-run", action="store_true", help="parse one batch per collection without writing")
+    asyncio.run(main(parser.parse_args()))
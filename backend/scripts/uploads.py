@@ -0,0 +1,75 @@
+"""
+Upload storage maintenance
+migrate moves uploads saved under the old timestamp names
+(upload-<ms>-<rand>.png) into content-addressed storage, folding identical
+files together, repointing therapies, affiliations and site settings at
+the new URLs and re-rendering the variants. gc deletes uploads nothing
+references any more (a dry run unless --delete is given).
+
+Run from backend/:
+    python -m scripts.uploads migrate [--dry-run]
+    python -m scripts.uploads gc [--delete] [--grace-hours 24]
+"""
+
+import argparse
+import asyncio
+
+from scripts.database import get_database
+from services.image_variants import image_variants
+from services.upload_store import upload_store, upload_url
+
+
+async def migrate(args):
+    db = get_database()
+    legacy = sorted(path for filename, path in upload_store.iter_files() if "/" not in filename)
+    print(f"{len(legacy)} uploads with legacy names")
+
+    moved = duplicates = references = 0
+    try:
+        for path in legacy:
+            old_url = upload_url(path.name)
+            if args.dry_run:
+                print(f"  {path.name}: {await upload_store.references(db, path.name)} reference(s)")
+                continue
+
+            stored = await asyncio.to_thread(upload_store.adopt, path)
+            references += await upload_store.rewrite_references(db, old_url, upload_url(stored.filename))
+            image_variants.remove(path.name)
+            await db.uploads.delete_one({"filename": path.name})
+            if stored.created:
+                moved += 1
+                manifest = await image_variants.generate(stored.filename)
+                await image_variants.record(db, stored.filename, manifest, sha256=stored.sha256, bytes=stored.bytes)
+            else:
+                duplicates += 1
+            print(f"  {path.name} -> {stored.filename}{'' if stored.created else ' (duplicate)'}")
+    finally:
+        image_variants.close()
+    if not args.dry_run:
+        print(f"{moved} moved, {duplicates} duplicates removed, {references} references updated")
+
+
+async def gc(args):
+    if args.grace_hours is not None:
+        upload_store.gc_grace = int(args.grace_hours * 3600)
+    report = await upload_store.collect_garbage(get_database(), dry_run=not args.delete)
+    for filename in report["removed"]:
+        print(f"  {filename}")
+    verb = "removed" if args.delete else "would be removed (pass --delete)"
+    print(f"{report['files']} files, {report['referenced']} referenced; {len(report['removed'])} {verb}, "
+          f"{report['bytes_reclaimed'] / 1024:,.0f}KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="move legacy uploads into content-addressed storage")
+    migrate_parser.add_argument("--dry-run", action="store_true")
+
+    gc_parser = commands.add_parser("gc", help="delete uploads nothing references")
+    gc_parser.add_argument("--delete", action="store_true", help="actually delete; the default is a dry run")
+    gc_parser.add_argument("--grace-hours", type=float, help="keep files younger than this (UPLOAD_GC_GRACE_SECONDS)")
+
+    args = parser.parse_args()
+    asyncio.run(migrate(args) if args.command == "migrate" else gc(args))
@@ -83,7 +83,15 @@ async function startServer() {
 
     // Serve uploaded images via /api/uploads/ path
     // This ensures images work through proxy (npm start) and nginx (production)
-    app.use('/api/uploads', express.static(path.join(__dirname, 'uploads')));
+    // Content-addressed uploads (<aa>/<bb>/<sha256>.<ext>) and their variants never change, so cache them for good
+    const immutableUpload = /[\\/][0-9a-f]{2}[\\/][0-9a-f]{2}[\\/][0-9a-f]{64}\.\w+$|[\\/]variants[\\/][0-9a-f]{64}[\\/]/;
+    app.use('/api/uploads', express.static(path.join(__dirname, 'uploads'), {
+      setHeaders: (res, filePath) => {
+        if (immutableUpload.test(filePath)) {
+          res.setHeader('Cache-Control', 'public, max-age=31536000, immutable');
+        }
+      }
+    }));
     
     // Serve static files from backend/public folder
     app.use(express.static(path.join(__dirname, 'public')));
@@ -29,6 +29,26 @@ from dotenv import load_dotenv
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+from services.contact_queue import contact_queue
+from services.contact_counters import contact_counters
+from services.email_service import email_service
+from services.image_variants import image_variants
+from services.db_metrics import DbTimingMiddleware, db_metrics
+from services.node_proxy import build_proxy_response, forward_headers
+from controllers.diagnostics_controller import create_diagnostics_routes
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# MongoDB for the few routes Python serves itself (diagnostics); everything else is
+# proxied to Node, which makes its own Mongo calls. Without settings those routes are off.
+MONGO_URL = os.environ.get('MONGO_URL')
+DB_NAME = os.environ.get('DB_NAME')
+mongo_client = AsyncIOMotorClient(MONGO_URL, tz_aware=True, event_listeners=[db_metrics]) if MONGO_URL and DB_NAME else None
+if mongo_client is None:
+    logger.warning("MONGO_URL or DB_NAME not set; the Python diagnostics routes are disabled")
+
+# Catch-all route relaying requests to Node
+PROXY_ROUTE = "/api/{path:path}"
+
 # Node.js server management
 node_process = None
 NODE_SERVER_URL = "http://127.0.0.1:3001"
@@ -94,6 +114,12 @@ async def lifespan(app: FastAPI):
         sys.exit(1)
     yield
     # Shutdown
+    await contact_queue.stop()
+    await contact_counters.stop()
+    await email_service.close()
+    image_variants.close()
+    if mongo_client is not None:
+        mongo_client.close()
     stop_node_server()
 
 # Create FastAPI app
@@ -112,6 +138,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Mongo command counts and time for the routes Python serves, as a Server-Timing header and
+# per route. Proxied requests are not measured: their Mongo calls happen in Node.
+app.add_middleware(DbTimingMiddleware, exclude_routes=(PROXY_ROUTE,))
+
+# Routes served by Python, declared before the catch-all proxy so they match first
+if mongo_client is not None:
+    app.include_router(create_diagnostics_routes(mongo_client[DB_NAME]), prefix="/api")
+
 # HTTP client for proxying
 http_client = None
 
@@ -121,7 +155,7 @@ async def get_http_client():
         http_client = httpx.AsyncClient(timeout=30.0)
     return http_client
 
-@app.api_route("/api/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"])
+@app.api_route(PROXY_ROUTE, methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"])
 async def proxy_to_node(path: str, request: Request):
     """Proxy all /api requests to Node.js server"""
     client = await get_http_client()
@@ -135,10 +169,7 @@ async def proxy_to_node(path: str, request: Request):
             target_url += f"?{request.query_params}"
         
         # Forward headers (except host and content-length for body rewrite)
-        headers = {}
-        for key, value in request.headers.items():
-            if key.lower() not in ('host', 'content-length'):
-                headers[key] = value
+        headers = forward_headers(request.headers)
         
         # Get request body
         body = await request.body()
@@ -151,18 +182,8 @@ async def proxy_to_node(path: str, request: Request):
             content=body if body else None
         )
         
-        # Forward response headers
-        response_headers = {}
-        for key, value in response.headers.items():
-            if key.lower() not in ('content-encoding', 'content-length', 'transfer-encoding'):
-                response_headers[key] = value
-        
-        return Response(
-            content=response.content,
-            status_code=response.status_code,
-            headers=response_headers,
-            media_type=response.headers.get('content-type')
-        )
+        # Relay the response, minus the headers httpx has already acted on
+        return build_proxy_response(response)
         
     except httpx.TimeoutException:
         logger.error(f"Timeout proxying request to {path}")
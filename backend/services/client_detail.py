@@ -0,0 +1,101 @@
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple, Union
+from services.timestamps import parse_timestamp
+
+MAX_NOTES = 100
+
+
+def encode_cursor(note: dict) -> str:
+    """Opaque cursor pointing just past a note in newest-first order
+
+    Older notes may still store created_at as a string, which sorts after
+    every datetime, so the cursor records which kind it points at.
+    """
+    created_at = note["created_at"]
+    if isinstance(created_at, datetime):
+        raw = json.dumps([created_at.isoformat(), note["id"]])
+    else:
+        raw = json.dumps([created_at, note["id"], "string"])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Union[datetime, str], str]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed"""
+    try:
+        created_at, note_id, *kind = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid notes cursor")
+    if kind == ["string"] and isinstance(created_at, str):
+        return created_at, note_id
+    if kind:
+        raise ValueError("Invalid notes cursor")
+    created_at = parse_timestamp(created_at)
+    if created_at is None:
+        raise ValueError("Invalid notes cursor")
+    return created_at, note_id
+
+
+def notes_after(created_at: Union[datetime, str], note_id: str) -> list:
+    """$or clauses for the notes after a cursor in newest-first order
+
+    Mongo only compares values of the same type, and string timestamps sort
+    after all datetimes, so a datetime cursor also takes in every string one.
+    """
+    clauses = [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": note_id}}
+    ]
+    if isinstance(created_at, datetime):
+        clauses.append({"created_at": {"$type": "string"}})
+    return clauses
+
+
+def client_detail_pipeline(client_id: str, notes_limit: int, cursor: Optional[str] = None) -> list:
+    """One aggregation returning the client and a page of notes
+
+    The lookup matches on the literal client id, so it uses the
+    (client_id, created_at) index on client_notes. One note beyond the
+    limit is fetched to tell whether another page exists. Note statistics
+    come from the fields client_note_stats keeps on the client.
+    """
+    notes_match = {"client_id": client_id}
+    if cursor:
+        notes_match["$or"] = notes_after(*decode_cursor(cursor))
+
+    return [
+        {"$match": {"id": client_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "client_notes",
+            "pipeline": [
+                {"$match": notes_match},
+                {"$sort": {"created_at": -1, "id": -1}},
+                {"$limit": notes_limit + 1},
+                {"$project": {"_id": 0}}
+            ],
+            "as": "notes"
+        }},
+        {"$project": {"_id": 0}}
+    ]
+
+
+def shape_client_detail(row: dict, notes_limit: int) -> dict:
+    """Split an aggregation row into the client, its notes page and stats"""
+    notes = row.pop("notes")
+    next_cursor = None
+    if len(notes) > notes_limit:
+        notes = notes[:notes_limit]
+        next_cursor = encode_cursor(notes[-1])
+    return {
+        "client": row,
+        "notes": notes,
+        "next_cursor": next_cursor,
+        "stats": {
+            "note_count": row.get("note_count") or 0,
+            "last_session_date": row.get("last_session_date"),
+            "last_note_at": row.get("last_note_at")
+        }
+    }
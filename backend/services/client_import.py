@@ -0,0 +1,257 @@
+import csv
+import json
+import re
+import time
+import uuid
+import logging
+from collections import ChainMap
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+from models.schemas import ClientCreate
+from services.timestamps import utcnow
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 1000
+DUPLICATE_KEYS = ("email_key", "phone_key")
+
+_non_digits = re.compile(r"\D")
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    return email.strip().lower() if email and email.strip() else None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Digits only, with a +44 prefix folded into the national 0 form"""
+    digits = _non_digits.sub("", phone or "")
+    if digits.startswith("44") and len(digits) > 10:
+        digits = "0" + digits[2:]
+    return digits or None
+
+
+def client_keys(client: dict) -> dict:
+    """Normalized email and phone stored alongside a client for duplicate detection"""
+    return {"email_key": normalize_email(client.get("email")), "phone_key": normalize_phone(client.get("phone"))}
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    suffix = (filename or "").rsplit(".", 1)[-1].lower()
+    if suffix == "csv":
+        return "csv"
+    if suffix in ("jsonl", "ndjson"):
+        return "jsonl"
+    return None
+
+
+def iter_rows(stream: TextIO, file_format: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, row, parse error) from a CSV or JSONL text stream, one row at a time"""
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # line_num is the file line the row ended on (the header is line 1)
+            yield reader.line_num, {k.strip(): v.strip() or None for k, v in row.items() if k and isinstance(v, str)}, None
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Each line must be a JSON object"
+            continue
+        yield number, row, None
+
+
+class ClientImporter:
+    """Streaming bulk import of clients from CSV or JSONL
+
+    Rows are read and validated against ClientCreate a chunk at a time and
+    inserted with insert_many(ordered=False), so memory stays flat however
+    large the file is. A row whose normalized email or phone matches an
+    existing client, or an earlier row in the file, is reported as a
+    duplicate instead of being inserted; the keys of rows already accepted
+    are held in memory for the whole file (two short strings per row). A
+    dry run writes nothing at all: the duplicate-key indexes and backfill
+    are skipped, and the keys of clients that predate them are computed in
+    memory instead.
+
+    The key indexes are not unique, because clients added by hand may
+    share an email or phone (family members, for instance). Duplicate
+    detection therefore only holds within one import: two imports must not
+    run at the same time, or both may insert the same client.
+    """
+
+    def __init__(self, db, chunk_size: int = 1000, dry_run: bool = False,
+                 on_error: Callable[[dict], None] = None):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.on_error = on_error
+        self.rows = 0
+        self.valid = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[dict] = []
+        self.skipped: List[str] = []
+        self._unkeyed = {}
+        self._seen = {}
+
+    async def ensure_indexes(self):
+        """Index the duplicate keys and fill them in for clients created before they existed"""
+        await self.db.clients.create_index([("email_key", ASCENDING)], sparse=True)
+        await self.db.clients.create_index([("phone_key", ASCENDING)], sparse=True)
+
+        batch = []
+        async for client in self._unkeyed_clients():
+            batch.append(UpdateOne({"id": client["id"]}, {"$set": client_keys(client)}))
+            if len(batch) >= self.chunk_size:
+                await self.db.clients.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await self.db.clients.bulk_write(batch, ordered=False)
+
+    async def _load_unkeyed_clients(self) -> int:
+        """Dry run stand-in for the backfill: hold the keys of clients without them in memory"""
+        count = 0
+        async for client in self._unkeyed_clients():
+            count += 1
+            for key, value in client_keys(client).items():
+                if value:
+                    self._unkeyed[(key, value)] = f"existing client {client['id']}"
+        return count
+
+    def _unkeyed_clients(self):
+        return self.db.clients.find({"email_key": {"$exists": False}}, {"_id": 0, "id": 1, "email": 1, "phone": 1})
+
+    async def run(self, stream: TextIO, file_format: str) -> dict:
+        """Import every row of a text stream and return the summary report"""
+        if self.dry_run:
+            unkeyed = await self._load_unkeyed_clients()
+            self.skipped.append("creating the email_key/phone_key indexes")
+            if unkeyed:
+                self.skipped.append(f"backfilling duplicate keys on {unkeyed} existing clients")
+        else:
+            await self.ensure_indexes()
+        started = time.perf_counter()
+        rows = iter_rows(stream, file_format)
+
+        while True:
+            # File reads and parsing happen off the event loop
+            chunk = await run_in_threadpool(lambda: list(islice(rows, self.chunk_size)))
+            if not chunk:
+                break
+            await self._import_chunk(chunk)
+
+        elapsed = time.perf_counter() - started
+        report = {
+            "rows": self.rows,
+            "valid": self.valid,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "dry_run": self.dry_run,
+            "skipped": self.skipped,
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(self.rows / elapsed) if elapsed else None,
+            "errors": self.errors,
+            "errors_truncated": self.duplicates + self.invalid > len(self.errors)
+        }
+        logger.info(f"Client import: {self.inserted}/{self.rows} inserted, {self.duplicates} duplicates, "
+                    f"{self.invalid} invalid in {elapsed:.1f}s")
+        return report
+
+    def _error(self, row: int, kind: str, message: str):
+        error = {"row": row, "type": kind, "message": message}
+        if kind == "duplicate":
+            self.duplicates += 1
+        else:
+            self.invalid += 1
+        if self.on_error:
+            self.on_error(error)
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+
+    async def _import_chunk(self, chunk: Iterable[Tuple[int, Optional[dict], Optional[str]]]):
+        now = utcnow()
+        candidates = []
+        for number, row, parse_error in chunk:
+            self.rows += 1
+            if parse_error:
+                self._error(number, "invalid", parse_error)
+                continue
+            try:
+                client = ClientCreate.model_validate(row)
+            except ValidationError as e:
+                self._error(number, "invalid", "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            document = {
+                "id": str(uuid.uuid4()),
+                **client.model_dump(),
+                "created_at": now,
+                "updated_at": now,
+                "note_count": 0,
+                "last_session_date": None,
+                "last_note_at": None
+            }
+            document.update(client_keys(document))
+            candidates.append((number, document))
+
+        documents = await self._drop_duplicates(candidates)
+        self.valid += len(documents)
+        if not documents or self.dry_run:
+            return
+
+        try:
+            await self.db.clients.insert_many([document for _, document in documents], ordered=False)
+            self.inserted += len(documents)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            self.inserted += len(documents) - len(write_errors)
+            for err in write_errors:
+                self._error(documents[err["index"]][0], "invalid", err.get("errmsg", "Write failed"))
+
+    async def _drop_duplicates(self, candidates: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+        """Remove rows matching an existing client (one indexed query) or an earlier row in the file"""
+        emails = [doc["email_key"] for _, doc in candidates if doc["email_key"]]
+        phones = [doc["phone_key"] for _, doc in candidates if doc["phone_key"]]
+        # Database matches for this chunk first, then earlier rows of the file (which a dry run
+        # never inserts), then the keys computed in memory for a dry run
+        existing = ChainMap({}, self._seen, self._unkeyed)
+        if emails or phones:
+            matches = self.db.clients.find(
+                {"$or": [{"email_key": {"$in": emails}}, {"phone_key": {"$in": phones}}]},
+                {"_id": 0, "id": 1, "email_key": 1, "phone_key": 1}
+            )
+            async for client in matches:
+                for key in DUPLICATE_KEYS:
+                    if client.get(key):
+                        existing[(key, client[key])] = f"existing client {client['id']}"
+
+        unique = []
+        for number, document in candidates:
+            match = next((
+                (key, existing[(key, document[key])]) for key in DUPLICATE_KEYS
+                if document[key] and (key, document[key]) in existing
+            ), None)
+            if match:
+                key, duplicate_of = match
+                self._error(number, "duplicate", f"Same {key.removesuffix('_key')} as {duplicate_of}")
+                continue
+            for key in DUPLICATE_KEYS:
+                if document[key]:
+                    self._seen[(key, document[key])] = f"row {number}"
+            unique.append((number, document))
+        return unique
@@ -0,0 +1,133 @@
+import logging
+from typing import Optional
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Sortable columns of the client list; each has a compound index ending in last_name,
+# walked forwards or backwards, so ties are ordered by name in the same direction
+SORT_FIELDS = ("last_name", "note_count", "last_session_date", "last_note_at")
+
+
+class ClientNoteStats:
+    """Per-client note statistics denormalized onto the client document
+
+    note_count, last_session_date and last_note_at let the client list sort
+    and filter on note activity in a single query. Creating a note updates
+    all three in one $inc/$max write; edits and deletes that can lower a
+    maximum recompute it from the client's notes.
+    """
+
+    def __init__(self):
+        self._indexed = False
+
+    async def ensure_indexes(self, db):
+        """Create the indexes behind list sorting and filtering (once per process)"""
+        if self._indexed:
+            return
+        await db.client_notes.create_index([("client_id", ASCENDING), ("created_at", DESCENDING)])
+        for field in SORT_FIELDS[1:]:
+            await db.clients.create_index([(field, ASCENDING), ("last_name", ASCENDING)])
+        await db.clients.create_index([("last_name", ASCENDING)])
+        self._indexed = True
+
+    async def note_created(self, db, note: dict):
+        update = {
+            "$inc": {"note_count": 1},
+            "$max": {"last_note_at": note["created_at"]}
+        }
+        if note.get("session_date"):
+            update["$max"]["last_session_date"] = note["session_date"]
+        await db.clients.update_one({"id": note["client_id"]}, update)
+
+    async def note_updated(self, db, client_id: str, before: dict, changes: dict):
+        """Refresh last_session_date when an edit changed a note's session date"""
+        if "session_date" not in changes or changes["session_date"] == before.get("session_date"):
+            return
+        latest = await self._latest(db, client_id)
+        await db.clients.update_one({"id": client_id}, {"$set": {"last_session_date": latest["last_session_date"]}})
+
+    async def note_deleted(self, db, client_id: str):
+        latest = await self._latest(db, client_id)
+        await db.clients.update_one({"id": client_id}, {"$inc": {"note_count": -1}, "$set": latest})
+
+    async def backfill(self, db, batch_size: int = 500) -> int:
+        """Recompute the statistics for every client from client_notes; returns clients updated"""
+        stats = {}
+        async for row in db.client_notes.aggregate(self._group_pipeline({})):
+            stats[row["_id"]] = row
+
+        updated = 0
+        batch = []
+        async for client in db.clients.find({}, {"_id": 0, "id": 1}):
+            row = stats.get(client["id"], {})
+            batch.append(UpdateOne({"id": client["id"]}, {"$set": {
+                "note_count": row.get("note_count", 0),
+                "last_session_date": row.get("last_session_date"),
+                "last_note_at": row.get("last_note_at")
+            }}))
+            if len(batch) >= batch_size:
+                updated += (await db.clients.bulk_write(batch, ordered=False)).matched_count
+                batch = []
+        if batch:
+            updated += (await db.clients.bulk_write(batch, ordered=False)).matched_count
+        logger.info(f"Backfilled note statistics for {updated} clients")
+        return updated
+
+    @staticmethod
+    def query(
+        has_notes: Optional[bool] = None,
+        min_notes: Optional[int] = None,
+        session_from: Optional[str] = None,
+        session_to: Optional[str] = None
+    ) -> dict:
+        """Build a clients filter on the denormalized statistics"""
+        query = {}
+        if has_notes is not None:
+            query["note_count"] = {"$gt": 0} if has_notes else {"$in": [0, None]}
+        if min_notes is not None:
+            query.setdefault("note_count", {})["$gte"] = min_notes
+        if session_from or session_to:
+            query["last_session_date"] = {}
+            if session_from:
+                query["last_session_date"]["$gte"] = session_from
+            if session_to:
+                query["last_session_date"]["$lte"] = session_to
+        return query
+
+    @staticmethod
+    def sort(sort: Optional[str]) -> list:
+        """Translate ?sort=field or ?sort=-field into a Mongo sort spec"""
+        if not sort:
+            return [("last_name", ASCENDING)]
+        field = sort.lstrip("-")
+        if field not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by '{field}'")
+        direction = DESCENDING if sort.startswith("-") else ASCENDING
+        if field == "last_name":
+            return [("last_name", direction)]
+        return [(field, direction), ("last_name", direction)]
+
+    @staticmethod
+    def _group_pipeline(match: dict) -> list:
+        return [
+            {"$match": match},
+            {"$group": {
+                "_id": "$client_id",
+                "note_count": {"$sum": 1},
+                # Empty session dates are stored as "" and must not win the $max
+                "last_session_date": {"$max": {
+                    "$cond": [{"$gt": ["$session_date", ""]}, "$session_date", None]
+                }},
+                "last_note_at": {"$max": "$created_at"}
+            }}
+        ]
+
+    async def _latest(self, db, client_id: str) -> dict:
+        rows = await db.client_notes.aggregate(self._group_pipeline({"client_id": client_id})).to_list(1)
+        row = rows[0] if rows else {}
+        return {"last_session_date": row.get("last_session_date"), "last_note_at": row.get("last_note_at")}
+
+
+# Global client note statistics instance
+client_note_stats = ClientNoteStats()
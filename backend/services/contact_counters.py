@@ -0,0 +1,160 @@
+import os
+import asyncio
+import logging
+from typing import List, Optional
+from services.timestamps import utcnow
+
+logger = logging.getLogger(__name__)
+
+COUNTER_ID = "contact_submissions"
+
+
+class ContactCounters:
+    """Unread and total contact counts kept in one counters document
+
+    Writers adjust the document with $inc as submissions are stored, read or
+    deleted, so the dashboard summary is a single indexed lookup. A periodic
+    reconciliation recounts the submissions collection and overwrites the
+    document to repair any drift (a crash between a write and its $inc).
+    Every $inc also bumps a version, and the recount is only written if the
+    version has not moved since it was read, so no concurrent $inc is lost.
+    """
+
+    def __init__(self, reconcile_seconds: int = None):
+        self.reconcile_interval = reconcile_seconds or int(os.environ.get('CONTACT_COUNTER_RECONCILE_SECONDS', '3600'))
+        self.counters = None
+        self.submissions = None
+
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.reconciliations = 0
+        self.last_drift = None
+
+    def bind(self, db):
+        """Attach the database holding the counters and contact_submissions collections"""
+        self.counters = db.counters
+        self.submissions = db.contact_submissions
+
+    async def start(self):
+        """Start the reconciliation loop (no-op until bound)"""
+        if self.counters is None or self._worker is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._worker
+        self._worker = None
+
+    async def record_submitted(self, documents: List[dict]):
+        """Count newly stored submissions, which always arrive unread"""
+        if not documents:
+            return
+        await self.counters.update_one(
+            {"id": COUNTER_ID},
+            {
+                "$inc": {"total": len(documents), "unread": len(documents), "version": 1},
+                "$max": {"latest_at": max(doc["created_at"] for doc in documents)}
+            },
+            upsert=True
+        )
+
+    async def record_read(self, count: int):
+        if count:
+            await self.counters.update_one({"id": COUNTER_ID}, {"$inc": {"unread": -count, "version": 1}})
+
+    async def record_deleted(self, total: int, unread: int):
+        # latest_at may now point at a deleted submission; reconciliation refreshes it
+        if total:
+            await self.counters.update_one(
+                {"id": COUNTER_ID}, {"$inc": {"total": -total, "unread": -unread, "version": 1}}
+            )
+
+    async def summary(self) -> dict:
+        """Unread count, total and latest submission timestamp"""
+        counters = await self.counters.find_one({"id": COUNTER_ID}, {"_id": 0})
+        if counters is None:
+            counters = await self.reconcile()
+        return {
+            "unread": counters.get("unread", 0),
+            "total": counters.get("total", 0),
+            "latest_at": counters.get("latest_at")
+        }
+
+    async def reconcile(self, attempts: int = 3) -> dict:
+        """Recount the submissions and overwrite the counters document
+
+        The recount is written only if the document's version is unchanged
+        since it was read; otherwise an $inc landed meanwhile and the count
+        is taken again. A writer caught between storing a submission and its
+        $inc can still be counted twice, which the next run repairs.
+        """
+        for _ in range(attempts):
+            previous = await self.counters.find_one({"id": COUNTER_ID}, {"_id": 0})
+            counters = await self._count()
+
+            if previous is None:
+                result = await self.counters.update_one(
+                    {"id": COUNTER_ID}, {"$setOnInsert": {**counters, "version": 0}}, upsert=True
+                )
+                written = result.upserted_id is not None
+            else:
+                result = await self.counters.update_one(
+                    {"id": COUNTER_ID, "version": previous.get("version")},
+                    {"$set": counters, "$inc": {"version": 1}}
+                )
+                written = result.matched_count == 1
+            if not written:
+                continue
+
+            if previous:
+                self.last_drift = {
+                    "unread": counters["unread"] - previous.get("unread", 0),
+                    "total": counters["total"] - previous.get("total", 0)
+                }
+                if any(self.last_drift.values()):
+                    logger.warning(f"Contact counters drifted by {self.last_drift}; repaired")
+            self.reconciliations += 1
+            return counters
+
+        logger.warning(f"Contact counters kept changing over {attempts} reconciliation attempts; retrying next run")
+        return counters
+
+    async def _count(self) -> dict:
+        total = await self.submissions.count_documents({})
+        unread = await self.submissions.count_documents({"is_read": False})
+        latest = await self.submissions.find({}, {"_id": 0, "created_at": 1}).sort("created_at", -1).to_list(1)
+        return {
+            "unread": unread,
+            "total": total,
+            "latest_at": latest[0]["created_at"] if latest else None,
+            "reconciled_at": utcnow()
+        }
+
+    def stats(self) -> dict:
+        return {
+            "reconcile_interval_seconds": self.reconcile_interval,
+            "reconciliations": self.reconciliations,
+            "last_drift": self.last_drift
+        }
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Contact counter reconciliation failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.reconcile_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global contact counters instance
+contact_counters = ContactCounters()
@@ -0,0 +1,142 @@
+import os
+import re
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+from typing import List, Optional
+from pymongo import ASCENDING
+from services.timestamps import utcnow
+
+logger = logging.getLogger(__name__)
+
+_whitespace = re.compile(r"\s+")
+
+
+class RecentSubmissionIndex:
+    """Bounded, time-windowed LRU of recent contact submissions
+
+    Submissions are indexed by their Idempotency-Key header (when sent) and
+    by a hash of the normalized email and message. A repeat within the window
+    returns the original record. Unique indexes on idempotency_key and
+    content_key back this up across restarts and worker processes: a repeat
+    this process has not seen is rejected when the queue writes it, so it is
+    neither stored nor notified twice. Mongo is only read while the index is
+    cold, for the first window after the process starts.
+    """
+
+    def __init__(self, max_entries: int = None, window_seconds: int = None, key_ttl_seconds: int = None):
+        self.max_entries = max_entries or int(os.environ.get('CONTACT_DEDUPE_MAX_ENTRIES', '10000'))
+        self.window = window_seconds or int(os.environ.get('CONTACT_DEDUPE_WINDOW_SECONDS', '600'))
+        self.key_ttl = key_ttl_seconds or int(os.environ.get('CONTACT_IDEMPOTENCY_TTL_SECONDS', '86400'))
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._indexed = False
+        self._warm_at = time.monotonic() + self.window
+        self.duplicates_suppressed = 0
+
+    @staticmethod
+    def content_hash(email: str, message: str) -> str:
+        """Hash of the submission content, ignoring case and whitespace differences"""
+        normalized = f"{email.strip().lower()}\n{_whitespace.sub(' ', message).strip().lower()}"
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def content_key(self, content_hash: str, timestamp: float = None) -> str:
+        """Content hash scoped to a window bucket, stored under a unique index
+
+        Buckets are fixed, so the unique index misses a repeat from another
+        worker that lands just across a bucket boundary; the in-memory index
+        and find_stored use a sliding window and catch it.
+        """
+        bucket = int((timestamp or time.time()) // self.window)
+        return f"{content_hash}:{bucket}"
+
+    @property
+    def cold(self) -> bool:
+        """True until this process has seen a full window of submissions"""
+        return time.monotonic() < self._warm_at
+
+    async def ensure_indexes(self, collection):
+        """Create the unique indexes that persist deduplication (once per process)"""
+        if self._indexed:
+            return
+        await collection.create_index(
+            [("idempotency_key", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"idempotency_key": {"$type": "string"}}
+        )
+        await collection.create_index(
+            [("content_key", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"content_key": {"$type": "string"}}
+        )
+        self._indexed = True
+
+    def lookup(self, idempotency_key: Optional[str], content_hash: str) -> Optional[dict]:
+        """Return the original submission if this one is a duplicate"""
+        now = time.monotonic()
+        for key in (f"key:{idempotency_key}" if idempotency_key else None, f"hash:{content_hash}"):
+            if key is None:
+                continue
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            expires, document = entry
+            if expires < now:
+                del self._entries[key]
+                continue
+            self._entries.move_to_end(key)
+            self.duplicates_suppressed += 1
+            logger.info(f"Suppressed duplicate contact submission {document['id']}")
+            return document
+        return None
+
+    async def find_stored(self, collection, idempotency_key: Optional[str], content_hash: str) -> Optional[dict]:
+        """Look the submission up in Mongo, for repeats stored before this process started
+
+        Matches on the same keys as the unique indexes, checking the previous
+        bucket too so a repeat across a bucket boundary is still found.
+        """
+        now = time.time()
+        keys = [{
+            "content_key": {"$in": [self.content_key(content_hash, now), self.content_key(content_hash, now - self.window)]},
+            "created_at": {"$gte": utcnow() - timedelta(seconds=self.window)}
+        }]
+        if idempotency_key:
+            keys.insert(0, {"idempotency_key": idempotency_key})
+        document = await collection.find_one({"$or": keys}, {"_id": 0})
+        if document is None:
+            return None
+        self.remember(idempotency_key, content_hash, document)
+        self.duplicates_suppressed += 1
+        logger.info(f"Suppressed duplicate contact submission {document['id']} (stored)")
+        return document
+
+    def forget(self, documents: List[dict]):
+        """Drop entries for submissions the database rejected, so repeats are not answered with them"""
+        ids = {doc["id"] for doc in documents}
+        for key in [key for key, (_, document) in self._entries.items() if document["id"] in ids]:
+            del self._entries[key]
+
+    def remember(self, idempotency_key: Optional[str], content_hash: str, document: dict):
+        """Record an accepted submission"""
+        now = time.monotonic()
+        if idempotency_key:
+            self._put(f"key:{idempotency_key}", now + self.key_ttl, document)
+        self._put(f"hash:{content_hash}", now + self.window, document)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "duplicates_suppressed": self.duplicates_suppressed
+        }
+
+    def _put(self, key: str, expires: float, document: dict):
+        self._entries[key] = (expires, document)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Global recent contact submission index
+contact_dedupe = RecentSubmissionIndex()
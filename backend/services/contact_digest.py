@@ -0,0 +1,114 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ContactDigest:
+    """Collapses bursts of contact notifications into summary emails
+
+    The first notification after a quiet period is sent straight away. Any
+    that follow within the quiet period are buffered and sent as a single
+    digest once max_items have accumulated or window seconds have passed
+    since the first buffered one, whichever comes first.
+
+    With an outbox bound, buffered notifications are also held in it until
+    their digest is queued, and recover() puts any left by a crashed
+    process back in the buffer. A crash between queueing a digest and
+    releasing its items sends that digest twice rather than not at all.
+    """
+
+    GROUP = "contact_digest"
+
+    def __init__(self, send_single: Callable[..., Awaitable[bool]], send_digest: Callable[[List[dict]], Awaitable[bool]]):
+        self.send_single = send_single
+        self.send_digest = send_digest
+        self.enabled = os.environ.get('CONTACT_DIGEST_ENABLED', 'false').lower() == 'true'
+        self.max_items = int(os.environ.get('CONTACT_DIGEST_MAX_ITEMS', '25'))
+        self.window = float(os.environ.get('CONTACT_DIGEST_WINDOW_SECONDS', '300'))
+        self.quiet_period = float(os.environ.get('CONTACT_DIGEST_QUIET_SECONDS', '600'))
+
+        self.outbox = None
+        self._buffer: List[dict] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._last_sent: Optional[float] = None
+        self.immediate_sends = 0
+        self.digests_sent = 0
+
+    async def notify(self, name: str, email: str, phone: str, message: str) -> bool:
+        """Send now if things are quiet, otherwise add to the pending digest"""
+        now = time.monotonic()
+        quiet = self._last_sent is None or now - self._last_sent >= self.quiet_period
+        if quiet and not self._buffer:
+            self._last_sent = now
+            self.immediate_sends += 1
+            return await self.send_single(name, email, phone, message)
+
+        item = {
+            "name": name,
+            "email": email,
+            "phone": phone,
+            "message": message,
+            "received_at": datetime.now(timezone.utc).strftime("%d %b %Y %H:%M UTC")
+        }
+        if self.outbox is not None:
+            item["held_id"] = await self.outbox.hold(self.GROUP, item)
+        self._buffer.append(item)
+        if len(self._buffer) >= self.max_items:
+            return await self.flush()
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+        return True
+
+    async def flush(self) -> bool:
+        """Send everything buffered as one digest email"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        if not self._buffer:
+            return True
+        submissions, self._buffer = self._buffer, []
+        self._last_sent = time.monotonic()
+        self.digests_sent += 1
+        logger.info(f"Sending contact digest of {len(submissions)} submissions")
+        sent = await self.send_digest(submissions)
+        if self.outbox is not None:
+            await self.outbox.release([item["held_id"] for item in submissions if "held_id" in item])
+        return sent
+
+    def bind(self, outbox):
+        """Hold buffered notifications in the email outbox"""
+        self.outbox = outbox
+
+    async def recover(self):
+        """Buffer notifications held by a previous process and schedule their digest"""
+        if self.outbox is None or self.outbox.collection is None:
+            return
+        held = {item["held_id"] for item in self._buffer if "held_id" in item}
+        recovered = [item for item in await self.outbox.held(self.GROUP) if item["held_id"] not in held]
+        if not recovered:
+            return
+        logger.info(f"Recovered {len(recovered)} contact notifications awaiting a digest")
+        self._buffer = recovered + self._buffer
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "buffered": len(self._buffer),
+            "immediate_sends": self.immediate_sends,
+            "digests_sent": self.digests_sent
+        }
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Contact digest flush failed: {e}")
@@ -0,0 +1,288 @@
+import os
+import uuid
+import fcntl
+import asyncio
+import logging
+from itertools import count
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+from bson import json_util
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+DEFAULT_SPOOL_DIR = Path(__file__).parent.parent / "spool"
+
+# Extended JSON keeps datetimes as datetimes through the spool
+SPOOL_JSON_OPTIONS = json_util.JSONOptions(json_mode=json_util.JSONMode.RELAXED, tz_aware=True)
+
+
+class ContactIngestQueue:
+    """Write-behind queue that batches contact submissions into insert_many calls
+
+    Every accepted submission is appended and fsynced to a local spool file
+    before it is acknowledged. A flush rotates the spool into an in-flight
+    segment, writes the buffered documents and deletes the segment once Mongo
+    has them, so a crash between acknowledgement and flush is replayed on the
+    next start. Documents use their contact id as _id, which makes replays
+    idempotent.
+
+    Each process claims its own worker-N slot under the spool directory with
+    an exclusive file lock and only replays that slot, so workers sharing the
+    directory never take over each other's files; a restarted worker picks up
+    the slot of one that has exited.
+    """
+
+    def __init__(self, batch_size: int = None, flush_interval_ms: int = None, spool_dir: Path = None):
+        self.batch_size = batch_size or int(os.environ.get('CONTACT_QUEUE_BATCH_SIZE', '100'))
+        self.flush_interval = (flush_interval_ms or int(os.environ.get('CONTACT_QUEUE_FLUSH_MS', '250'))) / 1000
+        self.spool_root = Path(spool_dir or os.environ.get('CONTACT_SPOOL_DIR', DEFAULT_SPOOL_DIR))
+        self.spool_dir: Optional[Path] = None
+        self.spool_path: Optional[Path] = None
+
+        self.collection = None
+        self.on_written: Optional[Callable[[List[dict]], Awaitable[None]]] = None
+        self.on_rejected: Optional[Callable[[List[dict]], None]] = None
+        self._buffer: List[dict] = []
+        self._segments: List[Path] = []
+        self._spool = None
+        self._slot_lock = None
+        self._segment = 0
+        self._run_id = uuid.uuid4().hex[:12]
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._spool_lock: Optional[asyncio.Lock] = None
+
+        self.accepted = 0
+        self.written = 0
+        self.flushes = 0
+
+    def bind(self, collection, on_written: Callable[[List[dict]], Awaitable[None]] = None,
+             on_rejected: Callable[[List[dict]], None] = None):
+        """Attach the Mongo collection submissions are written to
+
+        on_written is awaited after each flush with the documents that were
+        newly inserted (replays and rejected duplicates excluded); on_rejected
+        is called with the documents a unique index turned away.
+        """
+        self.collection = collection
+        self.on_written = on_written
+        self.on_rejected = on_rejected
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    async def start(self):
+        """Replay any spooled submissions and start the background flusher"""
+        if self._flusher is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._flusher is not None:
+                return
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._spool_lock = asyncio.Lock()
+            self._stopping = False
+            await asyncio.to_thread(self._open_spool)
+            self._flusher = asyncio.create_task(self._run())
+            if self._buffer:
+                self._wakeup.set()
+            logger.info(f"Contact ingest queue started (batch {self.batch_size}, {int(self.flush_interval * 1000)}ms)")
+
+    async def submit(self, document: dict):
+        """Spool and buffer a validated submission; returns once it is durable locally"""
+        await self.start()
+
+        line = json_util.dumps(document, json_options=SPOOL_JSON_OPTIONS) + "\n"
+        # Held across the write so a flush never rotates the spool between the write and the buffer
+        async with self._spool_lock:
+            await asyncio.to_thread(self._append, line)
+            self._buffer.append(document)
+        self.accepted += 1
+
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write everything buffered so far with a single insert_many"""
+        if not self._buffer:
+            return
+
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+
+            async with self._spool_lock:
+                batch = self._buffer
+                self._buffer = []
+                segments = self._segments + [await asyncio.to_thread(self._rotate_spool)]
+            self._segments = []
+
+            try:
+                inserted, rejected = await self._insert(batch)
+            except Exception as e:
+                # Keep the in-flight segments on disk and retry on the next flush
+                logger.error(f"Contact queue flush of {len(batch)} failed: {e}")
+                self._buffer = batch + self._buffer
+                self._segments = segments + self._segments
+                return
+
+            await asyncio.to_thread(self._remove_segments, segments)
+            self.written += len(batch)
+            self.flushes += 1
+
+            if rejected:
+                logger.warning(f"Contact queue skipped {len(rejected)} submissions already stored: "
+                               f"{', '.join(doc['id'] for doc in rejected)}")
+                if self.on_rejected:
+                    self.on_rejected(rejected)
+
+            if self.on_written and inserted:
+                try:
+                    await self.on_written(inserted)
+                except Exception as e:
+                    logger.error(f"Contact queue on_written hook failed: {e}")
+
+    async def stop(self):
+        """Stop the flusher and drain whatever is still buffered"""
+        if self._flusher is None:
+            return
+
+        # Signal rather than cancel so an in-progress flush always completes
+        self._stopping = True
+        self._wakeup.set()
+        await self._flusher
+        self._flusher = None
+
+        await self.flush()
+        await asyncio.to_thread(self._close_spool)
+        if self._buffer:
+            logger.warning(f"Contact queue stopped with {len(self._buffer)} submissions left in the spool")
+        logger.info("Contact ingest queue drained")
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "accepted": self.accepted,
+            "written": self.written,
+            "flushes": self.flushes
+        }
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                return
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Contact queue flusher error: {e}")
+
+    async def _insert(self, batch: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Insert a batch and return the documents that were newly written and those skipped"""
+        try:
+            await self.collection.insert_many([{"_id": doc["id"], **doc} for doc in batch], ordered=False)
+        except BulkWriteError as e:
+            # Documents written by an earlier attempt, or rejected as duplicate
+            # submissions by a unique index, need no further action
+            write_errors = e.details.get("writeErrors", [])
+            errors = [err for err in write_errors if err.get("code") != DUPLICATE_KEY_ERROR]
+            if errors or e.details.get("writeConcernErrors"):
+                raise
+            skipped = {err["index"] for err in write_errors}
+            return (
+                [doc for i, doc in enumerate(batch) if i not in skipped],
+                [doc for i, doc in enumerate(batch) if i in skipped]
+            )
+        return batch, []
+
+    def _open_spool(self):
+        """Claim a spool slot, replay what it holds and open its spool file (runs in a thread)"""
+        self.spool_dir = self._claim_slot()
+        self.spool_path = self.spool_dir / "contact_submissions.jsonl"
+        self._replay_spool()
+        self._spool = open(self.spool_path, "a", encoding="utf-8")
+
+    def _claim_slot(self) -> Path:
+        """Lock the first worker slot no running process holds"""
+        for n in count():
+            slot = self.spool_root / f"worker-{n}"
+            slot.mkdir(parents=True, exist_ok=True)
+            lock = open(slot / ".lock", "w")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+                continue
+            self._slot_lock = lock
+            return slot
+
+    def _close_spool(self):
+        if self._spool:
+            self._spool.close()
+            self._spool = None
+        if self._slot_lock:
+            # Closing the file releases the lock, so the next process may claim the slot
+            self._slot_lock.close()
+            self._slot_lock = None
+
+    def _append(self, line: str):
+        self._spool.write(line)
+        self._spool.flush()
+        os.fsync(self._spool.fileno())
+
+    @staticmethod
+    def _remove_segments(segments: List[Path]):
+        for segment in segments:
+            segment.unlink(missing_ok=True)
+
+    def _next_segment(self) -> Path:
+        self._segment += 1
+        return self.spool_dir / f"contact_submissions.{self._run_id}-{self._segment:06d}.inflight"
+
+    def _rotate_spool(self) -> Path:
+        self._spool.close()
+        segment = self._next_segment()
+        self.spool_path.rename(segment)
+        self._spool = open(self.spool_path, "a", encoding="utf-8")
+        return segment
+
+    def _replay_spool(self):
+        """Load submissions left behind by a previous process into the buffer"""
+        segments = sorted(self.spool_dir.glob("contact_submissions.*.inflight"))
+        if self.spool_path.exists():
+            segment = self._next_segment()
+            self.spool_path.rename(segment)
+            segments.append(segment)
+
+        for segment in segments:
+            with open(segment, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._buffer.append(json_util.loads(line, json_options=SPOOL_JSON_OPTIONS))
+                    except ValueError:
+                        # A torn final line means the submission was never acknowledged
+                        logger.warning(f"Skipping unreadable spool line in {segment.name}")
+
+        self._segments = segments
+        if self._buffer:
+            logger.info(f"Replaying {len(self._buffer)} spooled contact submissions")
+
+
+# Global contact ingest queue instance
+contact_queue = ContactIngestQueue()
@@ -0,0 +1,223 @@
+import os
+import json
+import logging
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Iterable, Optional
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Handshake, auth and session housekeeping commands, not issued by application code
+IGNORED_COMMANDS = frozenset((
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "saslStart", "saslContinue",
+    "authenticate", "getnonce", "endSessions"
+))
+
+# Where each command keeps the filter whose shape is logged for slow commands
+FILTER_FIELDS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query"}
+
+
+def redact(value):
+    """Shape of a filter with every value replaced by ?: keys and operators stay, data does not"""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [redact(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def command_shape(name: str, command: dict) -> dict:
+    """The redacted parts of a command that explain its cost"""
+    if name in FILTER_FIELDS:
+        shape = {"filter": redact(command.get(FILTER_FIELDS[name], {}))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        return shape
+    if name in ("update", "delete"):
+        statements = command.get("updates" if name == "update" else "deletes", [])
+        shape = {"filter": redact(statements[0].get("q", {})) if statements else {}, "statements": len(statements)}
+        if name == "update" and statements and isinstance(statements[0].get("u"), dict):
+            shape["update"] = redact(statements[0]["u"])
+        return shape
+    if name == "aggregate":
+        return {"pipeline": [
+            {stage: redact(spec) if stage == "$match" else "..." for stage, spec in step.items()}
+            for step in command.get("pipeline", [])
+        ]}
+    if name == "insert":
+        return {"documents": len(command.get("documents", []))}
+    return {}
+
+
+class RequestCommands:
+    """Mongo commands attributed to one request"""
+
+    __slots__ = ("request_line", "count", "duration_ms", "slowest", "kinds")
+
+    def __init__(self, request_line: str = None):
+        self.request_line = request_line
+        self.count = 0
+        self.duration_ms = 0.0
+        self.slowest = None
+        self.kinds = Counter()
+
+
+_current: ContextVar[Optional[RequestCommands]] = ContextVar("db_request_commands", default=None)
+
+
+class DbMetrics(monitoring.CommandListener):
+    """PyMongo command listener attributing every command to the current request
+
+    Register it on the client (event_listeners=[db_metrics]) and wrap the app
+    in DbTimingMiddleware. Motor runs commands on its executor threads with a
+    copy of the caller's context, so the contextvar set for the request is
+    visible here. Commands outside a request (startup, background workers)
+    only go through the slow command log.
+    """
+
+    def __init__(self, slow_ms: float = None):
+        self.slow_ms = slow_ms if slow_ms is not None else float(os.environ.get('DB_SLOW_COMMAND_MS', '100'))
+        self._started = {}
+        self._lock = threading.Lock()
+        self.routes = {}
+        self.slow_commands = 0
+
+    # Command events (called on the thread that ran the command)
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self._started[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+    def _finished(self, event):
+        command = self._started.pop((event.connection_id, event.request_id), None)
+        if command is None:
+            return
+        name = event.command_name
+        target = command.get(name)
+        collection = target if isinstance(target, str) else command.get("collection", "")
+        duration_ms = event.duration_micros / 1000
+
+        request = _current.get()
+        if request is not None:
+            with self._lock:
+                request.count += 1
+                request.duration_ms += duration_ms
+                request.kinds[f"{name} {collection}"] += 1
+                if request.slowest is None or duration_ms > request.slowest[0]:
+                    request.slowest = (duration_ms, name, collection, command)
+
+        if duration_ms >= self.slow_ms:
+            self.slow_commands += 1
+            shape = json.dumps(command_shape(name, command), default=str)
+            during = f" during {request.request_line}" if request is not None and request.request_line else ""
+            logger.warning(f"Slow Mongo {name} on {collection} took {duration_ms:.1f}ms{during}: {shape}")
+
+    # Request attribution
+
+    def begin(self, request_line: str = None):
+        """Start attributing commands to a new request; returns it with the token for end()"""
+        request = RequestCommands(request_line)
+        return request, _current.set(request)
+
+    def end(self, route: str, request: RequestCommands, token):
+        _current.reset(token)
+        with self._lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = {
+                    "requests": 0, "commands": 0, "max_commands": 0, "db_ms": 0.0, "slowest": None, "kinds": Counter()
+                }
+            stats["requests"] += 1
+            stats["commands"] += request.count
+            stats["max_commands"] = max(stats["max_commands"], request.count)
+            stats["db_ms"] += request.duration_ms
+            stats["kinds"].update(request.kinds)
+            slowest = request.slowest
+            if slowest and (stats["slowest"] is None or slowest[0] > stats["slowest"]["duration_ms"]):
+                stats["slowest"] = {
+                    "duration_ms": round(slowest[0], 2),
+                    "command": slowest[1],
+                    "collection": slowest[2],
+                    "shape": command_shape(slowest[1], slowest[3])
+                }
+
+    def discard(self, token):
+        """Stop attributing commands to a request without recording it"""
+        _current.reset(token)
+
+    def stats(self) -> dict:
+        """Per-route command counts and database time, most database time first"""
+        with self._lock:
+            routes = {
+                route: {
+                    "requests": stats["requests"],
+                    "commands": stats["commands"],
+                    "commands_per_request": round(stats["commands"] / stats["requests"], 2),
+                    "max_commands": stats["max_commands"],
+                    "db_ms": round(stats["db_ms"], 2),
+                    "db_ms_per_request": round(stats["db_ms"] / stats["requests"], 2),
+                    "commands_by_kind": {kind: round(count / stats["requests"], 2) for kind, count in stats["kinds"].most_common()},
+                    "slowest": stats["slowest"]
+                }
+                for route, stats in sorted(self.routes.items(), key=lambda item: -item[1]["db_ms"])
+            }
+        return {"slow_command_ms": self.slow_ms, "slow_commands": self.slow_commands, "routes": routes}
+
+    def reset(self):
+        with self._lock:
+            self.routes = {}
+            self.slow_commands = 0
+
+
+class DbTimingMiddleware:
+    """ASGI middleware attributing Mongo commands to routes and adding a Server-Timing header
+
+    Routes whose template is in exclude_routes (a proxy to another server,
+    say) issue no Mongo commands of their own: they get no header and are
+    left out of the per-route statistics.
+    """
+
+    def __init__(self, app, metrics: "DbMetrics" = None, exclude_routes: Iterable[str] = ()):
+        self.app = app
+        self.metrics = metrics or db_metrics
+        self.exclude_routes = frozenset(exclude_routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request, token = self.metrics.begin(f"{scope['method']} {scope['path']}")
+
+        def route_path():
+            # The router stores the matched route in the scope, so routes group by template, not by id
+            return getattr(scope.get("route"), "path", None)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and route_path() not in self.exclude_routes:
+                timing = f'db;dur={request.duration_ms:.1f};desc="{request.count} queries"'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = route_path()
+            if path in self.exclude_routes:
+                self.metrics.discard(token)
+            else:
+                self.metrics.end(f"{scope['method']} {path or scope['path']}", request, token)
+
+
+# Global database metrics instance
+db_metrics = DbMetrics()
@@ -0,0 +1,268 @@
+import os
+import uuid
+import random
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+SKIPPED = "skipped"
+DEAD = "dead"
+HELD = "held"
+
+
+def _percentile(values: list, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(len(ordered) * pct), len(ordered) - 1)], 1)
+
+
+class EmailOutbox:
+    """Durable Mongo-backed email outbox with a leasing worker
+
+    Messages are inserted as pending documents. The worker claims batches by
+    setting a lease, delivers them with bounded concurrency and either marks
+    them sent or schedules a retry with exponential backoff. Messages that
+    keep failing move to the dead state. A lease that expires (the process
+    died mid-send) makes the message claimable again. While no provider is
+    configured, claimed messages are marked skipped instead of retried.
+    Sent and skipped messages are removed by TTL indexes after the
+    retention period; dead ones are kept for inspection.
+
+    Items waiting to be merged into a later message (a digest) are held in
+    the same collection, so they survive a restart until it is queued.
+    """
+
+    def __init__(self, deliver: Callable[..., Awaitable[bool]], configured: Callable[[], bool] = None):
+        self.deliver = deliver
+        self.configured = configured or (lambda: True)
+        self.collection = None
+
+        self.concurrency = int(os.environ.get('EMAIL_OUTBOX_CONCURRENCY', '4'))
+        self.batch_size = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', '20'))
+        self.lease_seconds = int(os.environ.get('EMAIL_OUTBOX_LEASE_SECONDS', '120'))
+        self.max_attempts = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', '6'))
+        self.backoff_base = float(os.environ.get('EMAIL_OUTBOX_BACKOFF_SECONDS', '30'))
+        self.backoff_max = float(os.environ.get('EMAIL_OUTBOX_BACKOFF_MAX_SECONDS', '3600'))
+        self.poll_interval = float(os.environ.get('EMAIL_OUTBOX_POLL_SECONDS', '2'))
+        self.retention_seconds = int(os.environ.get('EMAIL_OUTBOX_RETENTION_DAYS', '14')) * 86400
+
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._send_latency_ms = deque(maxlen=500)
+        self._queue_latency_ms = deque(maxlen=500)
+        self.sent = 0
+        self.retried = 0
+        self.skipped = 0
+        self.dead = 0
+
+    def bind(self, collection):
+        """Attach the Mongo collection used as the outbox"""
+        self.collection = collection
+
+    async def start(self):
+        """Create indexes and start the worker (no-op until bound)"""
+        if self.collection is None or self._worker is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._worker = asyncio.create_task(self._run())
+        await self.collection.create_index([("status", ASCENDING), ("next_attempt_at", ASCENDING)])
+        await self.collection.create_index([("lease_token", ASCENDING)], sparse=True)
+        await self.collection.create_index([("sent_at", ASCENDING)], expireAfterSeconds=self.retention_seconds)
+        await self.collection.create_index([("skipped_at", ASCENDING)], expireAfterSeconds=self.retention_seconds)
+        logger.info(f"Email outbox worker started (concurrency {self.concurrency})")
+
+    async def stop(self):
+        """Stop the worker after its current batch; unsent messages wait for the next start"""
+        if self._worker is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._worker
+        self._worker = None
+        logger.info("Email outbox worker stopped")
+
+    async def enqueue(self, to: str, subject: str, body: str, html_body: str = None) -> str:
+        """Persist a message for delivery and return its id"""
+        await self.start()
+
+        now = datetime.now(timezone.utc)
+        message_id = str(uuid.uuid4())
+        await self.collection.insert_one({
+            "id": message_id,
+            "to": to,
+            "subject": subject,
+            "body": body,
+            "html_body": html_body,
+            "status": PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+            "last_error": None
+        })
+        self._wakeup.set()
+        return message_id
+
+    async def hold(self, group: str, item: dict) -> str:
+        """Persist an item for a message not composed yet and return its id"""
+        held_id = str(uuid.uuid4())
+        await self.collection.insert_one({
+            "id": held_id,
+            "status": HELD,
+            "group": group,
+            "item": item,
+            "created_at": datetime.now(timezone.utc)
+        })
+        return held_id
+
+    async def held(self, group: str) -> list:
+        """Items still held for a group, oldest first, each with its held_id"""
+        documents = await self.collection.find(
+            {"status": HELD, "group": group}, {"_id": 0}
+        ).sort("created_at", 1).to_list(None)
+        return [{**doc["item"], "held_id": doc["id"]} for doc in documents]
+
+    async def release(self, held_ids: list):
+        """Drop held items once the message that covers them is queued"""
+        if held_ids:
+            await self.collection.delete_many({"id": {"$in": held_ids}, "status": HELD})
+
+    async def stats(self) -> dict:
+        """Queue depth per state plus recent latency percentiles"""
+        depth = {}
+        if self.collection is not None:
+            counts = await self.collection.aggregate([
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ]).to_list(None)
+            depth = {row["_id"]: row["count"] for row in counts}
+        return {
+            "depth": {state: depth.get(state, 0) for state in (PENDING, SENDING, SENT, SKIPPED, DEAD, HELD)},
+            "sent": self.sent,
+            "retried": self.retried,
+            "skipped": self.skipped,
+            "dead": self.dead,
+            "send_latency_ms": {
+                "p50": _percentile(list(self._send_latency_ms), 0.5),
+                "p95": _percentile(list(self._send_latency_ms), 0.95)
+            },
+            "queue_latency_ms": {
+                "p50": _percentile(list(self._queue_latency_ms), 0.5),
+                "p95": _percentile(list(self._queue_latency_ms), 0.95)
+            }
+        }
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while not self._stopping:
+            try:
+                batch = await self._claim()
+            except Exception as e:
+                logger.error(f"Email outbox claim failed: {e}")
+                batch = []
+
+            if batch:
+                async def send(message):
+                    async with semaphore:
+                        await self._send(message)
+                results = await asyncio.gather(*(send(message) for message in batch), return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Exception):
+                        # Lease expiry will hand the message to a later claim
+                        logger.error(f"Email outbox bookkeeping failed: {result}")
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _claimable(self, now: datetime) -> dict:
+        return {"$or": [
+            {"status": PENDING, "next_attempt_at": {"$lte": now}},
+            {"status": SENDING, "lease_expires_at": {"$lt": now}}
+        ]}
+
+    async def _claim(self) -> list:
+        """Lease up to batch_size due messages in three round trips"""
+        now = datetime.now(timezone.utc)
+        candidates = await self.collection.find(
+            self._claimable(now), {"_id": 0, "id": 1}
+        ).sort("next_attempt_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not candidates:
+            return []
+
+        lease_token = str(uuid.uuid4())
+        await self.collection.update_many(
+            {"id": {"$in": [c["id"] for c in candidates]}, **self._claimable(now)},
+            {
+                "$set": {
+                    "status": SENDING,
+                    "lease_token": lease_token,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds)
+                },
+                "$inc": {"attempts": 1}
+            }
+        )
+        return await self.collection.find({"lease_token": lease_token}, {"_id": 0}).to_list(self.batch_size)
+
+    async def _send(self, message: dict):
+        if not self.configured():
+            self.skipped += 1
+            logger.warning(f"No email provider configured; skipping email {message['id']} to {message['to']}")
+            await self.collection.update_one({"id": message["id"], "lease_token": message["lease_token"]}, {
+                "$set": {"status": SKIPPED, "skipped_at": datetime.now(timezone.utc)},
+                "$unset": {"lease_token": "", "lease_expires_at": ""}
+            })
+            return
+
+        started = time.perf_counter()
+        try:
+            delivered = await self.deliver(message["to"], message["subject"], message["body"], message.get("html_body"))
+            error = None if delivered else "Provider reported failure"
+        except Exception as e:
+            delivered, error = False, str(e)
+        self._send_latency_ms.append((time.perf_counter() - started) * 1000)
+
+        now = datetime.now(timezone.utc)
+        lease = {"id": message["id"], "lease_token": message["lease_token"]}
+        if delivered:
+            created_at = message["created_at"]
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            self._queue_latency_ms.append((now - created_at).total_seconds() * 1000)
+            self.sent += 1
+            await self.collection.update_one(lease, {
+                "$set": {"status": SENT, "sent_at": now, "last_error": None},
+                "$unset": {"lease_token": "", "lease_expires_at": ""}
+            })
+            return
+
+        if message["attempts"] >= self.max_attempts:
+            self.dead += 1
+            logger.error(f"Email {message['id']} to {message['to']} moved to dead letter: {error}")
+            await self.collection.update_one(lease, {
+                "$set": {"status": DEAD, "last_error": error, "failed_at": now},
+                "$unset": {"lease_token": "", "lease_expires_at": ""}
+            })
+            return
+
+        delay = min(self.backoff_base * 2 ** (message["attempts"] - 1), self.backoff_max)
+        delay *= random.uniform(0.8, 1.2)
+        self.retried += 1
+        logger.warning(f"Email {message['id']} attempt {message['attempts']} failed, retrying in {delay:.0f}s: {error}")
+        await self.collection.update_one(lease, {
+            "$set": {"status": PENDING, "last_error": error, "next_attempt_at": now + timedelta(seconds=delay)},
+            "$unset": {"lease_token": "", "lease_expires_at": ""}
+        })
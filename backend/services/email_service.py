@@ -1,12 +1,49 @@
 import os
+import time
+import asyncio
 import logging
-import aiosmtplib
+import math
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import httpx
+from services.smtp_pool import SMTPConnectionPool
+from services.email_outbox import EmailOutbox
+from services.email_templates import email_templates
+from services.contact_digest import ContactDigest
 
 logger = logging.getLogger(__name__)
 
+# Graph rejects $batch payloads with more sub-requests than this
+GRAPH_BATCH_LIMIT = 20
+
+# Statuses Graph uses for throttled or temporarily unavailable requests
+GRAPH_RETRY_STATUSES = (429, 503, 504)
+
+
+def retry_after_seconds(value) -> Optional[float]:
+    """Seconds to wait from a Retry-After value, either delta-seconds or an HTTP-date
+
+    Returns None for a missing or unusable value, so the caller falls back to
+    its own backoff.
+    """
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        try:
+            when = parsedate_to_datetime(str(value))
+        except (TypeError, ValueError, IndexError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return max(seconds, 0.0) if math.isfinite(seconds) else None
+
 
 class EmailService:
     """Email service supporting both GoDaddy SMTP and Microsoft Graph API"""
@@ -20,15 +57,73 @@ class EmailService:
         self.smtp_user = os.environ.get('SMTP_USER', '')
         self.smtp_password = os.environ.get('SMTP_PASSWORD', '')
         self.smtp_from = os.environ.get('SMTP_FROM', '')
+        self.smtp_pool = SMTPConnectionPool(
+            hostname=self.smtp_host,
+            port=self.smtp_port,
+            username=self.smtp_user,
+            password=self.smtp_password,
+            use_tls=True,
+            max_size=int(os.environ.get('SMTP_POOL_SIZE', '2')),
+            max_messages=int(os.environ.get('SMTP_MAX_MESSAGES_PER_CONNECTION', '50'))
+        )
         
         # Microsoft Graph settings
         self.ms_client_id = os.environ.get('MS_CLIENT_ID', '')
         self.ms_client_secret = os.environ.get('MS_CLIENT_SECRET', '')
         self.ms_tenant_id = os.environ.get('MS_TENANT_ID', '')
         self.ms_user_id = os.environ.get('MS_USER_ID', '')  # User email for sending
+        self.ms_login_url = os.environ.get('MS_LOGIN_URL', 'https://login.microsoftonline.com')
+        self.ms_graph_url = os.environ.get('MS_GRAPH_URL', 'https://graph.microsoft.com/v1.0')
+        
+        # Graph access token cache, refreshed shortly before it expires
+        self._ms_token = None
+        self._ms_token_expires_at = 0.0
+        self._ms_token_lock = None
+        self.ms_token_refresh_margin = int(os.environ.get('MS_TOKEN_REFRESH_MARGIN_SECONDS', '300'))
+        self.ms_token_requests = 0
+        
+        # Bulk sends via Graph $batch; all batches pause together while Graph is throttling
+        self.ms_batch_concurrency = int(os.environ.get('MS_BATCH_CONCURRENCY', '4'))
+        self.ms_batch_max_attempts = int(os.environ.get('MS_BATCH_MAX_ATTEMPTS', '5'))
+        self.ms_batch_backoff = float(os.environ.get('MS_BATCH_BACKOFF_SECONDS', '2'))
+        self.ms_batch_backoff_max = float(os.environ.get('MS_BATCH_BACKOFF_MAX_SECONDS', '120'))
+        self._ms_throttled_until = 0.0
+        self.ms_batch_requests = 0
+        self.ms_throttled = 0
+        
+        # Long-lived pooled HTTP client shared by all Graph calls
+        self.http_client = httpx.AsyncClient(timeout=30.0)
         
         # Recipient email for contact forms
         self.contact_recipient = os.environ.get('CONTACT_EMAIL', '')
+        
+        # Durable outbox; messages are sent directly until a collection is attached
+        self.outbox = EmailOutbox(self.send_email, configured=self.has_provider)
+        
+        # Optional digest mode for bursts of contact notifications
+        self.contact_digest = ContactDigest(self._send_single_contact_notification, self._send_contact_digest)
+    
+    def use_outbox(self, collection):
+        """Route queued emails, and contact notifications awaiting a digest, through a Mongo outbox collection"""
+        self.outbox.bind(collection)
+        self.contact_digest.bind(self.outbox)
+    
+    async def start(self):
+        """Start the outbox worker and requeue digest notifications left by a previous process"""
+        await self.outbox.start()
+        await self.contact_digest.recover()
+    
+    async def queue_email(self, to: str, subject: str, body: str, html_body: str = None) -> bool:
+        """Hand an email to the outbox worker, or send it directly if no outbox is attached"""
+        if self.outbox.collection is None:
+            return await self.send_email(to, subject, body, html_body)
+        
+        await self.outbox.enqueue(to, subject, body, html_body)
+        return True
+    
+    def has_provider(self) -> bool:
+        """Whether an email provider is configured"""
+        return self.provider in ('godaddy', 'microsoft')
     
     async def send_email(self, to: str, subject: str, body: str, html_body: str = None) -> bool:
         """Send email using configured provider"""
@@ -52,62 +147,91 @@ class EmailService:
             if html_body:
                 message.attach(MIMEText(html_body, "html"))
             
-            await aiosmtplib.send(
-                message,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                username=self.smtp_user,
-                password=self.smtp_password,
-                use_tls=True
-            )
+            await self.smtp_pool.send(message)
             logger.info(f"Email sent via GoDaddy to {to}")
             return True
         except Exception as e:
             logger.error(f"GoDaddy SMTP error: {e}")
             return False
     
-    async def _get_microsoft_token(self) -> str:
-        """Get Microsoft Graph API access token"""
-        url = f"https://login.microsoftonline.com/{self.ms_tenant_id}/oauth2/v2.0/token"
-        data = {
-            "client_id": self.ms_client_id,
-            "client_secret": self.ms_client_secret,
-            "scope": "https://graph.microsoft.com/.default",
-            "grant_type": "client_credentials"
-        }
+    def _cached_microsoft_token(self, rejected_token: str = None):
+        if self._ms_token and self._ms_token != rejected_token and time.monotonic() < self._ms_token_expires_at:
+            return self._ms_token
+        return None
+    
+    async def _get_microsoft_token(self, rejected_token: str = None) -> str:
+        """Get a Microsoft Graph API access token, cached until shortly before expiry"""
+        token = self._cached_microsoft_token(rejected_token)
+        if token:
+            return token
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, data=data)
+        if self._ms_token_lock is None:
+            self._ms_token_lock = asyncio.Lock()
+        
+        # Single flight: concurrent senders wait for one refresh instead of each requesting a token
+        async with self._ms_token_lock:
+            token = self._cached_microsoft_token(rejected_token)
+            if token:
+                return token
+            
+            url = f"{self.ms_login_url}/{self.ms_tenant_id}/oauth2/v2.0/token"
+            data = {
+                "client_id": self.ms_client_id,
+                "client_secret": self.ms_client_secret,
+                "scope": "https://graph.microsoft.com/.default",
+                "grant_type": "client_credentials"
+            }
+            
+            response = await self.http_client.post(url, data=data)
             response.raise_for_status()
-            return response.json()["access_token"]
+            self.ms_token_requests += 1
+            
+            payload = response.json()
+            expires_in = int(payload.get("expires_in", 3599))
+            self._ms_token = payload["access_token"]
+            self._ms_token_expires_at = time.monotonic() + max(expires_in - self.ms_token_refresh_margin, 0)
+            return self._ms_token
+    
+    def _graph_message(self, to: str, subject: str, body: str, html_body: str = None) -> dict:
+        """Build a Graph sendMail payload"""
+        return {
+            "message": {
+                "subject": subject,
+                "body": {
+                    "contentType": "HTML" if html_body else "Text",
+                    "content": html_body or body
+                },
+                "toRecipients": [
+                    {"emailAddress": {"address": to}}
+                ]
+            },
+            "saveToSentItems": "true"
+        }
+    
+    async def _post_to_graph(self, url: str, payload: dict) -> httpx.Response:
+        """POST to Graph with the cached token, refreshing it once if rejected"""
+        token = await self._get_microsoft_token()
+        response = await self.http_client.post(
+            url,
+            json=payload,
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        if response.status_code == 401:
+            # Token revoked or rotated early; refresh once and retry
+            token = await self._get_microsoft_token(rejected_token=token)
+            response = await self.http_client.post(
+                url,
+                json=payload,
+                headers={"Authorization": f"Bearer {token}"}
+            )
+        return response
     
     async def _send_via_microsoft(self, to: str, subject: str, body: str, html_body: str = None) -> bool:
         """Send email via Microsoft Graph API"""
         try:
-            token = await self._get_microsoft_token()
-            url = f"https://graph.microsoft.com/v1.0/users/{self.ms_user_id}/sendMail"
-            
-            email_data = {
-                "message": {
-                    "subject": subject,
-                    "body": {
-                        "contentType": "HTML" if html_body else "Text",
-                        "content": html_body or body
-                    },
-                    "toRecipients": [
-                        {"emailAddress": {"address": to}}
-                    ]
-                },
-                "saveToSentItems": "true"
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    json=email_data,
-                    headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-                )
-                response.raise_for_status()
+            url = f"{self.ms_graph_url}/users/{self.ms_user_id}/sendMail"
+            response = await self._post_to_graph(url, self._graph_message(to, subject, body, html_body))
+            response.raise_for_status()
             
             logger.info(f"Email sent via Microsoft Graph to {to}")
             return True
@@ -115,69 +239,151 @@ class EmailService:
             logger.error(f"Microsoft Graph error: {e}")
             return False
     
+    async def send_bulk(self, messages: List[dict]) -> List[dict]:
+        """Send many emails at once; returns one result per message, in order
+        
+        Each message is a dict with to, subject, body and optionally html_body.
+        With Microsoft Graph the messages are packed into $batch requests.
+        """
+        results = [None] * len(messages)
+        semaphore = asyncio.Semaphore(self.ms_batch_concurrency)
+        
+        if self.provider != 'microsoft':
+            async def send_one(index):
+                message = messages[index]
+                async with semaphore:
+                    sent = await self.send_email(message["to"], message["subject"], message["body"], message.get("html_body"))
+                results[index] = {"to": message["to"], "success": sent, "status": None, "error": None if sent else "Send failed"}
+            
+            await asyncio.gather(*(send_one(i) for i in range(len(messages))))
+            return results
+        
+        async def send_batch(indexes):
+            async with semaphore:
+                await self._send_graph_batch(messages, indexes, results)
+        
+        indexes = list(range(len(messages)))
+        await asyncio.gather(*(
+            send_batch(indexes[i:i + GRAPH_BATCH_LIMIT]) for i in range(0, len(indexes), GRAPH_BATCH_LIMIT)
+        ))
+        sent = sum(1 for result in results if result["success"])
+        logger.info(f"Bulk send via Microsoft Graph: {sent}/{len(messages)} sent")
+        return results
+    
+    def _throttle(self, retry_after: Optional[float], attempt: int) -> None:
+        """Pause every batch until Graph's Retry-After, or back off exponentially without one"""
+        delay = retry_after
+        if delay is None:
+            delay = min(self.ms_batch_backoff * 2 ** attempt, self.ms_batch_backoff_max) * random.uniform(0.8, 1.2)
+        self.ms_throttled += 1
+        self._ms_throttled_until = max(self._ms_throttled_until, time.monotonic() + delay)
+    
+    async def _send_graph_batch(self, messages: List[dict], indexes: List[int], results: List[dict]) -> None:
+        """Send up to GRAPH_BATCH_LIMIT messages in one $batch request, retrying throttled ones"""
+        url = f"{self.ms_graph_url}/$batch"
+        remaining = indexes
+        error = None
+        
+        for attempt in range(self.ms_batch_max_attempts):
+            wait = self._ms_throttled_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            
+            payload = {"requests": [
+                {
+                    "id": str(index),
+                    "method": "POST",
+                    "url": f"/users/{self.ms_user_id}/sendMail",
+                    "headers": {"Content-Type": "application/json"},
+                    "body": self._graph_message(
+                        messages[index]["to"],
+                        messages[index]["subject"],
+                        messages[index]["body"],
+                        messages[index].get("html_body")
+                    )
+                }
+                for index in remaining
+            ]}
+            
+            try:
+                self.ms_batch_requests += 1
+                response = await self._post_to_graph(url, payload)
+                if response.status_code in GRAPH_RETRY_STATUSES:
+                    error = f"Graph returned {response.status_code}"
+                    self._throttle(retry_after_seconds(response.headers.get("Retry-After")), attempt)
+                    continue
+                response.raise_for_status()
+                responses = response.json()["responses"]
+            except Exception as e:
+                logger.error(f"Microsoft Graph batch error: {e}")
+                error = str(e)
+                break
+            
+            retry, retry_after = [], None
+            for item in responses:
+                index = int(item["id"])
+                status = item["status"]
+                if status in GRAPH_RETRY_STATUSES:
+                    retry.append(index)
+                    seconds = retry_after_seconds((item.get("headers") or {}).get("Retry-After"))
+                    if seconds is not None:
+                        retry_after = max(seconds, retry_after or 0.0)
+                    continue
+                
+                success = 200 <= status < 300
+                results[index] = {
+                    "to": messages[index]["to"],
+                    "success": success,
+                    "status": status,
+                    "error": None if success else ((item.get("body") or {}).get("error") or {}).get("message", f"Graph returned {status}")
+                }
+            
+            if not retry:
+                return
+            error = "Throttled by Microsoft Graph"
+            remaining = sorted(retry)
+            self._throttle(retry_after, attempt)
+        
+        for index in remaining:
+            if results[index] is None:
+                results[index] = {"to": messages[index]["to"], "success": False, "status": None, "error": error}
+    
+    async def close(self):
+        """Flush pending digests, stop the outbox worker and release pooled connections"""
+        await self.contact_digest.flush()
+        await self.outbox.stop()
+        await self.smtp_pool.close()
+        await self.http_client.aclose()
+    
     async def send_contact_notification(self, name: str, email: str, phone: str, message: str) -> bool:
         """Send contact form notification to business owner"""
         if not self.contact_recipient:
             logger.warning("No contact recipient configured")
             return False
         
-        subject = f"New Contact Form Submission from {name}"
-        body = f"""
-New contact form submission:
-
-Name: {name}
-Email: {email}
-Phone: {phone or 'Not provided'}
-
-Message:
-{message}
-        """
-        
-        html_body = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: 'Manrope', sans-serif; color: #374151; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #9F87C4 0%, #A7D7C5 100%); padding: 20px; border-radius: 8px 8px 0 0; }}
-        .header h1 {{ color: white; margin: 0; }}
-        .content {{ background: #f9fafb; padding: 20px; border-radius: 0 0 8px 8px; }}
-        .field {{ margin-bottom: 15px; }}
-        .label {{ font-weight: 600; color: #6b7280; }}
-        .value {{ margin-top: 5px; }}
-        .message {{ background: white; padding: 15px; border-radius: 8px; border: 1px solid #e5e7eb; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>New Contact Form Submission</h1>
-        </div>
-        <div class="content">
-            <div class="field">
-                <div class="label">Name</div>
-                <div class="value">{name}</div>
-            </div>
-            <div class="field">
-                <div class="label">Email</div>
-                <div class="value"><a href="mailto:{email}">{email}</a></div>
-            </div>
-            <div class="field">
-                <div class="label">Phone</div>
-                <div class="value">{phone or 'Not provided'}</div>
-            </div>
-            <div class="field">
-                <div class="label">Message</div>
-                <div class="message">{message}</div>
-            </div>
-        </div>
-    </div>
-</body>
-</html>
-        """
+        if self.contact_digest.enabled:
+            return await self.contact_digest.notify(name, email, phone, message)
+        return await self._send_single_contact_notification(name, email, phone, message)
+    
+    async def _send_single_contact_notification(self, name: str, email: str, phone: str, message: str) -> bool:
+        """Send one notification email for one submission"""
+        # Collapse whitespace so a crafted name cannot inject extra headers
+        subject = f"New Contact Form Submission from {' '.join(name.split())}"
+        body, html_body = email_templates.render(
+            "contact_notification",
+            name=name,
+            email=email,
+            phone=phone,
+            message=message
+        )
         
-        return await self.send_email(self.contact_recipient, subject, body, html_body)
+        return await self.queue_email(self.contact_recipient, subject, body, html_body)
+    
+    async def _send_contact_digest(self, submissions: list) -> bool:
+        """Send one summary email covering several submissions"""
+        subject = f"{len(submissions)} New Contact Form Submissions"
+        body, html_body = email_templates.render("contact_digest", submissions=submissions)
+        return await self.queue_email(self.contact_recipient, subject, body, html_body)
 
 
 # Global email service instance
@@ -0,0 +1,75 @@
+import os
+import re
+import logging
+from pathlib import Path
+from typing import Tuple
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates" / "email"
+
+# Templates that are compiled at startup; each has a .txt and a .html variant
+TEMPLATES = ("contact_notification", "contact_digest")
+
+_inline_marker = re.compile(r"/\*\s*inline:\s*([\w.-]+)\s*\*/")
+
+
+class InliningLoader(FileSystemLoader):
+    """FileSystemLoader that splices /* inline: file.css */ markers into the source
+
+    Inlining happens before compilation, so static CSS becomes part of the
+    compiled template instead of being looked up or escaped on every render.
+    """
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        inlined = []
+
+        def inline(match):
+            path = Path(filename).parent / match.group(1)
+            inlined.append((path, path.stat().st_mtime))
+            # Wrap in raw so CSS braces are never parsed as Jinja syntax
+            return "{% raw %}" + path.read_text(encoding="utf-8") + "{% endraw %}"
+
+        source = _inline_marker.sub(inline, source)
+
+        def is_uptodate():
+            if not uptodate():
+                return False
+            return all(path.exists() and path.stat().st_mtime == mtime for path, mtime in inlined)
+
+        return source, filename, is_uptodate
+
+
+class EmailTemplates:
+    """Compiled Jinja2 email templates rendering plain-text and HTML bodies"""
+
+    def __init__(self, template_dir: Path = TEMPLATE_DIR, auto_reload: bool = None):
+        if auto_reload is None:
+            auto_reload = os.environ.get('EMAIL_TEMPLATE_RELOAD', 'false').lower() == 'true'
+
+        self.env = Environment(
+            loader=InliningLoader(str(template_dir)),
+            autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False),
+            undefined=StrictUndefined,
+            auto_reload=auto_reload,
+            cache_size=-1,
+            keep_trailing_newline=True
+        )
+
+        # Compile everything up front so the first email pays no compile cost
+        for name in TEMPLATES:
+            self.env.get_template(f"{name}.txt")
+            self.env.get_template(f"{name}.html")
+        logger.info(f"Compiled {len(TEMPLATES)} email templates (auto reload {'on' if auto_reload else 'off'})")
+
+    def render(self, template: str, **context) -> Tuple[str, str]:
+        """Render a template's plain-text and HTML bodies"""
+        text = self.env.get_template(f"{template}.txt").render(**context)
+        html = self.env.get_template(f"{template}.html").render(**context)
+        return text, html
+
+
+# Global email templates instance
+email_templates = EmailTemplates()
@@ -0,0 +1,43 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel, create_model
+from models.schemas import BaseSchema
+
+
+def parse_fields(model: Type[BaseModel], fields: Optional[str],
+                 default: Optional[Tuple[str, ...]] = None) -> Optional[Tuple[str, ...]]:
+    """Validate a comma separated ?fields= value against a schema
+
+    Returns `default` when no fieldset was requested (None meaning every
+    field), otherwise the requested field names (always including id) in
+    schema order. There is no wildcard, so fields a default leaves out, such
+    as medical_notes, are only sent when named.
+    """
+    if fields is None:
+        return default
+
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    requested.add("id")
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+def projection(fields: Optional[Tuple[str, ...]]) -> dict:
+    """Turn a parsed fieldset into a Mongo projection"""
+    if fields is None:
+        return {"_id": 0}
+    return {"_id": 0, **{name: 1 for name in fields}}
+
+
+@lru_cache(maxsize=256)
+def sparse_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Build (once per fieldset) a response model holding only the requested fields"""
+    definitions = {name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    return create_model(f"{model.__name__}Fields", __base__=BaseSchema, **definitions)
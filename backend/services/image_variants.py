@@ -0,0 +1,172 @@
+import os
+import shutil
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+from services.timestamps import utcnow
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPLOAD_DIR = Path(__file__).parent.parent / "uploads"
+UPLOAD_URL_PREFIX = "/api/uploads"
+VARIANTS_DIR = "variants"
+
+# Documents whose image fields get a copy of the variant manifest: (collection, url field, manifest field)
+REFERENCES = (
+    ("therapies", "image_url", "image_variants"),
+    ("affiliations", "logo_url", "logo_variants")
+)
+# Upload URL fields of the site_settings document; upload_store counts references from these too
+SETTINGS_IMAGE_FIELDS = ("images.logo_url", "images.hero_images", "images.contact_image_url", "about_me.photo_url")
+
+ENCODER_OPTIONS = {
+    "avif": {"quality": 55, "speed": 8},
+    "webp": {"quality": 80, "method": 4}
+}
+
+
+def variant_url(image_url: str, width: int, image_format: str) -> str:
+    """URL of one variant of an uploaded image: /api/uploads/variants/<stem>/<width>.<format>"""
+    stem = Path(image_url).stem
+    return f"{UPLOAD_URL_PREFIX}/{VARIANTS_DIR}/{stem}/{width}.{image_format}"
+
+
+def pick_variant(manifest: Optional[dict], width: int, image_format: str = "webp") -> Optional[dict]:
+    """Smallest variant at least width pixels wide, or the largest there is"""
+    if not manifest:
+        return None
+    candidates = [v for v in manifest["variants"] if v["format"] == image_format]
+    if not candidates:
+        return None
+    return next((v for v in candidates if v["width"] >= width), candidates[-1])
+
+
+def render_variants(source: str, out_dir: str, widths: tuple, formats: tuple) -> Optional[dict]:
+    """Resize one image to each width and encode it in each format (runs in a worker process)
+
+    Returns None for files Pillow cannot rasterize (SVG) and for animated
+    images, which are served as uploaded.
+    """
+    try:
+        image = Image.open(source)
+    except UnidentifiedImageError:
+        return None
+    if getattr(image, "is_animated", False):
+        return None
+
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    source_width, source_height = image.size
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    variants = []
+    # Never upscale: widths beyond the original collapse into one original-width variant
+    for width in sorted({min(w, source_width) for w in widths}, reverse=True):
+        height = max(1, round(source_height * width / source_width))
+        if width != image.width:
+            # Each size is reduced from the previous, larger one, which is much cheaper than starting over
+            image = image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for image_format in formats:
+            path = out / f"{width}.{image_format}"
+            partial = out / f".{width}.{image_format}.part"
+            image.save(partial, format=image_format.upper(), **ENCODER_OPTIONS[image_format])
+            os.replace(partial, path)
+            variants.append({"width": width, "height": height, "format": image_format,
+                             "bytes": path.stat().st_size})
+
+    variants.sort(key=lambda v: (v["format"], v["width"]))
+    return {"width": source_width, "height": source_height, "variants": variants}
+
+
+class ImageVariants:
+    """Responsive image variants for uploads, rendered in a process pool
+
+    Decoding, resizing and AVIF/WebP encoding are CPU bound and hold the GIL,
+    so they run in a ProcessPoolExecutor and the event loop only awaits the
+    result. Variants live beside the uploads under variants/<stem>/<width>.<format>
+    (served by the existing /api/uploads static route); the manifest is kept
+    in the uploads collection and copied onto every document whose image
+    field points at the upload.
+    """
+
+    def __init__(self, upload_dir: Optional[str] = None):
+        self.upload_dir = Path(upload_dir or os.environ.get('UPLOAD_DIR', DEFAULT_UPLOAD_DIR))
+        self.widths = tuple(int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '160,320,640,1280,1920').split(','))
+        requested = os.environ.get('IMAGE_VARIANT_FORMATS', 'avif,webp').split(',')
+        self.formats = tuple(f for f in requested if f in ENCODER_OPTIONS and features.check(f))
+        self.workers = int(os.environ.get('IMAGE_WORKERS', str(min(2, os.cpu_count() or 1))))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.rendered = 0
+
+    async def generate(self, filename: str) -> Optional[dict]:
+        """Render every variant of an uploaded file and return its manifest"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        loop = asyncio.get_running_loop()
+        manifest = await loop.run_in_executor(
+            self._executor, render_variants,
+            str(self.upload_dir / filename), str(self.variant_dir(filename)), self.widths, self.formats
+        )
+        if manifest is None:
+            return None
+
+        image_url = f"{UPLOAD_URL_PREFIX}/{filename}"
+        for variant in manifest["variants"]:
+            variant["url"] = variant_url(image_url, variant["width"], variant["format"])
+        manifest["srcset"] = {
+            image_format: ", ".join(f"{v['url']} {v['width']}w" for v in manifest["variants"] if v["format"] == image_format)
+            for image_format in self.formats
+        }
+        self.rendered += 1
+        return manifest
+
+    def variant_dir(self, filename: str) -> Path:
+        return self.upload_dir / VARIANTS_DIR / Path(filename).stem
+
+    def remove(self, filename: str):
+        """Delete an upload's variants from disk"""
+        shutil.rmtree(self.variant_dir(filename), ignore_errors=True)
+
+    async def record(self, db, filename: str, manifest: Optional[dict], **fields) -> dict:
+        """Store the manifest for an upload and copy it onto the documents that reference it"""
+        image_url = f"{UPLOAD_URL_PREFIX}/{filename}"
+        upload = {"filename": filename, "url": image_url, "variants": manifest, "processed_at": utcnow(), **fields}
+        await db.uploads.update_one({"filename": filename}, {"$set": upload}, upsert=True)
+        await self.attach(db, image_url, manifest)
+        return upload
+
+    async def manifest(self, db, image_url: Optional[str]) -> Optional[dict]:
+        """Variant manifest for an image URL, if it is a processed upload"""
+        if not image_url or not image_url.startswith(f"{UPLOAD_URL_PREFIX}/"):
+            return None
+        upload = await db.uploads.find_one({"url": image_url}, {"_id": 0, "variants": 1})
+        return upload["variants"] if upload else None
+
+    async def attach(self, db, image_url: str, manifest: Optional[dict]):
+        """Set the manifest on therapies, affiliations and site settings that use image_url"""
+        for collection, url_field, manifest_field in REFERENCES:
+            await db[collection].update_many({url_field: image_url}, {"$set": {manifest_field: manifest}})
+
+        # Site settings hold several images, so their manifests are kept as a list keyed by url
+        settings_query = {"id": "site_settings", "$or": [{field: image_url} for field in SETTINGS_IMAGE_FIELDS]}
+        await db.site_settings.update_one(settings_query, {"$pull": {"images.variants": {"url": image_url}}})
+        if manifest:
+            await db.site_settings.update_one(
+                settings_query, {"$push": {"images.variants": {"url": image_url, **manifest}}}
+            )
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "widths": self.widths, "formats": self.formats, "rendered": self.rendered}
+
+
+image_variants = ImageVariants()
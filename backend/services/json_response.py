@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import Any, List, Type, Union, get_args, get_origin
+from pydantic import BaseModel, EmailStr, TypeAdapter, create_model
+from pydantic_core import to_json
+from starlette.responses import Response
+
+
+def _trusted_annotation(annotation: Any) -> Any:
+    if annotation is EmailStr:
+        return str
+    if get_origin(annotation) is Union:
+        return Union[tuple(_trusted_annotation(arg) for arg in get_args(annotation))]
+    return annotation
+
+
+@lru_cache(maxsize=None)
+def trusted_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """model with EmailStr fields read as plain str
+
+    Email addresses are validated when they are written; re-checking them on
+    every read is most of the cost of serializing a list. Everything else,
+    including datetime parsing for older string timestamps, is unchanged.
+    """
+    fields = {
+        name: (_trusted_annotation(field.annotation), field)
+        for name, field in model.model_fields.items()
+        if _trusted_annotation(field.annotation) != field.annotation
+    }
+    if not fields:
+        return model
+    return create_model(model.__name__, __base__=model, **fields)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Build the List[model] adapter once per model"""
+    return TypeAdapter(List[trusted_model(model)])
+
+
+@lru_cache(maxsize=None)
+def model_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Build the single-document adapter once per model"""
+    return TypeAdapter(trusted_model(model))
+
+
+def serialize_list(model: Type[BaseModel], documents: List[dict]) -> bytes:
+    """Validate database documents once and dump them straight to JSON bytes"""
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(documents))
+
+
+def serialize_one(model: Type[BaseModel], document: dict) -> bytes:
+    """Validate a single database document and dump it to JSON bytes"""
+    adapter = model_adapter(model)
+    return adapter.dump_json(adapter.validate_python(document))
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered by pydantic-core instead of the stdlib encoder"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
+
+
+def fast_list_response(model: Type[BaseModel], documents: List[dict]) -> FastJSONResponse:
+    """Return documents as a List[model] body, bypassing FastAPI response_model handling"""
+    return FastJSONResponse(serialize_list(model, documents))
+
+
+def fast_model_response(model: Type[BaseModel], document: dict) -> FastJSONResponse:
+    """Return a document as a model body, bypassing FastAPI response_model handling"""
+    return FastJSONResponse(serialize_one(model, document))
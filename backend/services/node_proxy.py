@@ -0,0 +1,25 @@
+import httpx
+from starlette.responses import Response
+
+# Request headers not forwarded (the body is re-sent, so httpx sets its own length)
+# and response headers dropped because httpx has already decoded the body
+SKIP_REQUEST_HEADERS = frozenset(('host', 'content-length'))
+SKIP_RESPONSE_HEADERS = frozenset(('content-encoding', 'content-length', 'transfer-encoding'))
+
+
+def forward_headers(headers) -> dict:
+    """Headers to send to Node for an incoming request"""
+    return {key: value for key, value in headers.items() if key.lower() not in SKIP_REQUEST_HEADERS}
+
+
+def build_proxy_response(response: httpx.Response) -> Response:
+    """Starlette response relaying a Node response"""
+    response_headers = {
+        key: value for key, value in response.headers.items() if key.lower() not in SKIP_RESPONSE_HEADERS
+    }
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers=response_headers,
+        media_type=response.headers.get('content-type')
+    )
@@ -0,0 +1,86 @@
+import logging
+from typing import Optional
+from pymongo import ASCENDING, DESCENDING, TEXT
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 100
+
+
+class NoteSearch:
+    """Ranked full-text search over client notes backed by a Mongo text index
+
+    The text index stems and drops stop words (English), so "migraines"
+    also finds "migraine". Mongo maintains it on every note insert, update
+    and delete, so the note routes need no extra bookkeeping. Filters on
+    client and session date are applied alongside the $text match.
+    """
+
+    def __init__(self):
+        self._indexed = False
+
+    async def ensure_indexes(self, db):
+        """Create the text index on note text (once per process)"""
+        if self._indexed:
+            return
+        await db.client_notes.create_index(
+            [("note", TEXT)],
+            name="note_text",
+            default_language="english"
+        )
+        await db.client_notes.create_index([("client_id", ASCENDING), ("session_date", DESCENDING)])
+        self._indexed = True
+
+    @staticmethod
+    def query(
+        q: str,
+        client_id: Optional[str] = None,
+        session_from: Optional[str] = None,
+        session_to: Optional[str] = None
+    ) -> dict:
+        query = {"$text": {"$search": q}}
+        if client_id:
+            query["client_id"] = client_id
+        if session_from or session_to:
+            query["session_date"] = {}
+            if session_from:
+                query["session_date"]["$gte"] = session_from
+            if session_to:
+                query["session_date"]["$lte"] = session_to
+        return query
+
+    async def search(
+        self,
+        db,
+        q: str,
+        client_id: Optional[str] = None,
+        session_from: Optional[str] = None,
+        session_to: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20
+    ) -> dict:
+        """Return one page of matching notes, best match first, with client names"""
+        await self.ensure_indexes(db)
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        query = self.query(q, client_id, session_from, session_to)
+
+        total = await db.client_notes.count_documents(query)
+        notes = await db.client_notes.find(
+            query, {"_id": 0, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"}), ("created_at", DESCENDING)]).skip(
+            (page - 1) * page_size
+        ).limit(page_size).to_list(page_size)
+
+        client_ids = list({note["client_id"] for note in notes})
+        clients = await db.clients.find(
+            {"id": {"$in": client_ids}}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1}
+        ).to_list(len(client_ids))
+        names = {c["id"]: f"{c['first_name']} {c['last_name']}" for c in clients}
+        for note in notes:
+            note["client_name"] = names.get(note["client_id"])
+
+        return {"results": notes, "total": total, "page": page, "page_size": page_size}
+
+
+# Global note search instance
+note_search = NoteSearch()
@@ -0,0 +1,106 @@
+import logging
+import re
+from typing import Dict, Optional, Tuple
+from markdown_it import MarkdownIt
+
+logger = logging.getLogger(__name__)
+
+EXCERPT_LENGTH = 200
+
+# Raw HTML in policy content is escaped rather than passed through, and
+# markdown-it refuses javascript:/vbscript:/data: links by default.
+_markdown = MarkdownIt("commonmark", {"html": False})
+_whitespace = re.compile(r"\s+")
+
+
+def render_policy_content(content: str) -> Tuple[str, str]:
+    """Render policy markdown to sanitized HTML and a plain-text excerpt"""
+    tokens = _markdown.parse(content or "")
+    html = _markdown.renderer.render(tokens, _markdown.options, {})
+
+    words = []
+    for token in tokens:
+        if token.type != "inline" or not token.children:
+            continue
+        for child in token.children:
+            if child.type in ("text", "code_inline"):
+                words.append(child.content)
+            elif child.type in ("softbreak", "hardbreak"):
+                words.append(" ")
+        words.append(" ")
+
+    text = _whitespace.sub(" ", "".join(words)).strip()
+    if len(text) > EXCERPT_LENGTH:
+        text = text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] + "…"
+
+    return html, text
+
+
+class PolicyRenderCache:
+    """In-memory cache of rendered active policies keyed by slug and updated_at"""
+
+    def __init__(self):
+        self._by_slug: Dict[str, dict] = {}
+        self._slug_by_id: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+
+    def get(self, slug: str) -> Optional[dict]:
+        """Return the rendered policy for a slug, or None if not cached"""
+        entry = self._by_slug.get(slug)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, policy: dict) -> Optional[dict]:
+        """Cache a policy document, rendering only when its revision changed"""
+        policy_id = policy.get("id")
+        slug = policy.get("slug")
+
+        # Drop the entry under a previous slug if the policy was renamed
+        previous_slug = self._slug_by_id.get(policy_id)
+        if previous_slug is not None and previous_slug != slug:
+            self._by_slug.pop(previous_slug, None)
+            del self._slug_by_id[policy_id]
+
+        if not slug or not policy.get("is_active", True):
+            self.evict(policy_id)
+            return None
+
+        cached = self._by_slug.get(slug)
+        if cached and cached.get("id") == policy_id and cached.get("updated_at") == policy.get("updated_at"):
+            return cached
+
+        html, excerpt = render_policy_content(policy.get("content", ""))
+        self.renders += 1
+        entry = {**policy, "content_html": html, "excerpt": excerpt}
+        self._by_slug[slug] = entry
+        self._slug_by_id[policy_id] = slug
+        return entry
+
+    def evict(self, policy_id: str):
+        """Remove a policy from the cache by id"""
+        slug = self._slug_by_id.pop(policy_id, None)
+        if slug is not None:
+            self._by_slug.pop(slug, None)
+
+    def clear(self):
+        """Remove every cached policy"""
+        self._by_slug.clear()
+        self._slug_by_id.clear()
+
+    def stats(self) -> dict:
+        """Cache counters for diagnostics"""
+        return {
+            "entries": len(self._by_slug),
+            "hits": self.hits,
+            "misses": self.misses,
+            "renders": self.renders
+        }
+
+
+# Global policy render cache instance
+policy_cache = PolicyRenderCache()
@@ -0,0 +1,301 @@
+import os
+import sys
+import asyncio
+import time
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads that are parked rather than working: the event loop
+# waiting in select/epoll and pool threads waiting for work
+IDLE_FRAMES = frozenset((
+    ("selectors", "EpollSelector.select"), ("selectors", "KqueueSelector.select"),
+    ("selectors", "PollSelector.select"), ("selectors", "SelectSelector.select"),
+    ("threading", "Condition.wait"), ("thread", "_worker")
+))
+
+
+class ProfileBusy(RuntimeError):
+    pass
+
+
+class StackSampler:
+    """Samples the Python stacks of every thread from a background thread
+
+    Each sample walks sys._current_frames(); the cost falls on the sampling
+    thread plus the GIL hand-offs, so the overhead is roughly proportional to
+    the sampling rate. The interpreter only hands the GIL over every
+    sys.getswitchinterval() (5ms by default), so a busy event loop is
+    sampled at most that often whatever the interval. When `gate` is an
+    Event, samples are only taken while it is set.
+    """
+
+    def __init__(self, interval: float, gate: Optional[threading.Event] = None):
+        self.interval = interval
+        self.gate = gate
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}
+        self._prefixes = sorted({str(Path(p).resolve()) for p in sys.path + [os.getcwd()] if p}, key=len, reverse=True)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.gate is not None:
+            self.gate.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _label(self, code) -> str:
+        """module:qualname for a code object (cached, the sampler sees the same code objects repeatedly)"""
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for prefix in self._prefixes:
+                if filename.startswith(prefix + os.sep):
+                    filename = filename[len(prefix) + 1:]
+                    break
+            module = filename[:-3] if filename.endswith(".py") else filename
+            label = self._labels[code] = f"{module.replace(os.sep, '.')}:{code.co_qualname}"
+        return label
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            if self.gate is not None:
+                self.gate.wait()
+                if self._stop.is_set():
+                    break
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                leaf = frame.f_code
+                if (Path(leaf.co_filename).stem, leaf.co_qualname) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(ident, "thread"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 30) -> list:
+        """Functions by samples spent in them (self) and under them (total)"""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        samples = sum(self.stacks.values()) or 1
+        return [
+            {
+                "function": label,
+                "self": own[label],
+                "total": total[label],
+                "self_percent": round(own[label] / samples * 100, 1),
+                "total_percent": round(total[label] / samples * 100, 1)
+            }
+            for label, _ in sorted(total.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]
+        ]
+
+
+class RequestProfilingMiddleware:
+    """ASGI wrapper installed only while a request profile is armed"""
+
+    def __init__(self, app, profiler: "Profiler"):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        session = self.profiler._session
+        if scope["type"] != "http" or session is None or not session.claim(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session.release(scope, status_code, time.perf_counter() - start)
+            if session.done:
+                self.profiler._finish(session)
+
+
+class RequestProfile:
+    """The next `count` requests under a path prefix, sampled while any of them is in flight"""
+
+    def __init__(self, path_prefix: str, count: int, method: Optional[str], interval: float):
+        self.path_prefix = path_prefix
+        self.method = method
+        self.count = count
+        self.claimed = 0
+        self.in_flight = 0
+        self.requests = []
+        self.started_at = time.time()
+        self.gate = threading.Event()
+        self.sampler = StackSampler(interval, self.gate)
+
+    @property
+    def done(self) -> bool:
+        return len(self.requests) >= self.count
+
+    def claim(self, scope) -> bool:
+        if self.claimed >= self.count or not scope["path"].startswith(self.path_prefix):
+            return False
+        if self.method and scope["method"] != self.method:
+            return False
+        self.claimed += 1
+        self.in_flight += 1
+        self.gate.set()
+        return True
+
+    def release(self, scope, status_code: int, elapsed: float):
+        self.in_flight -= 1
+        if not self.in_flight:
+            self.gate.clear()
+        self.requests.append({
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 2)
+        })
+
+
+class Profiler:
+    """On-demand profiling of the running process
+
+    Two modes, one session at a time:
+    - request: profile the next N requests whose path starts with a prefix.
+      The app's middleware stack is wrapped only while the session is armed
+      and restored afterwards, so there is no per-request cost otherwise.
+      Samples cover the whole process while a matching request is in
+      flight, so concurrent requests show up too.
+    - sampling: sample every thread's stack for T seconds.
+    The last finished session's result is kept until the next one starts.
+    """
+
+    def __init__(self):
+        self.request_interval = float(os.environ.get('PROFILER_REQUEST_INTERVAL_MS', '1')) / 1000
+        self.sample_interval = float(os.environ.get('PROFILER_SAMPLE_INTERVAL_MS', '5')) / 1000
+        self.max_seconds = int(os.environ.get('PROFILER_MAX_SECONDS', '60'))
+        self._session: Optional[RequestProfile] = None
+        self._app = None
+        self._sampling = False
+        self.last_result: Optional[dict] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._session is not None or self._sampling
+
+    def profile_requests(self, app, path_prefix: str, count: int, method: Optional[str] = None):
+        """Arm a request profile on a Starlette app"""
+        if self.busy:
+            raise ProfileBusy("A profile is already running")
+        if app.middleware_stack is None:
+            app.middleware_stack = app.build_middleware_stack()
+        self._session = RequestProfile(path_prefix, count, method.upper() if method else None, self.request_interval)
+        self._session.sampler.start()
+        self._app = app
+        app.middleware_stack = RequestProfilingMiddleware(app.middleware_stack, self)
+        logger.info(f"Profiling the next {count} requests under {path_prefix}")
+
+    def _finish(self, session: RequestProfile, cancelled: bool = False):
+        if session is None or session is not self._session:
+            return
+        app = self._app
+        self._session = self._app = None
+        if isinstance(app.middleware_stack, RequestProfilingMiddleware):
+            app.middleware_stack = app.middleware_stack.app
+        session.sampler.stop()
+        self.last_result = self._result("request", session.sampler, session.started_at, {
+            "path_prefix": session.path_prefix,
+            "method": session.method,
+            "cancelled": cancelled,
+            "requests": session.requests
+        })
+        logger.info(f"Request profile finished: {len(session.requests)} requests, {session.sampler.samples} samples")
+
+    def cancel(self) -> bool:
+        """Disarm a pending request profile, keeping what was sampled so far"""
+        if self._session is None:
+            return False
+        self._finish(self._session, cancelled=True)
+        return True
+
+    async def sample(self, seconds: float) -> dict:
+        """Sample every thread for `seconds` and return the result"""
+        if self.busy:
+            raise ProfileBusy("A profile is already running")
+        self._sampling = True
+        try:
+            sampler = StackSampler(self.sample_interval)
+            started_at = time.time()
+            sampler.start()
+            try:
+                await asyncio.sleep(min(seconds, self.max_seconds))
+            finally:
+                sampler.stop()
+            self.last_result = self._result("sampling", sampler, started_at, {})
+            return self.last_result
+        finally:
+            self._sampling = False
+
+    @staticmethod
+    def _result(mode: str, sampler: StackSampler, started_at: float, details: dict) -> dict:
+        return {
+            "mode": mode,
+            "started_at": started_at,
+            "duration_seconds": round(time.time() - started_at, 3),
+            "interval_ms": sampler.interval * 1000,
+            "samples": sampler.samples,
+            **details,
+            "top": sampler.top_functions(),
+            "collapsed": sampler.collapsed()
+        }
+
+    def status(self) -> dict:
+        session = self._session
+        return {
+            "running": "request" if session else "sampling" if self._sampling else None,
+            "pending": {
+                "path_prefix": session.path_prefix,
+                "method": session.method,
+                "count": session.count,
+                "completed": len(session.requests)
+            } if session else None,
+            "last_result": {
+                "mode": self.last_result["mode"],
+                "started_at": self.last_result["started_at"],
+                "samples": self.last_result["samples"]
+            } if self.last_result else None
+        }
+
+
+# Global profiler instance
+profiler = Profiler()
@@ -0,0 +1,128 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from email.message import Message
+import aiosmtplib
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """Small pool of authenticated, kept-alive SMTP sessions
+
+    Connections are opened lazily up to max_size, checked with NOOP when they
+    have been idle for longer than noop_after seconds, closed after
+    max_messages sends, and replaced transparently when the server drops them.
+    """
+
+    def __init__(self, hostname: str, port: int, username: str = "", password: str = "",
+                 use_tls: bool = True, max_size: int = 2, max_messages: int = 50,
+                 noop_after: float = 30.0, idle_timeout: float = 240.0, timeout: float = 30.0):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.noop_after = noop_after
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._idle = []
+        self._slots = None
+
+        self.handshakes = 0
+        self.reconnects = 0
+        self.messages_sent = 0
+
+    async def send(self, message: Message):
+        """Send a message over a pooled session, reconnecting once on failure"""
+        for attempt in (1, 2):
+            async with self._connection() as conn:
+                try:
+                    await conn.smtp.send_message(message)
+                except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, ConnectionError):
+                    await self._discard(conn)
+                    if attempt == 2:
+                        raise
+                    self.reconnects += 1
+                    logger.warning("SMTP connection dropped, retrying on a fresh session")
+                    continue
+                conn.messages_sent += 1
+                self.messages_sent += 1
+                return
+
+    async def close(self):
+        """Quit every idle session"""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await self._discard(conn)
+
+    def stats(self) -> dict:
+        return {
+            "idle": len(self._idle),
+            "handshakes": self.handshakes,
+            "reconnects": self.reconnects,
+            "messages_sent": self.messages_sent
+        }
+
+    @asynccontextmanager
+    async def _connection(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_size)
+
+        async with self._slots:
+            conn = await self._checkout()
+            try:
+                yield conn
+            finally:
+                if conn.smtp.is_connected and conn.messages_sent < self.max_messages:
+                    conn.last_used = time.monotonic()
+                    self._idle.append(conn)
+                else:
+                    await self._discard(conn)
+
+    async def _checkout(self) -> _PooledConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            idle_for = time.monotonic() - conn.last_used
+            if idle_for > self.idle_timeout or not conn.smtp.is_connected:
+                await self._discard(conn)
+                continue
+            if idle_for > self.noop_after:
+                try:
+                    await conn.smtp.noop()
+                except aiosmtplib.SMTPException:
+                    await self._discard(conn)
+                    continue
+            return conn
+        return await self._open()
+
+    async def _open(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=self.use_tls,
+            timeout=self.timeout
+        )
+        await smtp.connect()
+        if self.username:
+            await smtp.login(self.username, self.password)
+        self.handshakes += 1
+        return _PooledConnection(smtp)
+
+    async def _discard(self, conn: _PooledConnection):
+        try:
+            if conn.smtp.is_connected:
+                await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# Timestamp fields stored as BSON dates, per collection. session_date is not
+# here: it is a calendar date entered by the practitioner, not an instant,
+# and stays a YYYY-MM-DD string (which sorts and range-compares correctly).
+TIMESTAMP_FIELDS = {
+    "admin_users": ("created_at", "updated_at"),
+    "affiliations": ("created_at", "updated_at"),
+    "client_notes": ("created_at", "updated_at"),
+    "clients": ("created_at", "updated_at", "last_note_at"),
+    "consultations": ("created_at", "updated_at"),
+    "contact_submissions": ("created_at",),
+    "counters": ("latest_at", "reconciled_at"),
+    "policies": ("created_at", "updated_at"),
+    "prices": ("created_at", "updated_at"),
+    "site_settings": ("updated_at",),
+    "therapies": ("created_at", "updated_at")
+}
+
+
+def utcnow() -> datetime:
+    """Current UTC time at BSON's millisecond precision
+
+    Truncating up front means a value compares equal to itself after a
+    round trip through Mongo. Open the Motor client with tz_aware=True so
+    reads come back as aware UTC datetimes with no string parsing.
+    """
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Convert a legacy ISO-8601 timestamp string to an aware UTC datetime
+
+    Datetimes pass through; naive values are taken to be UTC. Returns None
+    for anything that is not a recognisable timestamp.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    parsed = parsed.astimezone(timezone.utc)
+    return parsed.replace(microsecond=parsed.microsecond // 1000 * 1000)
@@ -0,0 +1,220 @@
+import os
+import re
+import time
+import hashlib
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple, Optional
+from starlette.concurrency import run_in_threadpool
+from services.image_variants import image_variants, REFERENCES, SETTINGS_IMAGE_FIELDS, UPLOAD_URL_PREFIX, VARIANTS_DIR
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 1024 * 1024
+PARTIAL_DIR = ".partial"
+
+# Content-addressed uploads: <2 hex>/<2 hex>/<sha256>.<ext>
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+$")
+
+# Fields holding upload URLs; these are the reference counts the garbage collector works from
+REFERENCE_FIELDS = tuple((collection, field) for collection, field, _ in REFERENCES) + tuple(
+    ("site_settings", field) for field in SETTINGS_IMAGE_FIELDS
+)
+
+
+class StoredUpload(NamedTuple):
+    filename: str
+    sha256: str
+    bytes: int
+    created: bool
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def upload_url(filename: str) -> str:
+    return f"{UPLOAD_URL_PREFIX}/{filename}"
+
+
+class UploadStore:
+    """Content-addressed, deduplicated storage for uploaded images
+
+    An upload is hashed with SHA-256 while it streams to a partial file and
+    then renamed to <aa>/<bb>/<sha256>.<ext>, so uploading the same image
+    twice stores it once and every URL names exactly one set of bytes,
+    which lets browsers cache it forever. Files are never rewritten; they
+    are only removed by collect_garbage() once nothing references them.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or image_variants.upload_dir)
+        self.gc_grace = int(os.environ.get('UPLOAD_GC_GRACE_SECONDS', '86400'))
+        self.deduplicated = 0
+
+    def relative_path(self, digest: str, extension: str) -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+    def resolve(self, filename: str) -> Optional[Path]:
+        """Absolute path of an upload, or None if the name could escape the upload directory"""
+        parts = Path(filename).parts
+        if not parts or Path(filename).is_absolute() or any(part.startswith(".") for part in parts):
+            return None
+        if len(parts) > 1 and not CONTENT_ADDRESSED.match(filename):
+            return None
+        return self.root / filename
+
+    async def save(self, upload, extension: str, max_bytes: int) -> StoredUpload:
+        """Stream an UploadFile to disk, hashing it as it goes; identical content is stored once"""
+        partial_dir = self.root / PARTIAL_DIR
+        partial_dir.mkdir(parents=True, exist_ok=True)
+        partial = partial_dir / f"{os.getpid()}-{time.monotonic_ns()}"
+        sha256 = hashlib.sha256()
+        size = 0
+
+        def write(out, chunk: bytes):
+            sha256.update(chunk)
+            out.write(chunk)
+
+        try:
+            with open(partial, "wb") as out:
+                while chunk := await upload.read(CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                    await run_in_threadpool(write, out, chunk)
+
+            digest = sha256.hexdigest()
+            filename = self.relative_path(digest, extension)
+            path = self.root / filename
+            if path.exists():
+                # Refresh the mtime so a blob about to be collected survives being uploaded again
+                os.utime(path)
+                self.deduplicated += 1
+                return StoredUpload(filename, digest, size, created=False)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(partial, path)
+            return StoredUpload(filename, digest, size, created=True)
+        finally:
+            partial.unlink(missing_ok=True)
+
+    def adopt(self, path: Path) -> StoredUpload:
+        """Move an existing (legacy) file into content-addressed storage; blocking"""
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+                sha256.update(block)
+        digest = sha256.hexdigest()
+        filename = self.relative_path(digest, path.suffix)
+        target = self.root / filename
+        size = path.stat().st_size
+        if target.exists():
+            path.unlink()
+            return StoredUpload(filename, digest, size, created=False)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target)
+        return StoredUpload(filename, digest, size, created=True)
+
+    async def rewrite_references(self, db, old_url: str, new_url: str) -> int:
+        """Point every reference to old_url at new_url; returns documents changed"""
+        changed = 0
+        for collection, field in REFERENCE_FIELDS:
+            if field == "images.hero_images":
+                # Positional update replaces one matching array element per pass
+                while (result := await db[collection].update_many({field: old_url}, {"$set": {f"{field}.$": new_url}})).modified_count:
+                    changed += result.modified_count
+                continue
+            result = await db[collection].update_many({field: old_url}, {"$set": {field: new_url}})
+            changed += result.modified_count
+        await db.site_settings.update_many({}, {"$pull": {"images.variants": {"url": old_url}}})
+        return changed
+
+    def iter_files(self):
+        """Every stored upload (content-addressed or legacy), as names relative to the root"""
+        for path in self.root.rglob("*"):
+            relative = path.relative_to(self.root)
+            if not path.is_file() or relative.parts[0] in (VARIANTS_DIR, PARTIAL_DIR) or path.name.startswith("."):
+                continue
+            yield relative.as_posix(), path
+
+    async def reference_counts(self, db) -> Counter:
+        """How many documents refer to each upload URL"""
+        counts = Counter()
+        for collection, field in REFERENCE_FIELDS:
+            pipeline = [
+                {"$match": {field: {"$regex": f"^{re.escape(UPLOAD_URL_PREFIX)}/"}}},
+                {"$project": {"_id": 0, "url": f"${field}"}},
+                {"$unwind": "$url"},
+                {"$group": {"_id": "$url", "count": {"$sum": 1}}}
+            ]
+            async for row in db[collection].aggregate(pipeline):
+                counts[row["_id"]] += row["count"]
+        return counts
+
+    async def references(self, db, filename: str) -> int:
+        url = upload_url(filename)
+        total = 0
+        for collection, field in REFERENCE_FIELDS:
+            total += await db[collection].count_documents({field: url})
+        return total
+
+    async def delete(self, db, filename: str):
+        """Remove an upload, its variants and its manifest"""
+        (self.root / filename).unlink(missing_ok=True)
+        image_variants.remove(filename)
+        await db.uploads.delete_one({"filename": filename})
+        self._prune_empty_shards(self.root / filename)
+
+    async def collect_garbage(self, db, dry_run: bool = False) -> dict:
+        """Delete uploads no therapy, affiliation or site setting refers to
+
+        Files younger than the grace period are kept, so an image uploaded
+        but not yet saved onto a document is not swept from under the admin.
+        """
+        started = time.perf_counter()
+        counts = await self.reference_counts(db)
+        cutoff = time.time() - self.gc_grace
+        files = await run_in_threadpool(lambda: list(self.iter_files()))
+
+        removed, reclaimed = [], 0
+        for filename, path in files:
+            if counts[upload_url(filename)]:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > cutoff:
+                continue
+            removed.append(filename)
+            reclaimed += stat.st_size
+            if not dry_run:
+                await self.delete(db, filename)
+
+        report = {
+            "files": len(files),
+            "referenced": sum(1 for filename, _ in files if counts[upload_url(filename)]),
+            "removed": removed,
+            "bytes_reclaimed": reclaimed,
+            "dry_run": dry_run,
+            "seconds": round(time.perf_counter() - started, 2)
+        }
+        logger.info(f"Upload GC: {len(removed)} of {len(files)} files unreferenced, "
+                    f"{reclaimed / 1024:.0f}KB {'reclaimable' if dry_run else 'reclaimed'}")
+        return report
+
+    def _prune_empty_shards(self, path: Path):
+        for parent in (path.parent, path.parent.parent):
+            if parent == self.root:
+                break
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+
+    def stats(self) -> dict:
+        return {"root": str(self.root), "deduplicated": self.deduplicated, "gc_grace_seconds": self.gc_grace}
+
+
+upload_store = UploadStore()
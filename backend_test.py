@@ -9,6 +9,10 @@ import sys
 import json
 from datetime import datetime
 from typing import Dict, Any, Optional
+from api_catalog import (
+    PUBLIC_LIST_ENDPOINTS, ADMIN_LIST_ENDPOINTS, ADMIN_LOGIN, CONTACT_DATA,
+    THERAPY_DATA, PRICE_DATA, CLIENT_DATA, NOTE_DATA, SETTINGS_DATA
+)
 
 class WhiteDoveAPITester:
     def __init__(self, base_url="https://wellness-preview-9.preview.emergentagent.com"):
@@ -75,7 +79,7 @@ class WhiteDoveAPITester:
         print("=" * 50)
 
         # Test therapies endpoint
-        success, data, error = self.make_request('GET', 'therapies?active_only=true')
+        success, data, error = self.make_request('GET', PUBLIC_LIST_ENDPOINTS[0][0])
         if success and 'therapies' in data:
             therapy_count = len(data['therapies'])
             self.log_test("GET /api/therapies", True, f"Found {therapy_count} therapies")
@@ -88,46 +92,20 @@ class WhiteDoveAPITester:
         else:
             self.log_test("GET /api/therapies", False, error)
 
-        # Test prices endpoint
-        success, data, error = self.make_request('GET', 'prices?active_only=true')
-        if success and 'prices' in data:
-            price_count = len(data['prices'])
-            self.log_test("GET /api/prices", True, f"Found {price_count} prices")
-        else:
-            self.log_test("GET /api/prices", False, error)
-
-        # Test affiliations endpoint
-        success, data, error = self.make_request('GET', 'affiliations?active_only=true')
-        if success and 'affiliations' in data:
-            affiliation_count = len(data['affiliations'])
-            self.log_test("GET /api/affiliations", True, f"Found {affiliation_count} affiliations")
-        else:
-            self.log_test("GET /api/affiliations", False, error)
-
-        # Test policies endpoint
-        success, data, error = self.make_request('GET', 'policies?active_only=true')
-        if success and 'policies' in data:
-            policy_count = len(data['policies'])
-            self.log_test("GET /api/policies", True, f"Found {policy_count} policies")
-        else:
-            self.log_test("GET /api/policies", False, error)
-
-        # Test settings endpoint
-        success, data, error = self.make_request('GET', 'settings')
-        if success and 'settings' in data:
-            self.log_test("GET /api/settings", True, "Settings loaded")
-        else:
-            self.log_test("GET /api/settings", False, error)
+        # Test prices, affiliations, policies and settings endpoints
+        for endpoint, data_key in PUBLIC_LIST_ENDPOINTS[1:]:
+            name = f"GET /api/{endpoint.split('?')[0]}"
+            success, data, error = self.make_request('GET', endpoint)
+            if success and data_key in data:
+                if isinstance(data[data_key], list):
+                    self.log_test(name, True, f"Found {len(data[data_key])} {data_key}")
+                else:
+                    self.log_test(name, True, f"{data_key.capitalize()} loaded")
+            else:
+                self.log_test(name, False, error)
 
         # Test contact form submission
-        contact_data = {
-            "name": "Test User",
-            "email": "test@example.com",
-            "phone": "1234567890",
-            "message": "Test contact message",
-            "preferred_contact": "email"
-        }
-        success, data, error = self.make_request('POST', 'contact', contact_data, 201)
+        success, data, error = self.make_request('POST', 'contact', CONTACT_DATA, 201)
         self.log_test("POST /api/contact", success, error)
 
     def test_admin_authentication(self):
@@ -136,11 +114,7 @@ class WhiteDoveAPITester:
         print("=" * 50)
 
         # Test login with default credentials
-        login_data = {
-            "username": "admin",
-            "password": "admin123"
-        }
-        success, data, error = self.make_request('POST', 'admin/auth/login', login_data)
+        success, data, error = self.make_request('POST', 'admin/auth/login', ADMIN_LOGIN)
         if success and 'access_token' in data:
             self.access_token = data['access_token']
             self.refresh_token = data.get('refresh_token')
@@ -193,16 +167,7 @@ class WhiteDoveAPITester:
     def test_therapies_crud(self):
         """Test therapy CRUD operations"""
         # Create therapy
-        therapy_data = {
-            "name": "Test Therapy",
-            "short_description": "A test therapy for API testing",
-            "full_description": "This is a comprehensive test therapy description",
-            "icon": "Sparkles",
-            "display_order": 999,
-            "is_active": True
-        }
-        
-        success, data, error = self.make_request('POST', 'admin/therapies', therapy_data, 201, True)
+        success, data, error = self.make_request('POST', 'admin/therapies', THERAPY_DATA, 201, True)
         if success and 'therapy' in data:
             therapy_id = data['therapy']['id']
             self.log_test("POST /api/admin/therapies", True, f"Created therapy: {therapy_id}")
@@ -229,14 +194,7 @@ class WhiteDoveAPITester:
         therapy_id = therapies_data['therapies'][0]['id']
         
         # Create price
-        price_data = {
-            "therapy_id": therapy_id,
-            "name": "Test Price",
-            "duration": "60 minutes",
-            "price": 75.00,
-            "description": "Test price entry",
-            "is_active": True
-        }
+        price_data = {"therapy_id": therapy_id, **PRICE_DATA}
         
         success, data, error = self.make_request('POST', 'admin/prices', price_data, 201, True)
         if success and 'price' in data:
@@ -257,26 +215,13 @@ class WhiteDoveAPITester:
     def test_clients_crud(self):
         """Test client CRUD operations"""
         # Create client
-        client_data = {
-            "first_name": "Test",
-            "last_name": "Client",
-            "email": "testclient@example.com",
-            "phone": "1234567890",
-            "address": "123 Test Street",
-            "medical_notes": "Test medical notes"
-        }
-        
-        success, data, error = self.make_request('POST', 'admin/clients', client_data, 201, True)
+        success, data, error = self.make_request('POST', 'admin/clients', CLIENT_DATA, 201, True)
         if success and 'client' in data:
             client_id = data['client']['id']
             self.log_test("POST /api/admin/clients", True, f"Created client: {client_id}")
             
             # Test client notes
-            note_data = {
-                "note": "Test session note",
-                "session_date": "2024-01-30"
-            }
-            success, note_response, error = self.make_request('POST', f'admin/clients/{client_id}/notes', note_data, 201, True)
+            success, note_response, error = self.make_request('POST', f'admin/clients/{client_id}/notes', NOTE_DATA, 201, True)
             if success and 'note' in note_response:
                 note_id = note_response['note']['id']
                 self.log_test("POST /api/admin/clients/:id/notes", True, f"Created note: {note_id}")
@@ -304,12 +249,7 @@ class WhiteDoveAPITester:
 
     def test_admin_data_retrieval(self):
         """Test admin data retrieval endpoints"""
-        endpoints = [
-            ('admin/contacts', 'contacts'),
-            ('admin/users', 'users')
-        ]
-        
-        for endpoint, data_key in endpoints:
+        for endpoint, data_key in ADMIN_LIST_ENDPOINTS:
             success, data, error = self.make_request('GET', endpoint, auth_required=True)
             if success and data_key in data:
                 count = len(data[data_key]) if isinstance(data[data_key], list) else "N/A"
@@ -318,8 +258,7 @@ class WhiteDoveAPITester:
                 self.log_test(f"GET /api/{endpoint}", success, error)
                 
         # Test settings update (PUT only, no GET)
-        settings_data = {"facebook_url": "https://facebook.com/test"}
-        success, data, error = self.make_request('PUT', 'admin/settings', settings_data, auth_required=True)
+        success, data, error = self.make_request('PUT', 'admin/settings', SETTINGS_DATA, auth_required=True)
         self.log_test("PUT /api/admin/settings", success, error)
 
     def run_all_tests(self):
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+White Dove Wellness API Load Test
+Drives the endpoint catalog the smoke test uses (api_catalog.py) with
+concurrent asyncio/httpx virtual users against a local stack, then reports
+throughput and p50/p95/p99 latency per endpoint as a table and as JSON.
+
+Each virtual user repeatedly picks a scenario from the request mix:
+  browse   public list pages and a therapy detail page
+  admin    therapy create/update/delete, client + note round trip, admin lists
+  contact  a contact form submission
+Users start evenly spread over the ramp-up period and stop at the deadline.
+Records created by the admin scenario are deleted by it; contact
+submissions use @loadtest.invalid addresses and --cleanup deletes them.
+
+Run NODE_ENV=development so the production rate limiter stays off:
+    python load_test.py --start-stack --users 50 --ramp-up 10 --duration 60 \\
+        --mix browse=80,admin=15,contact=5 --json load-report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from api_catalog import (
+    PUBLIC_LIST_ENDPOINTS, ADMIN_LIST_ENDPOINTS, ADMIN_LOGIN, CONTACT_DATA,
+    THERAPY_DATA, CLIENT_DATA, NOTE_DATA
+)
+
+ROOT_DIR = Path(__file__).parent
+LOCAL_URL = "http://127.0.0.1:8001"
+LOADTEST_DOMAIN = "loadtest.invalid"
+SCENARIOS = ("browse", "admin", "contact")
+
+
+def percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+class Recorder:
+    """Latency samples and outcomes per endpoint"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.started = None
+        self.finished = None
+
+    def record(self, name: str, seconds: float, status_code: int, ok: bool):
+        self.latencies[name].append(seconds * 1000)
+        self.statuses[name][status_code] += 1
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        endpoints = {}
+        for name in sorted(self.latencies):
+            ordered = sorted(self.latencies[name])
+            endpoints[name] = {
+                "requests": len(ordered),
+                "errors": self.errors[name],
+                "rps": round(len(ordered) / elapsed, 1),
+                "p50_ms": round(percentile(ordered, 0.50), 1),
+                "p95_ms": round(percentile(ordered, 0.95), 1),
+                "p99_ms": round(percentile(ordered, 0.99), 1),
+                "max_ms": round(ordered[-1], 1),
+                "statuses": dict(self.statuses[name])
+            }
+        everything = sorted(ms for samples in self.latencies.values() for ms in samples)
+        total = len(everything)
+        return {
+            "seconds": round(elapsed, 1),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "rps": round(total / elapsed, 1) if elapsed else 0,
+            "p50_ms": round(percentile(everything, 0.50), 1),
+            "p95_ms": round(percentile(everything, 0.95), 1),
+            "p99_ms": round(percentile(everything, 0.99), 1),
+            "endpoints": endpoints
+        }
+
+
+class LoadTester:
+    def __init__(self, args):
+        self.base_url = args.base_url.rstrip("/")
+        self.users = args.users
+        self.ramp_up = args.ramp_up
+        self.duration = args.duration
+        self.think_time = args.think_time / 1000
+        self.mix = args.mix
+        self.recorder = Recorder()
+        self.access_token = None
+        self.therapy_ids = []
+        self.client = None
+        self.deadline = 0.0
+        self._login_lock = asyncio.Lock()
+
+    async def request(self, name: str, method: str, endpoint: str, data: dict = None,
+                      expected_status: int = 200, auth_required: bool = False) -> dict:
+        """Make a timed request; name groups it in the report (e.g. 'PUT admin/therapies/:id')"""
+        token = self.access_token
+        headers = {"Authorization": f"Bearer {token}"} if auth_required else {}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, f"/api/{endpoint}", json=data, headers=headers)
+        except httpx.HTTPError:
+            self.recorder.record(name, time.perf_counter() - start, 0, False)
+            return {}
+        elapsed = time.perf_counter() - start
+
+        if response.status_code == 401 and auth_required:
+            # Access tokens are short lived; log in again and let the scenario carry on
+            self.recorder.record(name, elapsed, 401, False)
+            async with self._login_lock:
+                if self.access_token == token:
+                    await self.login()
+            return {}
+        ok = response.status_code == expected_status
+        self.recorder.record(name, elapsed, response.status_code, ok)
+        if not ok:
+            return {}
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+    async def login(self):
+        response = await self.client.post("/api/admin/auth/login", json=ADMIN_LOGIN)
+        response.raise_for_status()
+        self.access_token = response.json()["access_token"]
+
+    async def setup(self):
+        """Log in and collect ids for the detail pages before the clock starts"""
+        await self.login()
+        response = await self.client.get("/api/therapies?active_only=true")
+        response.raise_for_status()
+        self.therapy_ids = [therapy["id"] for therapy in response.json().get("therapies", [])]
+
+    # Scenarios
+
+    async def browse(self):
+        endpoint, _ = random.choice(PUBLIC_LIST_ENDPOINTS)
+        await self.request(f"GET {endpoint.split('?')[0]}", "GET", endpoint)
+        if self.therapy_ids and random.random() < 0.5:
+            await self.request("GET therapies/:id", "GET", f"therapies/{random.choice(self.therapy_ids)}")
+
+    async def admin(self):
+        choice = random.random()
+        if choice < 0.4:
+            data = await self.request("POST admin/therapies", "POST", "admin/therapies",
+                                      {**THERAPY_DATA, "is_active": False}, 201, True)
+            if data.get("therapy"):
+                therapy_id = data["therapy"]["id"]
+                await self.request("PUT admin/therapies/:id", "PUT", f"admin/therapies/{therapy_id}",
+                                   {"name": "Updated Test Therapy"}, 200, True)
+                await self.request("DELETE admin/therapies/:id", "DELETE", f"admin/therapies/{therapy_id}",
+                                   expected_status=200, auth_required=True)
+        elif choice < 0.7:
+            data = await self.request("POST admin/clients", "POST", "admin/clients", CLIENT_DATA, 201, True)
+            if data.get("client"):
+                client_id = data["client"]["id"]
+                note = await self.request("POST admin/clients/:id/notes", "POST", f"admin/clients/{client_id}/notes",
+                                          NOTE_DATA, 201, True)
+                await self.request("GET admin/clients/:id/notes", "GET", f"admin/clients/{client_id}/notes",
+                                   auth_required=True)
+                if note.get("note"):
+                    await self.request("DELETE admin/clients/:id/notes/:noteId", "DELETE",
+                                       f"admin/clients/{client_id}/notes/{note['note']['id']}",
+                                       expected_status=200, auth_required=True)
+                await self.request("DELETE admin/clients/:id", "DELETE", f"admin/clients/{client_id}",
+                                   expected_status=200, auth_required=True)
+        else:
+            endpoint, _ = random.choice(ADMIN_LIST_ENDPOINTS)
+            await self.request(f"GET {endpoint}", "GET", endpoint, auth_required=True)
+
+    async def contact(self):
+        tag = uuid.uuid4().hex[:12]
+        data = {**CONTACT_DATA, "email": f"user-{tag}@{LOADTEST_DOMAIN}", "message": f"Load test message {tag}"}
+        await self.request("POST contact", "POST", "contact", data, 201)
+
+    # Runner
+
+    async def virtual_user(self, index: int):
+        # Spread the start times evenly across the ramp-up period
+        await asyncio.sleep(self.ramp_up * index / self.users)
+        scenarios = [getattr(self, name) for name in self.mix]
+        weights = list(self.mix.values())
+        while time.perf_counter() < self.deadline:
+            await random.choices(scenarios, weights)[0]()
+            if self.think_time:
+                await asyncio.sleep(self.think_time)
+
+    async def run(self) -> dict:
+        limits = httpx.Limits(max_connections=self.users, max_keepalive_connections=self.users)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=30.0, limits=limits) as client:
+            self.client = client
+            await self.setup()
+            self.recorder.started = time.perf_counter()
+            self.deadline = self.recorder.started + self.ramp_up + self.duration
+            await asyncio.gather(*(self.virtual_user(i) for i in range(self.users)))
+            self.recorder.finished = time.perf_counter()
+        return self.recorder.report()
+
+    async def cleanup(self) -> int:
+        """Delete the contact submissions the contact scenario created"""
+        deleted = 0
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=30.0) as client:
+            self.client = client
+            await self.login()
+            headers = {"Authorization": f"Bearer {self.access_token}"}
+            response = await client.get("/api/admin/contacts", headers=headers)
+            for contact in response.json().get("contacts", []):
+                if contact.get("email", "").endswith(f"@{LOADTEST_DOMAIN}"):
+                    await client.delete(f"/api/admin/contacts/{contact['id']}", headers=headers)
+                    deleted += 1
+        return deleted
+
+
+def print_table(report: dict):
+    print(f"\n{'endpoint':<40} {'reqs':>7} {'err':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    print("-" * 96)
+    rows = list(report["endpoints"].items()) + [("TOTAL", {**report, "max_ms": None})]
+    for name, row in rows:
+        max_ms = f"{row['max_ms']:>8.1f}" if row["max_ms"] is not None else f"{'':>8}"
+        print(f"{name:<40} {row['requests']:>7} {row['errors']:>5} {row['rps']:>7.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {max_ms}")
+    print("latencies in ms")
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"expected name=weight with names from {', '.join(SCENARIOS)}")
+        if int(weight):
+            mix[name] = int(weight)
+    if not mix:
+        raise argparse.ArgumentTypeError("the mix needs at least one non-zero weight")
+    return mix
+
+
+def start_stack(base_url: str) -> subprocess.Popen:
+    """Start server.py (which starts the Node server) and wait for /api/health"""
+    port = httpx.URL(base_url).port or 8001
+    env = {**os.environ, "NODE_ENV": os.environ.get("NODE_ENV", "development")}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=str(ROOT_DIR / "backend"), env=env, start_new_session=True
+    )
+    for _ in range(120):
+        if process.poll() is not None:
+            sys.exit("The local stack exited during startup")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    os.killpg(process.pid, signal.SIGTERM)
+    sys.exit("The local stack did not become healthy within 60s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=LOCAL_URL)
+    parser.add_argument("--start-stack", action="store_true", help="start backend/server.py on the base URL's port first")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which users start")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds at full concurrency")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("browse=80,admin=15,contact=5"))
+    parser.add_argument("--think-time", type=float, default=0.0, help="milliseconds each user waits between scenarios")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--cleanup", action="store_true", help="delete the contact submissions afterwards")
+    parser.add_argument("--allow-remote", action="store_true", help="permit a base URL that is not localhost")
+    args = parser.parse_args()
+
+    if httpx.URL(args.base_url).host not in ("127.0.0.1", "localhost", "::1") and not args.allow_remote:
+        sys.exit("Load tests target a local stack; pass --allow-remote to point at another host")
+
+    stack = start_stack(args.base_url) if args.start_stack else None
+    tester = LoadTester(args)
+    try:
+        print(f"🕊️ Load testing {args.base_url}: {args.users} users, {args.ramp_up:g}s ramp-up, "
+              f"{args.duration:g}s duration, mix {args.mix}")
+        try:
+            report = asyncio.run(tester.run())
+        except httpx.HTTPError as e:
+            sys.exit(f"Could not log in to {args.base_url}: {e}")
+        report.update({
+            "base_url": args.base_url,
+            "users": args.users,
+            "ramp_up": args.ramp_up,
+            "duration": args.duration,
+            "mix": args.mix,
+            "completed_at": datetime.now().isoformat(timespec="seconds")
+        })
+        print_table(report)
+        if args.json:
+            Path(args.json).write_text(json.dumps(report, indent=2))
+            print(f"report written to {args.json}")
+        if args.cleanup:
+            print(f"deleted {asyncio.run(tester.cleanup())} load test contact submissions")
+    finally:
+        if stack:
+            os.killpg(stack.pid, signal.SIGTERM)
+            stack.wait(timeout=15)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend modules import each other as top-level packages (services, controllers, ...)
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+ADMIN_ID = "test-admin"
+
+
+@pytest.fixture(scope="session")
+def backend_app():
+    """The client and contact routers on one in-memory database
+
+    The routers are module level, so their routes stay bound to the first
+    database they are created with; every test shares this one and clears
+    the collections it uses.
+    """
+    from fastapi import FastAPI
+    from benchmarks.memory_db import MemoryDatabase
+    from controllers.client_controller import create_client_routes
+    from controllers.contact_controller import create_contact_routes
+    from services.email_service import email_service
+
+    db = MemoryDatabase()
+    app = FastAPI()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(email_service, "use_outbox", lambda collection: None)
+        for create_routes in (create_client_routes, create_contact_routes):
+            app.include_router(create_routes(db), prefix="/api")
+    app.state.db = db
+    asyncio.run(db.admin_users.insert_one({"id": ADMIN_ID, "email": "admin@example.com", "is_active": True}))
+    return app
+
+
+@pytest.fixture
+def admin_headers():
+    from services.auth_service import auth_service
+
+    return {"Authorization": f"Bearer {auth_service.create_tokens(ADMIN_ID, 'admin')['access_token']}"}
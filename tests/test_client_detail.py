@@ -0,0 +1,77 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.memory_db import MemoryDatabase
+from services.client_detail import client_detail_pipeline, decode_cursor, encode_cursor, shape_client_detail
+
+START = datetime(2024, 5, 1, 9, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    db = MemoryDatabase()
+    notes = [
+        {"id": f"n{i}", "client_id": "c1", "content": f"Note {i}", "created_at": START + timedelta(days=i)}
+        for i in range(3)
+    ] + [
+        # Written before timestamps were stored as dates
+        {"id": f"old{i}", "client_id": "c1", "content": f"Old note {i}", "created_at": f"2023-0{i + 1}-01T10:00:00"}
+        for i in range(3)
+    ]
+
+    async def seed():
+        await db.clients.insert_one({
+            "id": "c1", "first_name": "Ada", "last_name": "Lovelace",
+            "note_count": 6, "last_session_date": "2024-05-03", "last_note_at": START + timedelta(days=2)
+        })
+        await db.client_notes.insert_many(notes)
+
+    asyncio.run(seed())
+    return db
+
+
+def page(db, limit: int, cursor: str = None) -> dict:
+    rows = asyncio.run(db.clients.aggregate(client_detail_pipeline("c1", limit, cursor)).to_list(1))
+    return shape_client_detail(rows[0], limit)
+
+
+def test_pages_cover_datetime_and_string_timestamps_once(db):
+    seen, cursor = [], None
+    while True:
+        detail = page(db, 2, cursor)
+        seen += [note["id"] for note in detail["notes"]]
+        cursor = detail["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["n2", "n1", "n0", "old2", "old1", "old0"]
+
+
+def test_stats_come_from_the_stored_client_fields(db):
+    detail = page(db, 20)
+
+    assert detail["stats"] == {
+        "note_count": 6, "last_session_date": "2024-05-03", "last_note_at": START + timedelta(days=2)
+    }
+    assert detail["next_cursor"] is None
+
+
+def test_cursor_round_trips_both_timestamp_kinds():
+    assert decode_cursor(encode_cursor({"id": "n1", "created_at": START})) == (START, "n1")
+    assert decode_cursor(encode_cursor({"id": "old1", "created_at": "2023-01-01T10:00:00"})) == (
+        "2023-01-01T10:00:00", "old1"
+    )
+
+
+@pytest.mark.parametrize("raw", [
+    "not base64!", json.dumps(["2024-05-01", "n1", "number"]), json.dumps([5, "n1", "string"]), json.dumps(["soon", "n1"])
+])
+def test_malformed_cursors_are_rejected(raw):
+    cursor = raw if raw.startswith("not") else base64.urlsafe_b64encode(raw.encode()).decode()
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,86 @@
+import asyncio
+import io
+
+import pytest
+
+from benchmarks.memory_db import MemoryDatabase
+from services.client_import import ClientImporter
+
+CSV = """first_name,last_name,email,phone
+Ada,Lovelace,ADA@example.com,
+Grace,Hopper,grace@example.com,+44 7700 900123
+Edith,Clarke,edith@example.com,
+Edith,Again,Edith@Example.com,
+Nameless,,,
+"""
+
+# Stored before the duplicate keys existed, so they have no email_key/phone_key
+LEGACY_CLIENTS = [
+    {"id": "legacy-1", "first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com", "phone": None},
+    {"id": "legacy-2", "first_name": "Grace", "last_name": "Hopper", "email": None, "phone": "07700 900123"}
+]
+
+
+@pytest.fixture
+def db():
+    db = MemoryDatabase()
+    asyncio.run(db.clients.insert_many([dict(client) for client in LEGACY_CLIENTS]))
+    db.indexes_created = []
+    create_index = db.clients.create_index
+
+    async def recording_create_index(keys, **kwargs):
+        db.indexes_created.append(keys)
+        return await create_index(keys, **kwargs)
+
+    db.clients.create_index = recording_create_index
+    return db
+
+
+def run_import(db, dry_run: bool) -> dict:
+    return asyncio.run(ClientImporter(db, chunk_size=2, dry_run=dry_run).run(io.StringIO(CSV), "csv"))
+
+
+def test_dry_run_writes_nothing_but_reports_the_same_duplicates(db):
+    report = run_import(db, dry_run=True)
+    clients = asyncio.run(db.clients.find({}, {"_id": 0}).to_list(None))
+
+    assert (report["valid"], report["inserted"], report["duplicates"], report["invalid"]) == (1, 0, 3, 1)
+    assert [error["message"] for error in report["errors"] if error["type"] == "duplicate"] == [
+        "Same email as existing client legacy-1",
+        "Same phone as existing client legacy-2",
+        "Same email as row 4"
+    ]
+    assert db.indexes_created == []
+    assert clients == LEGACY_CLIENTS
+    assert report["skipped"] == [
+        "creating the email_key/phone_key indexes",
+        "backfilling duplicate keys on 2 existing clients"
+    ]
+
+
+def test_import_creates_indexes_backfills_keys_and_inserts(db):
+    report = run_import(db, dry_run=False)
+    legacy = asyncio.run(db.clients.find_one({"id": "legacy-2"}))
+
+    assert (report["valid"], report["inserted"], report["duplicates"], report["invalid"]) == (1, 1, 3, 1)
+    assert report["skipped"] == []
+    assert len(db.indexes_created) == 2
+    assert legacy["phone_key"] == "07700900123"
+    assert asyncio.run(db.clients.count_documents({})) == 3
+
+
+def test_dry_run_matches_a_real_import_across_chunks():
+    rows = ["first_name,last_name,email,phone"] + [
+        f"{name},Smith,{name.lower()}@example.com," for name in ("Edith", "Bob", "Cara", "Edith", "Dan", "Bob", "Cara")
+    ]
+    csv = "\n".join(rows) + "\n"
+
+    def run(dry_run: bool) -> dict:
+        importer = ClientImporter(MemoryDatabase(), chunk_size=2, dry_run=dry_run)
+        return asyncio.run(importer.run(io.StringIO(csv), "csv"))
+
+    dry, real = run(dry_run=True), run(dry_run=False)
+
+    assert (dry["valid"], dry["duplicates"]) == (4, 3)
+    assert (real["inserted"], real["duplicates"]) == (4, 3)
+    assert [error["row"] for error in dry["errors"]] == [error["row"] for error in real["errors"]] == [5, 7, 8]
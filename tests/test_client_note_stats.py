@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.memory_db import MemoryDatabase
+from services.client_note_stats import ClientNoteStats
+
+START = datetime(2024, 5, 1, 9, 0, tzinfo=timezone.utc)
+STAT_FIELDS = {"_id": 0, "id": 1, "note_count": 1, "last_session_date": 1, "last_note_at": 1}
+
+
+@pytest.fixture
+def db():
+    db = MemoryDatabase()
+    asyncio.run(db.clients.insert_many([
+        {"id": "c1", "first_name": "Ada", "last_name": "Lovelace"},
+        {"id": "c2", "first_name": "Grace", "last_name": "Hopper"}
+    ]))
+    return db
+
+
+async def create_note(db, stats: ClientNoteStats, id: str, hours: int, session_date: str) -> dict:
+    """What the create-note route does"""
+    note = {"id": id, "client_id": "c1", "content": "Session notes", "session_date": session_date,
+            "created_at": START + timedelta(hours=hours)}
+    await db.client_notes.insert_one(dict(note))
+    await stats.note_created(db, note)
+    return note
+
+
+async def stored(db) -> list:
+    return await db.clients.find({}, STAT_FIELDS).sort("id", 1).to_list(None)
+
+
+def test_incremental_updates_match_a_backfill(db):
+    stats = ClientNoteStats()
+
+    async def run():
+        first = await create_note(db, stats, "n1", 0, "2024-03-01")
+        await create_note(db, stats, "n2", 1, "")
+        third = await create_note(db, stats, "n3", 2, "2024-04-10")
+        created = await stored(db)
+
+        # Moving the latest session earlier lowers the maximum
+        await db.client_notes.update_one({"id": "n3"}, {"$set": {"session_date": "2024-02-01"}})
+        await stats.note_updated(db, "c1", third, {"session_date": "2024-02-01"})
+        updated = await stored(db)
+
+        await db.client_notes.delete_one({"id": first["id"]})
+        await stats.note_deleted(db, "c1")
+        deleted = await stored(db)
+
+        await db.clients.update_many({}, {"$unset": {"note_count": "", "last_session_date": "", "last_note_at": ""}})
+        count = await stats.backfill(db, batch_size=1)
+        return created, updated, deleted, count, await stored(db)
+
+    created, updated, deleted, count, backfilled = asyncio.run(run())
+
+    assert created[0] == {"id": "c1", "note_count": 3, "last_session_date": "2024-04-10",
+                          "last_note_at": START + timedelta(hours=2)}
+    assert updated[0]["last_session_date"] == "2024-03-01"
+    assert deleted[0] == {"id": "c1", "note_count": 2, "last_session_date": "2024-02-01",
+                          "last_note_at": START + timedelta(hours=2)}
+    assert count == 2
+    assert backfilled[0] == deleted[0]
+    assert backfilled[1] == {"id": "c2", "note_count": 0, "last_session_date": None, "last_note_at": None}
+
+
+def test_edits_that_keep_the_session_date_do_not_recompute(db):
+    stats = ClientNoteStats()
+    recomputed = []
+    latest = stats._latest
+
+    async def counting_latest(db, client_id):
+        recomputed.append(client_id)
+        return await latest(db, client_id)
+
+    stats._latest = counting_latest
+
+    async def run():
+        note = await create_note(db, stats, "n1", 0, "2024-03-01")
+        await stats.note_updated(db, "c1", note, {"content": "Edited"})
+        await stats.note_updated(db, "c1", note, {"session_date": "2024-03-01"})
+        return await stored(db)
+
+    clients = asyncio.run(run())
+
+    assert recomputed == []
+    assert clients[0]["last_session_date"] == "2024-03-01"
+
+
+def test_deleting_the_last_note_clears_the_maximums(db):
+    stats = ClientNoteStats()
+
+    async def run():
+        await create_note(db, stats, "n1", 0, "2024-03-01")
+        await db.client_notes.delete_one({"id": "n1"})
+        await stats.note_deleted(db, "c1")
+        return await stored(db)
+
+    assert asyncio.run(run())[0] == {"id": "c1", "note_count": 0, "last_session_date": None, "last_note_at": None}
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from benchmarks.memory_db import MemoryDatabase
+from services.contact_counters import COUNTER_ID, ContactCounters, contact_counters
+from services.timestamps import utcnow
+
+
+def submission(number: int, is_read: bool = False) -> dict:
+    return {"id": f"s{number}", "name": "Ada", "email": "ada@example.com", "message": "Hello",
+            "created_at": utcnow() - timedelta(minutes=number), "is_read": is_read}
+
+
+@pytest.fixture
+def counters():
+    counters = ContactCounters()
+    counters.bind(MemoryDatabase())
+    return counters
+
+
+async def store(counters: ContactCounters, documents: list):
+    await counters.submissions.insert_many([dict(doc) for doc in documents])
+    await counters.record_submitted(documents)
+    await counters.record_read(sum(1 for doc in documents if doc["is_read"]))
+
+
+def test_reconcile_repairs_drift(counters):
+    async def run():
+        await store(counters, [submission(1), submission(2, is_read=True)])
+        # A crash between a write and its $inc leaves the counter behind
+        await counters.submissions.insert_one(submission(3))
+        await counters.reconcile()
+        return await counters.summary()
+
+    summary = asyncio.run(run())
+
+    assert (summary["total"], summary["unread"]) == (3, 2)
+    assert counters.last_drift == {"unread": 1, "total": 1}
+
+
+def test_reconcile_keeps_an_increment_made_while_counting(counters):
+    count = counters._count
+    raced = []
+
+    async def count_then_race():
+        counted = await count()
+        if not raced:
+            # A submission lands after the recount but before it is written
+            raced.append(True)
+            await store(counters, [submission(9)])
+        return counted
+
+    counters._count = count_then_race
+
+    async def run():
+        await store(counters, [submission(1)])
+        await counters.reconcile()
+        return await counters.counters.find_one({"id": COUNTER_ID})
+
+    document = asyncio.run(run())
+
+    assert (document["total"], document["unread"]) == (2, 2)
+    assert counters.reconciliations == 1
+
+
+def test_reconcile_creates_missing_counters(counters):
+    async def run():
+        await counters.submissions.insert_many([submission(1), submission(2, is_read=True)])
+        return await counters.summary()
+
+    assert asyncio.run(run())["total"] == 2
+
+
+def test_bulk_delete_counts_unread_from_the_deleted_documents(backend_app, admin_headers):
+    db = backend_app.state.db
+
+    async def run():
+        await db.contact_submissions.drop()
+        await db.counters.drop()
+        await store(contact_counters, [submission(1), submission(2), submission(3, is_read=True)])
+        transport = httpx.ASGITransport(app=backend_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=admin_headers) as http:
+            response = await http.post("/api/contact/bulk/delete", json={"ids": ["s1", "s3", "missing"]})
+        return response, await contact_counters.summary()
+
+    response, summary = asyncio.run(run())
+
+    assert response.json()["deleted"] == 2
+    assert (summary["total"], summary["unread"]) == (1, 1)
@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+
+from benchmarks.memory_db import MemoryDatabase
+from services.contact_digest import ContactDigest
+from services.email_outbox import HELD
+from services.email_service import EmailService
+from services.smtp_pool import SMTPConnectionPool
+from tests.test_smtp_pool import smtp_server  # noqa: F401 (fixture)
+
+
+class Outbox:
+    def __init__(self):
+        self.singles = []
+        self.digests = []
+
+    async def send_single(self, name, email, phone, message):
+        self.singles.append(name)
+        return True
+
+    async def send_digest(self, submissions):
+        self.digests.append([submission["name"] for submission in submissions])
+        return True
+
+
+@pytest.fixture
+def outbox():
+    return Outbox()
+
+
+@pytest.fixture
+def digest(outbox):
+    digest = ContactDigest(outbox.send_single, outbox.send_digest)
+    digest.enabled = True
+    digest.max_items = 3
+    digest.window = 60
+    digest.quiet_period = 600
+    return digest
+
+
+async def notify_all(digest, names):
+    for name in names:
+        await digest.notify(name, f"{name.lower()}@example.com", "", "Hello")
+
+
+def test_first_is_sent_at_once_and_a_burst_is_batched_by_size(digest, outbox):
+    async def run():
+        await notify_all(digest, ["A", "B", "C", "D", "E"])
+        await digest.flush()
+
+    asyncio.run(run())
+
+    assert outbox.singles == ["A"]
+    assert outbox.digests == [["B", "C", "D"], ["E"]]
+    assert digest.stats()["digests_sent"] == 2
+
+
+def test_window_flushes_a_partial_digest(digest, outbox):
+    digest.window = 0.05
+
+    async def run():
+        await notify_all(digest, ["A", "B"])
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+
+    assert outbox.digests == [["B"]]
+    assert digest.stats()["buffered"] == 0
+
+
+def test_quiet_period_resets_to_immediate_sends(digest, outbox):
+    digest.quiet_period = 0.05
+
+    async def run():
+        await notify_all(digest, ["A", "B"])
+        await digest.flush()
+        await asyncio.sleep(0.1)
+        await notify_all(digest, ["C"])
+
+    asyncio.run(run())
+
+    assert outbox.singles == ["A", "C"]
+    assert outbox.digests == [["B"]]
+
+
+def test_flush_cancels_the_pending_window(digest, outbox):
+    async def run():
+        await notify_all(digest, ["A", "B"])
+        timer = digest._timer
+        await digest.flush()
+        await asyncio.sleep(0)
+        return timer
+
+    timer = asyncio.run(run())
+
+    assert timer.cancelled()
+    assert outbox.digests == [["B"]]
+
+
+def test_email_service_renders_the_digest(monkeypatch):
+    service = EmailService()
+    service.contact_recipient = "owner@example.com"
+    service.contact_digest.enabled = True
+    service.contact_digest.max_items = 2
+    queued = []
+
+    async def queue_email(to, subject, body, html_body=None):
+        queued.append((to, subject, body))
+        return True
+
+    monkeypatch.setattr(service, "queue_email", queue_email)
+
+    async def run():
+        for name in ("Ada", "Grace", "Edith"):
+            await service.send_contact_notification(name, f"{name.lower()}@example.com", "", "Booking")
+        await service.http_client.aclose()
+
+    asyncio.run(run())
+
+    assert [subject for _, subject, _ in queued] == [
+        "New Contact Form Submission from Ada",
+        "2 New Contact Form Submissions"
+    ]
+    assert "Grace" in queued[1][2] and "Edith" in queued[1][2]
+
+
+def smtp_service(controller, digest: bool) -> EmailService:
+    service = EmailService()
+    service.provider = "godaddy"
+    service.smtp_from = "website@example.com"
+    service.contact_recipient = "owner@example.com"
+    service.smtp_pool = SMTPConnectionPool(controller.hostname, controller.port, use_tls=False)
+    service.contact_digest.enabled = digest
+    service.contact_digest.max_items = 25
+    service.contact_digest.window = 0.05
+    return service
+
+
+@pytest.mark.parametrize("digest, emails", [(False, 500), (True, 21)])
+def test_burst_of_submissions_over_smtp(smtp_server, digest, emails):
+    controller, handler = smtp_server
+    service = smtp_service(controller, digest)
+
+    async def run():
+        for i in range(500):
+            await service.send_contact_notification(f"Visitor {i}", f"visitor{i}@example.com", "", "Call me back")
+        await service.close()
+
+    asyncio.run(run())
+
+    assert len(handler.subjects) == emails
+    # One immediate send, then 19 full digests and the remainder flushed on close
+    if digest:
+        assert handler.subjects.count("25 New Contact Form Submissions") == 19
+        assert "24 New Contact Form Submissions" in handler.subjects
+
+
+def digest_service(db) -> EmailService:
+    service = EmailService()
+    service.contact_recipient = "owner@example.com"
+    service.contact_digest.enabled = True
+    service.contact_digest.window = 60
+    service.use_outbox(db.email_outbox)
+    return service
+
+
+def test_buffered_notifications_survive_a_crash():
+    db = MemoryDatabase()
+
+    async def run():
+        crashed = digest_service(db)
+        await notify_all(crashed.contact_digest, ["A", "B", "C"])
+        # The process dies with B and C waiting for the window
+        crashed.contact_digest._timer.cancel()
+        await crashed.outbox.stop()
+        held = await db.email_outbox.count_documents({"status": HELD})
+
+        restarted = digest_service(db)
+        await restarted.start()
+        recovered = restarted.contact_digest.stats()["buffered"]
+        await restarted.contact_digest.flush()
+        await restarted.outbox.stop()
+        messages = await db.email_outbox.find({}, {"_id": 0}).to_list(None)
+        for service in (crashed, restarted):
+            await service.http_client.aclose()
+        return held, recovered, messages
+
+    held, recovered, messages = asyncio.run(run())
+
+    assert (held, recovered) == (2, 2)
+    assert [message["subject"] for message in messages] == [
+        "New Contact Form Submission from A", "2 New Contact Form Submissions"
+    ]
+    assert "B" in messages[1]["body"] and "C" in messages[1]["body"]
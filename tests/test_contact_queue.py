@@ -0,0 +1,69 @@
+import asyncio
+
+import services.contact_queue as contact_queue_module
+from benchmarks.memory_db import MemoryDatabase
+from services.contact_queue import ContactIngestQueue, contact_queue
+
+
+def submission(number: int) -> dict:
+    return {"id": f"s{number}", "name": "Ada", "email": "ada@example.com", "message": f"Hello {number}"}
+
+
+def queue(db, spool_dir) -> ContactIngestQueue:
+    queue = ContactIngestQueue(batch_size=100, flush_interval_ms=60000, spool_dir=spool_dir)
+    queue.bind(db.contact_submissions)
+    return queue
+
+
+def test_submissions_spooled_before_a_crash_are_replayed(tmp_path, monkeypatch):
+    db = MemoryDatabase()
+    synced = []
+    fsync = contact_queue_module.os.fsync
+    monkeypatch.setattr(contact_queue_module.os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+
+    async def run():
+        crashed = queue(db, tmp_path)
+        await crashed.submit(submission(1))
+        await crashed.submit(submission(2))
+        # The process dies: nothing flushed, its slot lock released by the OS
+        crashed._flusher.cancel()
+        crashed._close_spool()
+
+        restarted = queue(db, tmp_path)
+        await restarted.start()
+        replayed = restarted.depth
+        await restarted.stop()
+        return restarted, replayed
+
+    restarted, replayed = asyncio.run(run())
+
+    assert len(synced) == 2
+    assert replayed == 2
+    assert restarted.spool_dir == tmp_path / "worker-0"
+    assert asyncio.run(db.contact_submissions.count_documents({})) == 2
+    assert list(restarted.spool_dir.glob("*.inflight")) == []
+
+
+def test_a_running_worker_keeps_its_spool(tmp_path):
+    db = MemoryDatabase()
+
+    async def run():
+        running = queue(db, tmp_path)
+        await running.submit(submission(1))
+        other = queue(db, tmp_path)
+        await other.start()
+        depths = running.depth, other.depth
+        await other.stop()
+        await running.stop()
+        return running, other, depths
+
+    running, other, depths = asyncio.run(run())
+
+    assert (running.spool_dir.name, other.spool_dir.name) == ("worker-0", "worker-1")
+    assert depths == (1, 0)
+    assert asyncio.run(db.contact_submissions.count_documents({})) == 1
+
+
+def test_the_contact_routes_start_the_queue_with_the_app(backend_app):
+    assert contact_queue.start in backend_app.router.on_startup
+    assert contact_queue.stop in backend_app.router.on_shutdown
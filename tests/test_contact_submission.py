@@ -0,0 +1,140 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import httpx
+import pytest
+
+import controllers.contact_controller as contact_controller
+from services.contact_dedupe import RecentSubmissionIndex
+from services.contact_queue import ContactIngestQueue
+from services.email_service import email_service
+from services.timestamps import utcnow
+
+SUBMISSION = {"name": "Ada", "email": "ada@example.com", "phone": "0123", "message": "Do you have space on Friday?"}
+
+
+class Worker:
+    """One server process: its own ingest queue and dedupe index over the shared database"""
+
+    def __init__(self, db, spool_dir):
+        self.db = db
+        self.queue = ContactIngestQueue(batch_size=100, flush_interval_ms=60000, spool_dir=spool_dir)
+        self.dedupe = RecentSubmissionIndex()
+
+    async def submit(self, app, monkeypatch, **headers):
+        monkeypatch.setattr(contact_controller, "contact_queue", self.queue)
+        monkeypatch.setattr(contact_controller, "contact_dedupe", self.dedupe)
+        self.queue.bind(self.db.contact_submissions, on_written=contact_controller.notify_written,
+                        on_rejected=self.dedupe.forget)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.post("/api/contact/", json=SUBMISSION, headers=headers)
+
+
+@pytest.fixture
+def notifications(monkeypatch):
+    sent = []
+
+    async def send_contact_notification(name, email, phone, message):
+        sent.append(email)
+        return True
+
+    monkeypatch.setattr(email_service, "send_contact_notification", send_contact_notification)
+    return sent
+
+
+@pytest.fixture
+def app(backend_app):
+    asyncio.run(backend_app.state.db.contact_submissions.drop())
+    return backend_app
+
+
+def test_repeat_on_another_worker_returns_the_stored_original(app, monkeypatch, tmp_path, notifications):
+    first, second = Worker(app.state.db, tmp_path / "a"), Worker(app.state.db, tmp_path / "b")
+
+    async def run():
+        created = await first.submit(app, monkeypatch, **{"Idempotency-Key": "k1"})
+        await first.queue.flush()
+        repeated = await second.submit(app, monkeypatch, **{"Idempotency-Key": "k1"})
+        await second.queue.flush()
+        await first.queue.stop()
+        await second.queue.stop()
+        return created, repeated
+
+    created, repeated = asyncio.run(run())
+
+    assert created.status_code == 201
+    assert repeated.status_code == 200
+    assert repeated.json()["id"] == created.json()["id"]
+    assert notifications == ["ada@example.com"]
+
+
+def test_duplicate_rejected_at_flush_sends_no_email_and_resolves_later(app, monkeypatch, tmp_path, notifications):
+    first, second = Worker(app.state.db, tmp_path / "a"), Worker(app.state.db, tmp_path / "b")
+
+    async def run():
+        # Both workers accept before either has written, so only the unique index catches the repeat
+        created = await first.submit(app, monkeypatch)
+        raced = await second.submit(app, monkeypatch)
+        await first.queue.flush()
+        await second.queue.flush()
+        repeated = await second.submit(app, monkeypatch)
+        await first.queue.stop()
+        await second.queue.stop()
+        stored = await app.state.db.contact_submissions.find({}, {"_id": 0}).to_list(None)
+        return created, raced, repeated, stored
+
+    created, raced, repeated, stored = asyncio.run(run())
+
+    assert raced.status_code == 201
+    assert [doc["id"] for doc in stored] == [created.json()["id"]]
+    assert notifications == ["ada@example.com"]
+    assert repeated.status_code == 200
+    assert repeated.json()["id"] == created.json()["id"]
+
+
+def test_warm_worker_relies_on_the_unique_index(app, monkeypatch, tmp_path, notifications):
+    first, second = Worker(app.state.db, tmp_path / "a"), Worker(app.state.db, tmp_path / "b")
+    second.dedupe._warm_at = 0
+    reads = []
+    find_one = app.state.db.contact_submissions.find_one
+
+    async def counting_find_one(*args, **kwargs):
+        reads.append(args)
+        return await find_one(*args, **kwargs)
+
+    monkeypatch.setattr(app.state.db.contact_submissions, "find_one", counting_find_one)
+
+    async def run():
+        await first.submit(app, monkeypatch)
+        await first.queue.flush()
+        reads.clear()
+        repeated = await second.submit(app, monkeypatch)
+        await second.queue.flush()
+        await first.queue.stop()
+        await second.queue.stop()
+        return repeated, await app.state.db.contact_submissions.count_documents({})
+
+    repeated, stored = asyncio.run(run())
+
+    assert reads == []
+    assert repeated.status_code == 201
+    assert stored == 1
+    assert notifications == ["ada@example.com"]
+
+
+def test_find_stored_checks_the_previous_bucket(app):
+    dedupe = RecentSubmissionIndex(window_seconds=600)
+    content_hash = dedupe.content_hash(SUBMISSION["email"], SUBMISSION["message"])
+    collection = app.state.db.contact_submissions
+
+    async def run():
+        # Stored a minute ago, in the bucket before the current one
+        await collection.insert_one({
+            "id": "earlier", **SUBMISSION, "created_at": utcnow() - timedelta(minutes=1),
+            "content_key": dedupe.content_key(content_hash, time.time() - 600)
+        })
+        return await dedupe.find_stored(collection, None, content_hash)
+
+    assert asyncio.run(run())["id"] == "earlier"
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from services.db_metrics import DbMetrics, DbTimingMiddleware, db_metrics
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def command_event(request_id: int, name: str, collection: str, duration_ms: float = 0):
+    return SimpleNamespace(
+        connection_id=("localhost", 27017), request_id=request_id, command_name=name,
+        command={name: collection, "filter": {"id": "x"}}, duration_micros=int(duration_ms * 1000)
+    )
+
+
+def run_command(metrics: DbMetrics, request_id: int, name: str, collection: str, duration_ms: float):
+    """What the PyMongo listener sees for one command"""
+    event = command_event(request_id, name, collection, duration_ms)
+    metrics.started(event)
+    metrics.succeeded(event)
+
+
+@pytest.fixture
+def metrics():
+    return DbMetrics(slow_ms=1000)
+
+
+def get(app, path: str) -> httpx.Response:
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.get(path)
+
+    return asyncio.run(run())
+
+
+def test_server_timing_header_and_route_stats(metrics):
+    app = FastAPI()
+
+    @app.get("/api/clients/{client_id}")
+    async def get_client(client_id: str):
+        run_command(metrics, 1, "find", "clients", 2.5)
+        run_command(metrics, 2, "aggregate", "client_notes", 1.5)
+        return {"id": client_id}
+
+    app.add_middleware(DbTimingMiddleware, metrics=metrics)
+
+    first, second = get(app, "/api/clients/c1"), get(app, "/api/clients/c2")
+
+    assert first.headers["server-timing"] == 'db;dur=4.0;desc="2 queries"'
+    assert second.status_code == 200
+    route = metrics.stats()["routes"]["GET /api/clients/{client_id}"]
+    assert (route["requests"], route["commands_per_request"], route["db_ms_per_request"]) == (2, 2.0, 4.0)
+    assert route["slowest"]["command"] == "find"
+
+
+def test_commands_outside_a_request_are_not_attributed(metrics):
+    run_command(metrics, 1, "find", "clients", 5)
+    assert metrics.stats()["routes"] == {}
+
+
+def test_excluded_routes_get_no_header_and_no_stats(metrics):
+    app = FastAPI()
+
+    @app.get("/api/proxy/{path:path}")
+    async def proxy(path: str):
+        return {"path": path}
+
+    app.add_middleware(DbTimingMiddleware, metrics=metrics, exclude_routes=("/api/proxy/{path:path}",))
+
+    response = get(app, "/api/proxy/clients")
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert metrics.stats()["routes"] == {}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("MONGO_URL", "mongodb://localhost:27017")
+    monkeypatch.setenv("DB_NAME", "whitedove_test")
+    import server
+
+    yield server
+
+
+def test_server_installs_the_middleware_and_listener(server):
+    assert any(middleware.cls is DbTimingMiddleware for middleware in server.app.user_middleware)
+    assert db_metrics in server.mongo_client.delegate.options.event_listeners
+
+    # Unauthenticated, so no database access, but the header is still added
+    response = get(server.app, "/api/diagnostics/db")
+
+    assert response.status_code in (401, 403)
+    assert response.headers["server-timing"] == 'db;dur=0.0;desc="0 queries"'
+
+
+def test_proxied_requests_are_not_measured(server, monkeypatch):
+    node = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[])))
+    monkeypatch.setattr(server, "http_client", node)
+    db_metrics.reset()
+
+    response = get(server.app, "/api/clients")
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert db_metrics.stats()["routes"] == {}
+
+
+def test_server_imports_without_mongo_settings():
+    environment = {key: value for key, value in os.environ.items() if key not in ("MONGO_URL", "DB_NAME")}
+    result = subprocess.run(
+        [sys.executable, "-c", "import server; print(server.mongo_client)"],
+        cwd=BACKEND_DIR, env=environment, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "None"
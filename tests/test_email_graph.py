@@ -0,0 +1,192 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from services.email_service import EmailService, retry_after_seconds
+
+LOGIN_URL = "https://login.test"
+GRAPH_URL = "https://graph.test/v1.0"
+
+
+class FakeGraph:
+    """Token endpoint and Graph API behind an httpx MockTransport"""
+
+    def __init__(self):
+        self.tokens_issued = 0
+        self.rejected_tokens = set()
+        self.sent = []
+        self.batch_handler = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "login.test":
+            # Slow enough that concurrent callers overlap with the refresh
+            await asyncio.sleep(0.01)
+            self.tokens_issued += 1
+            return httpx.Response(200, json={"access_token": f"token-{self.tokens_issued}", "expires_in": 3599})
+
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        if token in self.rejected_tokens:
+            return httpx.Response(401, json={"error": {"code": "InvalidAuthenticationToken"}})
+        if request.url.path.endswith("/$batch"):
+            return self.batch_handler(json.loads(request.content))
+        self.sent.append((token, json.loads(request.content)["message"]["subject"]))
+        return httpx.Response(202)
+
+
+@pytest.fixture
+def graph():
+    return FakeGraph()
+
+
+@pytest.fixture
+def service(graph):
+    service = EmailService()
+    asyncio.run(service.http_client.aclose())
+    service.provider = "microsoft"
+    service.ms_tenant_id = "tenant"
+    service.ms_user_id = "owner@example.com"
+    service.ms_login_url = LOGIN_URL
+    service.ms_graph_url = GRAPH_URL
+    service.http_client = httpx.AsyncClient(transport=httpx.MockTransport(graph))
+    return service
+
+
+def test_concurrent_senders_share_one_token_request(service, graph):
+    async def run():
+        tokens = await asyncio.gather(*(service._get_microsoft_token() for _ in range(10)))
+        await service.http_client.aclose()
+        return tokens
+
+    tokens = asyncio.run(run())
+
+    assert set(tokens) == {"token-1"}
+    assert graph.tokens_issued == service.ms_token_requests == 1
+
+
+def test_token_is_reused_until_the_refresh_margin(service, graph):
+    async def run():
+        first = await service._get_microsoft_token()
+        again = await service._get_microsoft_token()
+        service._ms_token_expires_at = 0.0
+        refreshed = await service._get_microsoft_token()
+        await service.http_client.aclose()
+        return first, again, refreshed
+
+    assert asyncio.run(run()) == ("token-1", "token-1", "token-2")
+
+
+def test_rejected_token_is_refreshed_once_and_the_send_retried(service, graph):
+    graph.rejected_tokens.add("token-1")
+
+    async def run():
+        await service._get_microsoft_token()
+        sent = await asyncio.gather(*(service.send_email("a@example.com", f"Hello {i}", "Hi") for i in range(3)))
+        await service.http_client.aclose()
+        return sent
+
+    assert asyncio.run(run()) == [True, True, True]
+    assert graph.tokens_issued == 2
+    assert sorted(graph.sent) == [("token-2", f"Hello {i}") for i in range(3)]
+
+
+def batch_responses(statuses: dict, retry_after=None) -> httpx.Response:
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return httpx.Response(200, json={"responses": [
+        {"id": id, "status": status, "headers": headers if status == 429 else {}} for id, status in statuses.items()
+    ]})
+
+
+def bulk_messages(count: int) -> list:
+    return [{"to": f"client{i}@example.com", "subject": f"Newsletter {i}", "body": "Hello"} for i in range(count)]
+
+
+@pytest.fixture
+def batch_service(service):
+    service.ms_batch_backoff = 0.001
+    return service
+
+
+def send_bulk(service, messages):
+    async def run():
+        results = await service.send_bulk(messages)
+        await service.http_client.aclose()
+        return results
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("retry_after", ["0", "Wed, 21 Oct 2015 07:28:00 GMT", "soon", None])
+def test_throttled_batch_items_are_retried_alone(batch_service, graph, retry_after):
+    batches = []
+
+    def handler(payload):
+        ids = [request["id"] for request in payload["requests"]]
+        batches.append(ids)
+        first = len(batches) == 1
+        return batch_responses({id: 429 if first and id == "1" else 202 for id in ids}, retry_after)
+
+    graph.batch_handler = handler
+    results = send_bulk(batch_service, bulk_messages(3))
+
+    assert batches == [["0", "1", "2"], ["1"]]
+    assert [result["success"] for result in results] == [True, True, True]
+    assert batch_service.ms_throttled == 1
+
+
+def test_messages_are_split_into_batches_of_twenty(batch_service, graph):
+    sizes = []
+
+    def handler(payload):
+        sizes.append(len(payload["requests"]))
+        return batch_responses({request["id"]: 202 for request in payload["requests"]})
+
+    graph.batch_handler = handler
+    results = send_bulk(batch_service, bulk_messages(45))
+
+    assert sorted(sizes) == [5, 20, 20]
+    assert all(result["success"] for result in results)
+
+
+def test_whole_batch_throttle_honours_an_http_date(batch_service, graph):
+    calls = []
+
+    def handler(payload):
+        calls.append(payload)
+        if len(calls) == 1:
+            return httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        return batch_responses({request["id"]: 202 for request in payload["requests"]})
+
+    graph.batch_handler = handler
+    results = send_bulk(batch_service, bulk_messages(2))
+
+    assert len(calls) == 2
+    assert all(result["success"] for result in results)
+
+
+def test_items_still_throttled_after_the_last_attempt_fail(batch_service, graph):
+    batch_service.ms_batch_max_attempts = 3
+    graph.batch_handler = lambda payload: batch_responses(
+        {request["id"]: 429 if request["id"] == "0" else 400 for request in payload["requests"]}, "0"
+    )
+
+    results = send_bulk(batch_service, bulk_messages(2))
+
+    assert results[0] == {"to": "client0@example.com", "success": False, "status": None, "error": "Throttled by Microsoft Graph"}
+    assert results[1]["status"] == 400 and not results[1]["success"]
+    assert batch_service.ms_batch_requests == 3
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("5", 5.0), ("1.5", 1.5), ("-3", 0.0), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+    (None, None), ("soon", None), ("", None), ("inf", None), ("nan", None)
+])
+def test_retry_after_seconds(value, expected):
+    assert retry_after_seconds(value) == expected
+
+
+def test_retry_after_seconds_counts_down_to_a_future_date():
+    assert 3500 < retry_after_seconds(format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)) <= 3600
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.memory_db import MemoryDatabase
+from services.email_outbox import DEAD, HELD, PENDING, SENDING, SENT, SKIPPED, EmailOutbox
+
+
+class Provider:
+    """Fake deliver callable recording what it was asked to send"""
+
+    def __init__(self, succeed: bool = True):
+        self.succeed = succeed
+        self.sent = []
+
+    async def __call__(self, to, subject, body, html_body=None):
+        self.sent.append(subject)
+        return self.succeed
+
+
+@pytest.fixture
+def provider():
+    return Provider()
+
+
+@pytest.fixture
+def outbox(provider):
+    outbox = EmailOutbox(provider)
+    outbox.bind(MemoryDatabase().email_outbox)
+    outbox.batch_size = 2
+    outbox.backoff_base = 10
+    outbox.max_attempts = 2
+    return outbox
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+async def add(outbox: EmailOutbox, *subjects, due: datetime = None):
+    """Insert pending messages the way enqueue does, without starting the worker"""
+    for subject in subjects:
+        await outbox.collection.insert_one({
+            "id": subject, "to": "owner@example.com", "subject": subject, "body": "Hello", "html_body": None,
+            "status": PENDING, "attempts": 0, "next_attempt_at": due or now(), "created_at": now(),
+            "last_error": None
+        })
+
+
+async def message(outbox: EmailOutbox, id: str) -> dict:
+    return await outbox.collection.find_one({"id": id}, {"_id": 0})
+
+
+def test_worker_delivers_enqueued_messages(outbox, provider):
+    outbox.poll_interval = 0.01
+
+    async def run():
+        await outbox.enqueue("owner@example.com", "One", "Hello")
+        await outbox.enqueue("owner@example.com", "Two", "Hello")
+        while outbox.sent < 2:
+            await asyncio.sleep(0.01)
+        await outbox.stop()
+        return await outbox.stats()
+
+    stats = asyncio.run(run())
+
+    assert sorted(provider.sent) == ["One", "Two"]
+    assert stats["depth"] == {PENDING: 0, SENDING: 0, SENT: 2, SKIPPED: 0, DEAD: 0, HELD: 0}
+    assert stats["send_latency_ms"]["p50"] is not None
+
+
+def test_claim_leases_due_messages_once(outbox):
+    async def run():
+        await add(outbox, "a", "b", "c")
+        await add(outbox, "later", due=now() + timedelta(hours=1))
+        batches = [await outbox._claim() for _ in range(3)]
+        return batches, await message(outbox, "a")
+
+    batches, claimed = asyncio.run(run())
+
+    assert [sorted(m["id"] for m in batch) for batch in batches] == [["a", "b"], ["c"], []]
+    assert (claimed["status"], claimed["attempts"]) == (SENDING, 1)
+    assert claimed["lease_expires_at"] > now()
+
+
+def test_expired_lease_is_taken_over_and_the_old_holder_cannot_finish(outbox, provider):
+    async def run():
+        await add(outbox, "a")
+        [first] = await outbox._claim()
+        # The first holder stalls past its lease
+        await outbox.collection.update_one({"id": "a"}, {"$set": {"lease_expires_at": now() - timedelta(seconds=1)}})
+        [second] = await outbox._claim()
+        await outbox._send(first)
+        stale = await message(outbox, "a")
+        await outbox._send(second)
+        return first, second, stale, await message(outbox, "a")
+
+    first, second, stale, done = asyncio.run(run())
+
+    assert second["lease_token"] != first["lease_token"]
+    assert second["attempts"] == 2
+    assert (stale["status"], stale["lease_token"]) == (SENDING, second["lease_token"])
+    assert done["status"] == SENT and "lease_token" not in done
+    assert provider.sent == ["a", "a"]
+
+
+def test_failures_back_off_then_go_dead(outbox, provider):
+    provider.succeed = False
+
+    async def run():
+        await add(outbox, "a")
+        await outbox._send((await outbox._claim())[0])
+        retry = await message(outbox, "a")
+        not_due = await outbox._claim()
+        await outbox.collection.update_one({"id": "a"}, {"$set": {"next_attempt_at": now()}})
+        await outbox._send((await outbox._claim())[0])
+        return retry, not_due, await message(outbox, "a"), await outbox.stats()
+
+    retry, not_due, dead, stats = asyncio.run(run())
+
+    assert (retry["status"], retry["attempts"], retry["last_error"]) == (PENDING, 1, "Provider reported failure")
+    assert timedelta(seconds=7) < retry["next_attempt_at"] - now() <= timedelta(seconds=12)
+    assert not_due == []
+    assert (dead["status"], dead["attempts"]) == (DEAD, 2)
+    assert (stats["retried"], stats["dead"], stats["depth"][DEAD]) == (1, 1, 1)
+
+
+def test_messages_are_skipped_without_a_provider(outbox, provider):
+    outbox.configured = lambda: False
+
+    async def run():
+        await add(outbox, "a")
+        await outbox._send((await outbox._claim())[0])
+        return await message(outbox, "a"), await outbox.stats()
+
+    skipped, stats = asyncio.run(run())
+
+    assert provider.sent == []
+    assert skipped["status"] == SKIPPED and skipped["skipped_at"] is not None
+    assert (stats["skipped"], stats["retried"], stats["depth"][SKIPPED]) == (1, 0, 1)
@@ -0,0 +1,68 @@
+import os
+import shutil
+
+import pytest
+from jinja2 import UndefinedError
+
+from services.email_templates import TEMPLATE_DIR, EmailTemplates
+
+HOSTILE = {
+    "name": '<script>alert("x")</script>',
+    "email": "ada@example.com",
+    "phone": "",
+    "message": "Hi & thanks <b>so</b> much"
+}
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return EmailTemplates()
+
+
+def test_html_body_is_escaped_and_text_body_is_not(templates):
+    text, html = templates.render("contact_notification", **HOSTILE)
+
+    assert "&lt;script&gt;alert(&#34;x&#34;)&lt;/script&gt;" in html
+    assert "<script>" not in html
+    assert "Hi &amp; thanks &lt;b&gt;so&lt;/b&gt; much" in html
+    assert f"Name: {HOSTILE['name']}" in text
+    assert "Phone: Not provided" in text
+
+
+def test_stylesheet_is_inlined_verbatim(templates):
+    _, html = templates.render("contact_notification", **HOSTILE)
+
+    assert "/* inline:" not in html
+    assert ".container { max-width: 600px;" in html
+
+
+def test_digest_lists_every_submission_escaped(templates):
+    submissions = [
+        {**HOSTILE, "received_at": "09:00"},
+        {"name": "Grace", "email": "grace@example.com", "phone": "0123", "message": "Booking", "received_at": "09:05"}
+    ]
+
+    text, html = templates.render("contact_digest", submissions=submissions)
+
+    assert text.startswith("2 new contact form submissions:")
+    assert "Grace" in html and "<script>" not in html
+
+
+def test_missing_context_fails_loudly(templates):
+    with pytest.raises(UndefinedError):
+        templates.render("contact_notification", name="Ada", email="ada@example.com", phone="")
+
+
+@pytest.mark.parametrize("auto_reload", [True, False])
+def test_stylesheet_changes_are_picked_up_only_with_auto_reload(tmp_path, auto_reload):
+    template_dir = tmp_path / "email"
+    shutil.copytree(TEMPLATE_DIR, template_dir)
+    templates = EmailTemplates(template_dir, auto_reload=auto_reload)
+
+    css = template_dir / "email.css"
+    css.write_text("body { color: rebeccapurple; }\n", encoding="utf-8")
+    stamp = css.stat().st_mtime + 10
+    os.utime(css, (stamp, stamp))
+    _, html = templates.render("contact_notification", **HOSTILE)
+
+    assert ("rebeccapurple" in html) is auto_reload
@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from models.schemas import CLIENT_LIST_FIELDS, Client
+from services.fieldsets import parse_fields, projection
+
+CLIENT = {
+    "id": "c1",
+    "first_name": "Ada",
+    "last_name": "Lovelace",
+    "email": "ada@example.com",
+    "phone": "0123",
+    "address": "12 Analytical Row",
+    "date_of_birth": "1815-12-10",
+    "medical_notes": "Migraines",
+    "note_count": 0
+}
+
+
+def list_clients(app, headers, query: str = "") -> httpx.Response:
+    async def run():
+        await app.state.db.clients.drop()
+        await app.state.db.clients.insert_one(dict(CLIENT))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as http:
+            return await http.get(f"/api/clients/{query}")
+
+    return asyncio.run(run())
+
+
+def test_parse_fields_returns_the_default_when_none_requested():
+    assert parse_fields(Client, None) is None
+    assert parse_fields(Client, None, default=CLIENT_LIST_FIELDS) == CLIENT_LIST_FIELDS
+    assert parse_fields(Client, "medical_notes,first_name", default=CLIENT_LIST_FIELDS) == ("first_name", "medical_notes", "id")
+    assert "medical_notes" not in projection(CLIENT_LIST_FIELDS)
+
+
+def test_parse_fields_rejects_unknown_fields():
+    with pytest.raises(HTTPException) as error:
+        parse_fields(Client, "first_name,password")
+    assert error.value.status_code == 400
+
+
+def test_client_list_leaves_sensitive_fields_out_by_default(backend_app, admin_headers):
+    response = list_clients(backend_app, admin_headers)
+
+    assert response.status_code == 200
+    [client] = response.json()
+    assert client["first_name"] == "Ada"
+    assert not {"address", "date_of_birth", "medical_notes"} & set(client)
+
+
+def test_client_list_sends_sensitive_fields_when_named(backend_app, admin_headers):
+    response = list_clients(backend_app, admin_headers, "?fields=first_name,medical_notes")
+
+    assert response.json() == [{"first_name": "Ada", "medical_notes": "Migraines", "id": "c1"}]
+
+
+def test_client_list_openapi_describes_the_sparse_item(backend_app):
+    schema = backend_app.openapi()
+    response = schema["paths"]["/api/clients/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+    assert response["items"]["$ref"].endswith("/ClientListItem")
+    assert schema["components"]["schemas"]["ClientListItem"]["required"] == ["id"]
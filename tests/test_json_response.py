@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+from models.schemas import Client, Therapy
+from services.json_response import (
+    FastJSONResponse, fast_list_response, fast_model_response, list_adapter, serialize_list, serialize_one,
+    trusted_model
+)
+
+CREATED = datetime(2024, 5, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def client_document(number: int) -> dict:
+    return {
+        "_id": f"object-id-{number}",
+        "id": f"c{number}",
+        "first_name": "Ada",
+        "last_name": f"Lovelace {number}",
+        "email": f"ada{number}@example.com",
+        "medical_notes": "Migraines – see GP letter",
+        "created_at": CREATED,
+        "updated_at": CREATED,
+        "note_count": number
+    }
+
+
+def test_serialize_list_matches_the_response_model_encoding():
+    documents = [client_document(n) for n in range(3)]
+    expected = jsonable_encoder([Client.model_validate(doc) for doc in documents])
+
+    assert json.loads(serialize_list(Client, documents)) == expected
+
+
+def test_serialize_drops_unknown_keys_and_writes_iso_datetimes():
+    body = json.loads(serialize_one(Client, client_document(1)))
+
+    assert "_id" not in body
+    assert body["created_at"] == "2024-05-01T09:30:00Z"
+    assert body["medical_notes"] == "Migraines – see GP letter"
+
+
+def test_serialize_rejects_documents_that_do_not_fit_the_model():
+    document = client_document(1)
+    del document["first_name"]
+
+    with pytest.raises(ValidationError):
+        serialize_list(Client, [document])
+
+
+def test_stored_emails_are_not_revalidated():
+    document = client_document(1)
+    document["email"] = "typed-before-validation"
+
+    assert json.loads(serialize_list(Client, [document]))[0]["email"] == "typed-before-validation"
+    assert trusted_model(Client).model_fields["email"].annotation == Optional[str]
+    assert trusted_model(Therapy) is Therapy
+
+
+def test_adapters_are_built_once_per_model():
+    assert list_adapter(Client) is list_adapter(Client)
+    assert list_adapter(Client) is not list_adapter(Therapy)
+
+
+def test_fast_responses_carry_the_serialized_body():
+    documents = [client_document(1)]
+
+    listed = fast_list_response(Client, documents)
+    single = fast_model_response(Client, documents[0])
+
+    assert listed.media_type == "application/json"
+    assert listed.body == serialize_list(Client, documents)
+    assert json.loads(single.body)["id"] == "c1"
+
+
+def test_fast_json_response_renders_plain_content():
+    assert FastJSONResponse(b'{"ready":true}').body == b'{"ready":true}'
+    assert json.loads(FastJSONResponse({"when": CREATED, "items": [1, 2]}).body) == {
+        "when": "2024-05-01T09:30:00Z", "items": [1, 2]
+    }
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from benchmarks.memory_db import MemoryDatabase
+
+
+def insert_all(collection, documents: list) -> list:
+    """Insert one at a time; returns the ids of the documents the index rejected"""
+    async def run():
+        rejected = []
+        for document in documents:
+            try:
+                await collection.insert_one(document)
+            except DuplicateKeyError:
+                rejected.append(document["id"])
+        return rejected
+
+    return asyncio.run(run())
+
+
+def test_unique_index_treats_missing_fields_as_null():
+    collection = MemoryDatabase().items
+    asyncio.run(collection.create_index("email", unique=True))
+
+    assert insert_all(collection, [{"id": "a"}, {"id": "b"}, {"id": "c", "email": None}]) == ["b", "c"]
+
+
+def test_sparse_unique_index_skips_documents_without_the_field():
+    collection = MemoryDatabase().items
+    asyncio.run(collection.create_index("email", unique=True, sparse=True))
+
+    assert insert_all(collection, [
+        {"id": "a"}, {"id": "b"}, {"id": "c", "email": None}, {"id": "d", "email": None}, {"id": "e", "email": "x"}
+    ]) == ["d"]
+
+
+def test_partial_unique_index_only_covers_matching_documents():
+    collection = MemoryDatabase().items
+    asyncio.run(collection.create_index(
+        "key", unique=True, partialFilterExpression={"key": {"$type": "string"}}
+    ))
+
+    assert insert_all(collection, [
+        {"id": "a", "key": None}, {"id": "b", "key": None}, {"id": "c", "key": "k"}, {"id": "d", "key": "k"}
+    ]) == ["d"]
+
+
+def test_updates_are_checked_against_partial_indexes():
+    collection = MemoryDatabase().items
+
+    async def run():
+        await collection.create_index("key", unique=True, partialFilterExpression={"key": {"$type": "string"}})
+        await collection.insert_many([{"id": "a", "key": "k"}, {"id": "b"}])
+        await collection.update_one({"id": "b"}, {"$set": {"key": "k"}})
+
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(run())
+
+
+@pytest.mark.parametrize("options", [
+    {"collation": {"locale": "en"}},
+    {"default_language": "french"},
+    {"sparse": True, "partialFilterExpression": {"key": {"$exists": True}}}
+])
+def test_unsupported_index_options_fail(options):
+    with pytest.raises(OperationFailure):
+        asyncio.run(MemoryDatabase().items.create_index("key", **options))
+
+
+def test_ttl_options_are_accepted():
+    assert asyncio.run(MemoryDatabase().items.create_index("sent_at", expireAfterSeconds=60)) == "sent_at_1"
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+from starlette.datastructures import Headers
+
+from benchmarks import microbench
+from services.node_proxy import build_proxy_response, forward_headers
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def result(median_us: float) -> dict:
+    return {"median_us": median_us, "min_us": median_us, "loops": 1, "repeat": 1}
+
+
+def test_compare_flags_only_slowdowns_beyond_the_threshold(capsys):
+    baseline = {"results": {"fast": result(100), "steady": result(100), "slow": result(100)}}
+    results = {"fast": result(50), "steady": result(105), "slow": result(125), "added": result(10)}
+
+    regressions = microbench.compare(results, baseline, threshold=10)
+    output = capsys.readouterr().out
+
+    assert regressions == ["slow"]
+    assert "REGRESSION" in output and "faster" in output and "new" in output
+
+
+def test_measure_reports_per_call_times():
+    row = microbench.measure(lambda: None, repeat=3, target_ms=1)
+
+    assert row["repeat"] == 3 and row["loops"] >= 1
+    assert 0 <= row["min_us"] <= row["median_us"]
+
+
+def test_the_suite_does_not_import_the_server():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, benchmarks.microbench; print('server' in sys.modules)"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+def test_proxy_helpers_drop_hop_headers():
+    forwarded = forward_headers(Headers({"host": "example.com", "content-length": "2", "accept": "application/json"}))
+    response = build_proxy_response(httpx.Response(
+        201, content=b"{}", headers={"content-type": "application/json", "content-length": "2", "etag": "x"}
+    ))
+
+    assert forwarded == {"accept": "application/json"}
+    assert response.status_code == 201 and response.headers["etag"] == "x"
+    assert response.body == b"{}"
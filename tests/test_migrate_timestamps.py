@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.memory_db import MemoryDatabase
+from scripts.migrate_timestamps import TimestampMigration
+
+FIELDS = ("created_at", "updated_at")
+
+
+def note(number: int, created_at: str = None) -> dict:
+    return {"_id": number, "id": f"n{number}", "created_at": created_at or f"2023-01-{number + 1:02d}T10:00:00",
+            "updated_at": None}
+
+
+@pytest.fixture
+def db():
+    db = MemoryDatabase()
+    asyncio.run(db.client_notes.insert_many([note(i) for i in range(5)] + [note(9, "last tuesday")]))
+    return db
+
+
+def migration(db) -> TimestampMigration:
+    return TimestampMigration(db, batch_size=2, max_duty=1.0)
+
+
+async def stored(db) -> dict:
+    return {doc["_id"]: doc["created_at"] for doc in await db.client_notes.find({}).to_list(None)}
+
+
+def test_an_interrupted_run_resumes_from_its_checkpoint(db, monkeypatch):
+    bulk_write = db.client_notes.bulk_write
+    calls = []
+
+    async def failing_second_batch(requests, **kwargs):
+        calls.append(len(requests))
+        if len(calls) == 2:
+            raise ConnectionError("connection reset")
+        return await bulk_write(requests, **kwargs)
+
+    async def run():
+        monkeypatch.setattr(db.client_notes, "bulk_write", failing_second_batch)
+        with pytest.raises(ConnectionError):
+            await migration(db).migrate_collection("client_notes", FIELDS)
+        checkpoint = await db.migrations.find_one({"id": "timestamps:client_notes"}, {"_id": 0})
+
+        monkeypatch.setattr(db.client_notes, "bulk_write", bulk_write)
+        result = await migration(db).migrate_collection("client_notes", FIELDS)
+        return checkpoint, result, await db.migrations.find_one({"id": "timestamps:client_notes"}), await stored(db)
+
+    checkpoint, result, finished, values = asyncio.run(run())
+
+    assert checkpoint["converted"] == 2 and "completed_at" not in checkpoint
+    assert result == {"converted": 5, "unparsable": 1}
+    assert finished["unparsable_ids"] == [9] and finished["completed_at"] is not None
+    assert all(isinstance(values[i], datetime) for i in range(5))
+    assert values[9] == "last tuesday"
+
+
+def test_only_values_unchanged_since_the_read_are_converted(db, monkeypatch):
+    bulk_write = db.client_notes.bulk_write
+    edited = []
+
+    async def edit_then_write(requests, **kwargs):
+        if not edited:
+            # The app rewrites two of the notes between the migration's read and its write
+            edited.append(True)
+            await db.client_notes.update_one({"_id": 0}, {"$set": {"created_at": "2023-06-01T08:00:00"}})
+            await db.client_notes.update_one({"_id": 1}, {"$set": {"created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}})
+        return await bulk_write(requests, **kwargs)
+
+    monkeypatch.setattr(db.client_notes, "bulk_write", edit_then_write)
+
+    async def run():
+        result = await migration(db).migrate_collection("client_notes", FIELDS)
+        return result, await stored(db)
+
+    result, values = asyncio.run(run())
+
+    # Note 0 is picked up again with its new value; note 1 keeps the app's date
+    assert values[0] == datetime(2023, 6, 1, 8, 0, tzinfo=timezone.utc)
+    assert values[1] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert result["converted"] == 4
+
+
+def test_dry_run_writes_nothing(db):
+    result = asyncio.run(TimestampMigration(db, batch_size=10, max_duty=1.0, dry_run=True)
+                         .migrate_collection("client_notes", FIELDS))
+
+    assert result == {"converted": 5, "unparsable": 1}
+    assert all(isinstance(value, str) for value in asyncio.run(stored(db)).values())
+    assert asyncio.run(db.migrations.count_documents({})) == 0
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import controllers.diagnostics_controller as diagnostics_controller
+from benchmarks.memory_db import MemoryDatabase
+from services.profiler import ProfileBusy, Profiler, RequestProfilingMiddleware
+
+
+def spin(seconds: float):
+    """Keep the calling thread busy so the sampler sees it"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler()
+    profiler.request_interval = 0.001
+    profiler.sample_interval = 0.001
+    yield profiler
+    profiler.cancel()
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/api/slow")
+    async def slow():
+        spin(0.03)
+        return {"ok": True}
+
+    @app.get("/other")
+    async def other():
+        return {"ok": True}
+
+    return app
+
+
+async def get_all(app, paths: list) -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        return [(await http.get(path)).status_code for path in paths]
+
+
+def test_request_profile_covers_matching_requests_then_unwraps(profiler, app):
+    async def run():
+        # Build the stack as Starlette does on the first request
+        await get_all(app, ["/other"])
+        original = app.middleware_stack
+        profiler.profile_requests(app, "/api/", 2)
+        armed = app.middleware_stack
+        statuses = await get_all(app, ["/api/slow", "/other", "/api/slow", "/api/slow"])
+        return original, armed, statuses
+
+    original, armed, statuses = asyncio.run(run())
+    result = profiler.last_result
+
+    assert isinstance(armed, RequestProfilingMiddleware)
+    assert app.middleware_stack is original
+    assert statuses == [200, 200, 200, 200]
+    assert [request["path"] for request in result["requests"]] == ["/api/slow", "/api/slow"]
+    assert result["mode"] == "request" and not result["cancelled"]
+    assert result["samples"] > 0 and "test_profiler:spin" in result["collapsed"]
+    assert not profiler.busy
+
+
+def test_sample_returns_collapsed_stacks(profiler):
+    worker = threading.Thread(target=spin, args=(0.3,), name="busy-worker")
+
+    async def run():
+        worker.start()
+        result = await profiler.sample(0.2)
+        worker.join()
+        return result
+
+    result = asyncio.run(run())
+    lines = result["collapsed"].splitlines()
+
+    assert result["mode"] == "sampling" and result["samples"] > 0
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    busy = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy and all(line.split(" ")[0].endswith("test_profiler:spin") for line in busy)
+    assert any(entry["function"].endswith("test_profiler:spin") for entry in result["top"])
+
+
+def test_a_second_session_is_refused(profiler, app):
+    profiler.profile_requests(app, "/api/", 5)
+
+    with pytest.raises(ProfileBusy):
+        profiler.profile_requests(app, "/api/", 1)
+    with pytest.raises(ProfileBusy):
+        asyncio.run(profiler.sample(0.01))
+
+    assert profiler.cancel()
+    assert profiler.last_result["cancelled"]
+    assert not isinstance(app.middleware_stack, RequestProfilingMiddleware)
+
+
+def test_diagnostics_routes_answer_409_while_a_profile_runs(profiler, monkeypatch):
+    async def allow(credentials, db):
+        return {"id": "admin"}
+
+    monkeypatch.setattr(diagnostics_controller, "verify_admin", allow)
+    monkeypatch.setattr(diagnostics_controller, "profiler", profiler)
+    app = FastAPI()
+    app.include_router(diagnostics_controller.create_diagnostics_routes(MemoryDatabase()), prefix="/api")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": "Bearer token"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as http:
+            armed = await http.post("/api/diagnostics/profile/requests", params={"path_prefix": "/api/clients", "count": 3})
+            again = await http.post("/api/diagnostics/profile/requests", params={"path_prefix": "/api/clients"})
+            sampled = await http.post("/api/diagnostics/profile/sample", params={"seconds": 0.01})
+            cancelled = await http.delete("/api/diagnostics/profile")
+        return armed, again, sampled, cancelled
+
+    armed, again, sampled, cancelled = asyncio.run(run())
+
+    assert armed.status_code == 202 and armed.json()["pending"]["count"] == 3
+    assert again.status_code == sampled.status_code == 409
+    assert cancelled.status_code == 200 and cancelled.json()["running"] is None
@@ -0,0 +1,104 @@
+import asyncio
+import socket
+from email.mime.text import MIMEText
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from services.smtp_pool import SMTPConnectionPool
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.sessions = 0
+        self.subjects = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.subjects.append(envelope.content.decode().split("Subject: ", 1)[1].split("\r\n", 1)[0])
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def make_message(i: int) -> MIMEText:
+    message = MIMEText(f"Submission {i}", "plain")
+    message["From"] = "website@example.com"
+    message["To"] = "owner@example.com"
+    message["Subject"] = f"Message {i}"
+    return message
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def make_pool(controller, **options) -> SMTPConnectionPool:
+    return SMTPConnectionPool(controller.hostname, controller.port, use_tls=False, **options)
+
+
+def test_burst_reuses_at_most_max_size_sessions(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller, max_size=2)
+
+    async def run():
+        await asyncio.gather(*(pool.send(make_message(i)) for i in range(20)))
+        await pool.close()
+
+    asyncio.run(run())
+
+    assert sorted(handler.subjects) == sorted(f"Message {i}" for i in range(20))
+    assert pool.handshakes == handler.sessions <= 2
+    assert pool.stats()["messages_sent"] == 20
+
+
+def test_sessions_are_recycled_after_max_messages(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller, max_size=1, max_messages=3)
+
+    async def run():
+        for i in range(7):
+            await pool.send(make_message(i))
+        await pool.close()
+
+    asyncio.run(run())
+
+    assert len(handler.subjects) == 7
+    assert pool.handshakes == 3
+
+
+def test_dropped_session_is_replaced():
+    handler = RecordingHandler()
+    first = Controller(handler, hostname="127.0.0.1", port=free_port())
+    first.start()
+    pool = make_pool(first, max_size=1, noop_after=0)
+
+    async def run():
+        await pool.send(make_message(1))
+        # Restarting the server drops the idle pooled session under the pool
+        first.stop()
+        second = Controller(handler, hostname=first.hostname, port=first.port)
+        second.start()
+        try:
+            await pool.send(make_message(2))
+            await pool.close()
+        finally:
+            second.stop()
+
+    asyncio.run(run())
+
+    assert handler.subjects == ["Message 1", "Message 2"]
+    assert pool.handshakes == 2
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from benchmarks.memory_db import MemoryDatabase
+from services.upload_store import UploadStore, upload_url
+
+
+def store_file(store: UploadStore, name: str, content: bytes, age_seconds: float = 0) -> str:
+    path = store.root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if age_seconds:
+        stamp = time.time() - age_seconds
+        os.utime(path, (stamp, stamp))
+    return name
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = UploadStore(tmp_path)
+    store.gc_grace = 60
+    return store
+
+
+def test_gc_keeps_every_referenced_settings_image(store):
+    db = MemoryDatabase()
+    digest = "ab" * 32
+    about = store_file(store, f"ab/ab/{digest}.jpg", b"about me", age_seconds=3600)
+    hero = store_file(store, f"cd/cd/{'cd' * 32}.jpg", b"hero", age_seconds=3600)
+    orphan = store_file(store, f"ef/ef/{'ef' * 32}.jpg", b"orphan", age_seconds=3600)
+
+    async def run():
+        await db.site_settings.insert_one({
+            "id": "site_settings",
+            "images": {"hero_images": [upload_url(hero)]},
+            "about_me": {"enabled": True, "photo_url": upload_url(about)}
+        })
+        return await store.collect_garbage(db)
+
+    report = asyncio.run(run())
+
+    assert report["removed"] == [orphan]
+    assert (store.root / about).exists()
+    assert (store.root / hero).exists()
+    assert not (store.root / orphan).exists()
+
+
+def test_gc_keeps_recent_uploads_and_honours_dry_run(store):
+    db = MemoryDatabase()
+    recent = store_file(store, "upload-1.png", b"just uploaded")
+    old = store_file(store, "upload-2.png", b"forgotten", age_seconds=3600)
+
+    report = asyncio.run(store.collect_garbage(db, dry_run=True))
+
+    assert report["removed"] == [old]
+    assert (store.root / recent).exists()
+    assert (store.root / old).exists()
+
+
+def test_rewrite_references_repoints_about_me_photo(store):
+    db = MemoryDatabase()
+    old_url, new_url = upload_url("upload-1.jpg"), upload_url(f"ab/ab/{'ab' * 32}.jpg")
+
+    async def run():
+        await db.site_settings.insert_one({"id": "site_settings", "about_me": {"photo_url": old_url}})
+        await db.therapies.insert_one({"id": "t1", "image_url": old_url})
+        changed = await store.rewrite_references(db, old_url, new_url)
+        return changed, await db.site_settings.find_one({"id": "site_settings"})
+
+    changed, settings = asyncio.run(run())
+
+    assert changed == 2
+    assert settings["about_me"]["photo_url"] == new_url